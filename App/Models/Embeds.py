@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, Integer, String, BigInteger, ForeignKey, TIMESTAMP, text, UniqueConstraint
+from sqlalchemy import Column, Integer, String, BigInteger, ForeignKey, TIMESTAMP, text, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 
 from .Common import BaseModel, NormalizedBoolean
@@ -34,6 +34,10 @@ class EmbedModel(BaseModel):
     footer = relationship("EmbedFooterModel", back_populates="embed", cascade="all, delete-orphan", passive_deletes=True, uselist=False)
     fields = relationship("EmbedFieldModel", back_populates="embed", cascade="all, delete-orphan", passive_deletes=True)
 
+    __table_args__ = (
+        Index('ix_embeds_guild_id', 'guild_id'),
+    )
+
 ################################################################################
 class EmbedImagesModel(BaseModel):
 
@@ -87,6 +91,7 @@ class EmbedFieldModel(BaseModel):
     embed = relationship("EmbedModel", back_populates="fields", passive_deletes=True)
 
     __table_args__ = (
+        Index('ix_embed_fields_embed_id', 'embed_id'),
         UniqueConstraint('embed_id', 'sort_order', name='uq_embed_field_sort_order'),
     )
 
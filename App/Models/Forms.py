@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, Integer, BigInteger, ForeignKey, JSON, String, TIMESTAMP, func
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey, JSON, String, TIMESTAMP, func, Index
 from sqlalchemy.orm import relationship
 
 from .Common import *
@@ -38,6 +38,10 @@ class FormModel(BaseModel):
     prompts = relationship("FormPromptModel", back_populates="form", cascade="all, delete-orphan")
     post_options = relationship("FormPostOptionsModel", back_populates="form", uselist=False, cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index('ix_forms_guild_id', 'guild_id'),
+    )
+
 ################################################################################
 class FormPostOptionsModel(BaseModel):
 
@@ -73,6 +77,10 @@ class FormQuestionModel(BaseModel):
     options = relationship("FormQuestionOptionModel", back_populates="question", cascade="all, delete-orphan")
     prompts = relationship("FormPromptModel", back_populates="question", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index('ix_form_questions_form_id', 'form_id'),
+    )
+
 ################################################################################
 class FormQuestionResponseModel(BaseModel):
 
@@ -87,6 +95,10 @@ class FormQuestionResponseModel(BaseModel):
     # Relationships
     question = relationship("FormQuestionModel", back_populates="responses")
 
+    __table_args__ = (
+        Index('ix_form_question_responses_question_id', 'question_id'),
+    )
+
 ################################################################################
 class FormResponseCollectionModel(BaseModel):
 
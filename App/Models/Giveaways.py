@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, Integer, BigInteger, ForeignKey, String, TIMESTAMP, func
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey, String, TIMESTAMP, func, Index
 from sqlalchemy.orm import relationship
 
 from .Common import *
@@ -42,6 +42,10 @@ class GiveawayModel(BaseModel):
     details = relationship("GiveawayDetailsModel", back_populates="giveaway", uselist=False, cascade="all, delete-orphan")
     entries = relationship("GiveawayEntryModel", back_populates="giveaway", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index('ix_giveaways_guild_id', 'guild_id'),
+    )
+
 ################################################################################
 class GiveawayDetailsModel(BaseModel):
 
@@ -74,4 +78,9 @@ class GiveawayEntryModel(BaseModel):
     # Relationships
     giveaway = relationship("GiveawayModel", back_populates="entries")
 
+    __table_args__ = (
+        # One entry per user; also serves lookups by giveaway alone.
+        Index('ix_giveaway_entries_giveaway_user', 'giveaway_id', 'user_id', unique=True),
+    )
+
 ################################################################################
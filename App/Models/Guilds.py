@@ -14,6 +14,9 @@ class GuildIDModel(BaseModel):
     __tablename__ = "guild_ids"
 
     guild_id = Column(BigInteger, primary_key=True)
+    # Incremented once per committed write to anything in the guild; backs the
+    # ETags on the deep GET endpoints.
+    revision = Column(BigInteger, nullable=False, default=0, server_default="0")
 
     # Relationships
     configuration = relationship("GuildConfigurationModel", back_populates="guild", uselist=False)
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, Integer, BigInteger, ForeignKey, VARCHAR, String, TIMESTAMP, func
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey, VARCHAR, String, TIMESTAMP, func, Index
 from sqlalchemy.orm import relationship
 
 from .Common import *
@@ -75,6 +75,10 @@ class ProfileModel(BaseModel):
     details = relationship("ProfileDetailsModel", back_populates="profile", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
     personality = relationship("ProfilePersonalityModel", back_populates="profile", uselist=False, cascade="all, delete-orphan", passive_deletes=True)
 
+    __table_args__ = (
+        Index('ix_profiles_guild_id', 'guild_id'),
+    )
+
 ################################################################################
 class ProfileImagesModel(BaseModel):
 
@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, Integer, BigInteger, ForeignKey, func, String, TIMESTAMP
+from sqlalchemy import Column, Integer, BigInteger, ForeignKey, func, String, TIMESTAMP, Index
 from sqlalchemy.orm import relationship
 
 from .Common import *
@@ -47,6 +47,10 @@ class RaffleModel(BaseModel):
     manager = relationship("RaffleManagerModel", back_populates="raffles")
     entries = relationship("RaffleEntryModel", back_populates="raffle", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        Index('ix_raffles_guild_id', 'guild_id'),
+    )
+
 ################################################################################
 class RaffleEntryModel(BaseModel):
 
@@ -60,4 +64,8 @@ class RaffleEntryModel(BaseModel):
     # Relationships
     raffle = relationship("RaffleModel", back_populates="entries")
 
+    __table_args__ = (
+        Index('ix_raffle_entries_raffle_id', 'raffle_id'),
+    )
+
 ################################################################################
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-from sqlalchemy import Column, Integer, String, BigInteger, UUID, TIMESTAMP, func, JSON
+from sqlalchemy import Column, Integer, String, BigInteger, UUID, TIMESTAMP, func, JSON, Index
 
 from .Common import BaseModel
 ################################################################################
 
-__all__ = ("AuditLogModel", "UserModel")
+__all__ = ("AuditLogModel", "RevokedTokenModel", "UserModel")
 
 ################################################################################
 class UserModel(BaseModel):
@@ -17,9 +17,27 @@ class UserModel(BaseModel):
     created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
     last_login = Column(TIMESTAMP, nullable=True)
 
+################################################################################
+class RevokedTokenModel(BaseModel):
+
+    # Access tokens revoked before their expiry, shared by every worker.
+    __tablename__ = 'revoked_tokens'
+
+    # SHA-256 hex digest of the token; raw tokens are never stored.
+    digest = Column(String(64), primary_key=True)
+    # The token's own expiry (naive UTC), after which the row can be pruned.
+    expires_at = Column(TIMESTAMP, nullable=False)
+
+    __table_args__ = (
+        Index('ix_revoked_tokens_expires_at', 'expires_at'),
+    )
+
 ################################################################################
 class AuditLogModel(BaseModel):
 
+    # On Postgres this table is range-partitioned by month on created_at (see
+    # the d38950c7c5e7 migration and App/retention.py); the primary key there
+    # is (id, created_at).
     __tablename__ = 'audit_log'
 
     id = Column(Integer, primary_key=True)
@@ -30,6 +48,19 @@ class AuditLogModel(BaseModel):
     user_id = Column(BigInteger, nullable=False)
     changes = Column(JSON, nullable=False)
     request_id = Column(UUID, nullable=True)
+    # The guild revision the entry's transaction committed as; NULL for
+    # entries written before revisions were recorded.
+    revision = Column(BigInteger, nullable=True)
     created_at = Column(TIMESTAMP, nullable=False, server_default=func.now())
 
+    __table_args__ = (
+        # Keyset pagination for the audit log API, newest first, optionally
+        # narrowed to one target or one user.
+        Index('ix_audit_log_guild_created', 'guild_id', 'created_at', 'id'),
+        Index('ix_audit_log_guild_target_created', 'guild_id', 'target', 'target_id', 'created_at', 'id'),
+        Index('ix_audit_log_guild_user_created', 'guild_id', 'user_id', 'created_at', 'id'),
+        # Delta sync: everything after a given guild revision.
+        Index('ix_audit_log_guild_revision', 'guild_id', 'revision'),
+    )
+
 ################################################################################
@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Literal, Optional, Tuple
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import select, tuple_
+
+from .. import Models, Schemas
+from ..dependencies import get_read_dependencies, Dependencies
+from ..responses import SchemaRoute
+################################################################################
+
+router = APIRouter(prefix="/audit-log", tags=["Audit Log"], route_class=SchemaRoute)
+
+################################################################################
+# Helper Functions
+################################################################################
+def encode_audit_cursor(entry: Models.AuditLogModel) -> str:
+    """Encode the sort key of the last entry on a page as an opaque cursor."""
+
+    raw = json.dumps([entry.created_at.isoformat(), entry.id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii")
+
+################################################################################
+def decode_audit_cursor(cursor: str) -> Tuple[datetime, int]:
+
+    try:
+        created_at, entry_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        return datetime.fromisoformat(created_at), int(entry_id)
+    except (binascii.Error, UnicodeError, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid audit log cursor")
+
+################################################################################
+# GET Requests
+################################################################################
+@router.get("/", response_model=Schemas.AuditLogPageSchema, summary="Get a page of the guild's audit log, newest first")
+async def get_audit_log(
+    cursor: Optional[str] = Query(None, description="The 'next_cursor' of the previous page"),
+    limit: int = Query(50, ge=1, le=200, description="Maximum number of entries to return"),
+    target: Optional[str] = Query(None, description="Only entries for this object type, e.g. 'Embed'"),
+    target_id: Optional[int] = Query(None, description="Only entries for this object ID"),
+    user_id: Optional[int] = Query(None, description="Only entries made by this user"),
+    action: Optional[Literal["Create", "Update", "Delete"]] = Query(None, description="Only entries of this kind"),
+    request_id: Optional[UUID] = Query(None, description="Only entries written by this request"),
+    deps: Dependencies = Depends(get_read_dependencies)
+) -> Schemas.AuditLogPageSchema:
+
+    query = select(Models.AuditLogModel).filter_by(guild_id=deps.guild_id)
+    if target is not None:
+        query = query.filter_by(target=target)
+    if target_id is not None:
+        query = query.filter_by(target_id=target_id)
+    if user_id is not None:
+        query = query.filter_by(user_id=user_id)
+    if action is not None:
+        query = query.filter_by(action=action)
+    if request_id is not None:
+        query = query.filter_by(request_id=request_id)
+
+    if cursor is not None:
+        # Seek past the last entry instead of using OFFSET, so every page costs
+        # the same no matter how deep into the log it is.
+        query = query.filter(
+            tuple_(Models.AuditLogModel.created_at, Models.AuditLogModel.id) < tuple_(*decode_audit_cursor(cursor))
+        )
+
+    query = query.order_by(Models.AuditLogModel.created_at.desc(), Models.AuditLogModel.id.desc())
+    entries = (await deps.db.scalars(query.limit(limit + 1))).all()
+
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    return Schemas.AuditLogPageSchema(
+        items=[Schemas.AuditLogEntrySchema.model_validate(e) for e in entries],
+        next_cursor=encode_audit_cursor(entries[-1]) if has_more else None
+    )
+
+################################################################################
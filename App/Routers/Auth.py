@@ -1,24 +1,26 @@
 from __future__ import annotations
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from fastapi.security.oauth2 import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .. import Models, Schemas, auth
 from ..dependencies import get_db
 from ..config import settings
+from ..responses import SchemaRoute
 ################################################################################
 
-router = APIRouter(prefix="/auth", tags=["System Authentication"])
+router = APIRouter(prefix="/auth", tags=["System Authentication"], route_class=SchemaRoute)
 
 ################################################################################
 @router.post("/register", status_code=201, response_model=Schemas.RegistrationResponseSchema)
-def register_user(
+async def register_user(
     data: Schemas.RegistrationSchema,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Schemas.RegistrationResponseSchema:
 
-    if db.query(Models.UserModel).filter_by(user_id=data.user_id).first():
+    if await db.scalar(select(Models.UserModel).filter_by(user_id=data.user_id)):
         raise HTTPException(status_code=400, detail=f"User ID '{data.user_id}' already exists")
 
     if data.frogge != settings.FROGGE_REGISTRATION_PASSWORD:
@@ -30,27 +32,39 @@ def register_user(
             )
         )
 
-    new_user = Models.UserModel(user_id=data.user_id, password=auth.hash_password(data.password))
+    hashed = await auth.hash_password_async(data.password)
+    new_user = Models.UserModel(user_id=data.user_id, password=hashed)
     db.add(new_user)
-    db.flush()
-    db.refresh(new_user)
+    await db.flush()
+    await db.refresh(new_user)
 
     return Schemas.RegistrationResponseSchema.model_validate(new_user)
 
 ################################################################################
 @router.post("/login", response_model=Schemas.LoginResponseSchema)
-def login_user(
+async def login_user(
     data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Schemas.LoginResponseSchema:
 
-    user = db.query(Models.UserModel).filter_by(user_id=data.username).first()
+    user = await db.scalar(select(Models.UserModel).filter_by(user_id=data.username))
     if not user:
         raise HTTPException(status_code=401, detail="User not found", headers={"WWW-Authenticate": "Bearer"})
-    if not auth.verify_password(data.password, user.password):
+    if not await auth.verify_password_async(data.password, user.password):
         raise HTTPException(status_code=401, detail="Incorrect password", headers={"WWW-Authenticate": "Bearer"})
 
     token = auth.generate_access_token(data={"user_id": user.user_id})
     return Schemas.LoginResponseSchema(access_token=token)
 
 ################################################################################
+@router.post("/revoke", status_code=204, summary="Revoke the access token used for this request")
+async def revoke_token(
+    token: str = Depends(auth.oauth2_scheme),
+    db: AsyncSession = Depends(get_db),
+    _: Schemas.TokenDataSchema = Depends(auth.get_current_user)
+) -> Response:
+
+    await auth.revoke_access_token(token, db)
+    return Response(status_code=204)
+
+################################################################################
@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple, Type
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from .Common import *
+from .. import Models, Schemas
+from ..dependencies import get_read_dependencies, Dependencies
+from ..responses import SchemaRoute
+################################################################################
+
+router = APIRouter(prefix="/changes", tags=["Delta Sync"], route_class=SchemaRoute)
+
+# Upper bound on the number of IDs in a single IN list.
+LOAD_BATCH_SIZE = 500
+
+################################################################################
+@dataclass(frozen=True)
+class ChangeKind:
+    """An entity type the bot keeps in sync, keyed by ``key`` within the guild."""
+
+    model: Type[Models.BaseModel]
+    mapper: Callable[[Any], Any]
+    key: str = "id"
+    options: Tuple[Any, ...] = ()
+
+################################################################################
+CHANGE_KINDS: Dict[str, ChangeKind] = {
+    "configuration": ChangeKind(Models.GuildConfigurationModel, Schemas.GuildConfigurationSchema.model_validate, key="guild_id"),
+    "embeds": ChangeKind(Models.EmbedModel, map_embed, options=(
+        selectinload(Models.EmbedModel.images),
+        selectinload(Models.EmbedModel.header),
+        selectinload(Models.EmbedModel.footer),
+        selectinload(Models.EmbedModel.fields),
+    )),
+    "forms": ChangeKind(Models.FormModel, map_form, options=(
+        selectinload(Models.FormModel.post_options),
+        selectinload(Models.FormModel.questions).selectinload(Models.FormQuestionModel.responses),
+        selectinload(Models.FormModel.questions).selectinload(Models.FormQuestionModel.options),
+        selectinload(Models.FormModel.questions).selectinload(Models.FormQuestionModel.prompts),
+        selectinload(Models.FormModel.response_collections),
+        selectinload(Models.FormModel.prompts),
+    )),
+    "giveaway_mgr": ChangeKind(Models.GiveawayManagerModel, Schemas.ShallowGiveawayManagerSchema.model_validate, key="guild_id"),
+    "giveaways": ChangeKind(Models.GiveawayModel, Schemas.DeepGiveawaySchema.model_validate, options=(
+        selectinload(Models.GiveawayModel.details),
+        selectinload(Models.GiveawayModel.entries),
+    )),
+    "glyph_messages": ChangeKind(Models.GlyphMessageModel, Schemas.GlyphMessageSchema.model_validate),
+    "positions": ChangeKind(Models.PositionModel, Schemas.PositionSchema.model_validate),
+    "profile_requirements": ChangeKind(Models.ProfileRequirementsModel, Schemas.ProfileRequirementsSchema.model_validate, key="guild_id"),
+    "profile_channel_groups": ChangeKind(Models.ProfileChannelGroupModel, Schemas.ProfileChannelGroupSchema.model_validate),
+    "profiles": ChangeKind(Models.ProfileModel, Schemas.DeepProfileSchema.model_validate, options=(
+        selectinload(Models.ProfileModel.details),
+        selectinload(Models.ProfileModel.ataglance),
+        selectinload(Models.ProfileModel.personality),
+        selectinload(Models.ProfileModel.images).selectinload(Models.ProfileImagesModel.addl_images),
+    )),
+    "raffle_mgr": ChangeKind(Models.RaffleManagerModel, Schemas.ShallowRaffleManagerSchema.model_validate, key="guild_id"),
+    "raffles": ChangeKind(Models.RaffleModel, Schemas.DeepRaffleSchema.model_validate, options=(
+        selectinload(Models.RaffleModel.entries),
+    )),
+    "reaction_roles_mgr": ChangeKind(Models.ReactionRoleManagerModel, Schemas.ShallowReactionRoleManagerShema.model_validate, key="guild_id"),
+    "reaction_role_messages": ChangeKind(Models.ReactionRoleMessageModel, Schemas.DeepReactionRoleMessageSchema.model_validate, options=(
+        selectinload(Models.ReactionRoleMessageModel.roles),
+    )),
+}
+
+################################################################################
+# A step from a child row up to its parent: the child's model and the column
+# holding the parent's ID.
+Hop = Tuple[Type[Models.BaseModel], str]
+
+@dataclass(frozen=True)
+class AuditTarget:
+    """
+    How an audit log target maps onto a ``CHANGE_KINDS`` entry. Without chains
+    the target ID already is the entity's key; otherwise each chain of hops
+    leads from the target up to the entity, and chains that run into a NULL
+    column are skipped.
+    """
+
+    kind: str
+    chains: Tuple[Tuple[Hop, ...], ...] = ()
+
+################################################################################
+AUDIT_TARGETS: Dict[str, AuditTarget] = {
+    "GuildConfiguration": AuditTarget("configuration"),
+    "Embed": AuditTarget("embeds"),
+    "EmbedImages": AuditTarget("embeds"),
+    "EmbedHeader": AuditTarget("embeds"),
+    "EmbedFooter": AuditTarget("embeds"),
+    "EmbedField": AuditTarget("embeds", (((Models.EmbedFieldModel, "embed_id"),),)),
+    "Form": AuditTarget("forms"),
+    "FormPostOptions": AuditTarget("forms"),
+    "FormResponseCollection": AuditTarget("forms", (((Models.FormResponseCollectionModel, "form_id"),),)),
+    "FormQuestion": AuditTarget("forms", (((Models.FormQuestionModel, "form_id"),),)),
+    "FormQuestionOption": AuditTarget("forms", (
+        ((Models.FormQuestionOptionModel, "question_id"), (Models.FormQuestionModel, "form_id")),
+    )),
+    "FormQuestionResponse": AuditTarget("forms", (
+        ((Models.FormQuestionResponseModel, "question_id"), (Models.FormQuestionModel, "form_id")),
+    )),
+    # Prompts belong either to a form or to one of its questions.
+    "FormPrompt": AuditTarget("forms", (
+        ((Models.FormPromptModel, "form_id"),),
+        ((Models.FormPromptModel, "question_id"), (Models.FormQuestionModel, "form_id")),
+    )),
+    "GiveawayManager": AuditTarget("giveaway_mgr"),
+    "Giveaway": AuditTarget("giveaways"),
+    "GiveawayDetails": AuditTarget("giveaways"),
+    "GiveawayEntry": AuditTarget("giveaways", (((Models.GiveawayEntryModel, "giveaway_id"),),)),
+    "GlyphMessage": AuditTarget("glyph_messages"),
+    "Position": AuditTarget("positions"),
+    "ProfileRequirements": AuditTarget("profile_requirements"),
+    "ProfileChannelGroup": AuditTarget("profile_channel_groups"),
+    "Profile": AuditTarget("profiles"),
+    "ProfileDetails": AuditTarget("profiles"),
+    "ProfileAtAGlance": AuditTarget("profiles"),
+    "ProfilePersonality": AuditTarget("profiles"),
+    "ProfileImages": AuditTarget("profiles"),
+    "ProfileAdditionalImage": AuditTarget("profiles", (((Models.ProfileAdditionalImageModel, "profile_id"),),)),
+    "RaffleManager": AuditTarget("raffle_mgr"),
+    "Raffle": AuditTarget("raffles"),
+    "RaffleEntry": AuditTarget("raffles", (((Models.RaffleEntryModel, "raffle_id"),),)),
+    "ReactionRoleManager": AuditTarget("reaction_roles_mgr"),
+    "ReactionRoleMessage": AuditTarget("reaction_role_messages"),
+    "ReactionRole": AuditTarget("reaction_role_messages", (((Models.ReactionRoleModel, "message_id"),),)),
+}
+
+################################################################################
+# Helper Functions
+################################################################################
+def _batches(ids: Iterable[int]) -> Iterable[List[int]]:
+
+    ids = sorted(ids)
+    for i in range(0, len(ids), LOAD_BATCH_SIZE):
+        yield ids[i:i + LOAD_BATCH_SIZE]
+
+################################################################################
+async def resolve_parents(db: AsyncSession, pending: List[Tuple[str, Tuple[Hop, ...], int]]) -> Dict[str, Set[int]]:
+    """
+    Walk each (kind, hops, id) up its hops to the entity it belongs to. Every
+    step is a single batched lookup per child model, however many entries need
+    it. Rows that no longer exist are dropped: whatever removed them wrote its
+    own audit entry.
+    """
+
+    roots: Dict[str, Set[int]] = defaultdict(set)
+    while pending:
+        lookups: Dict[Hop, Set[int]] = defaultdict(set)
+        for kind, hops, obj_id in pending:
+            if not hops:
+                roots[kind].add(obj_id)
+            else:
+                lookups[hops[0]].add(obj_id)
+
+        parents: Dict[Hop, Dict[int, Any]] = {}
+        for (model, column), ids in lookups.items():
+            found = {}
+            for batch in _batches(ids):
+                rows = await db.execute(select(model.id, getattr(model, column)).filter(model.id.in_(batch)))
+                found.update({child_id: parent_id for child_id, parent_id in rows})
+            parents[(model, column)] = found
+
+        pending = [
+            (kind, hops[1:], parents[hops[0]][obj_id])
+            for kind, hops, obj_id in pending
+            if hops and parents[hops[0]].get(obj_id) is not None
+        ]
+
+    return roots
+
+################################################################################
+async def load_changed_entities(deps: Dependencies, kind: str, keys: Set[int]) -> Dict[int, Any]:
+    """Load the current state of the given entities, one IN-list query per batch."""
+
+    spec = CHANGE_KINDS[kind]
+    key_column = getattr(spec.model, spec.key)
+
+    loaded = {}
+    for batch in _batches(keys):
+        query = select(spec.model).filter(spec.model.guild_id == deps.guild_id, key_column.in_(batch))
+        for obj in (await deps.db.scalars(query.options(*spec.options))).all():
+            loaded[getattr(obj, spec.key)] = spec.mapper(obj)
+
+    return loaded
+
+################################################################################
+# GET Requests
+################################################################################
+@router.get("/", response_model=Schemas.GuildChangesSchema, summary="Get everything that changed in the guild after a revision")
+async def get_guild_changes(
+    since: int = Query(..., ge=0, description="The guild revision the caller is up to date with"),
+    deps: Dependencies = Depends(get_read_dependencies)
+) -> Schemas.GuildChangesSchema:
+
+    audit = Models.AuditLogModel
+
+    # Entries older than the retention window are gone, so a caller that far
+    # behind can't be brought up to date from the log.
+    oldest = await deps.db.scalar(select(func.min(audit.revision)).filter(audit.guild_id == deps.guild_id))
+    if oldest is not None and since < oldest - 1:
+        raise HTTPException(
+            status_code=410,
+            detail=f"Revision {since} is older than the audit log; reload the guild snapshot instead"
+        )
+
+    entries = (await deps.db.execute(
+        select(audit.target, audit.target_id, audit.action, audit.changes, audit.revision)
+        .filter(audit.guild_id == deps.guild_id, audit.revision > since)
+    )).all()
+
+    # Every entity touched since the revision, whatever happened to it; its
+    # current state (or absence) decides whether it is reported as changed or
+    # deleted, which also coalesces repeated edits into one.
+    touched: Dict[str, Set[int]] = defaultdict(set)
+    resync: Set[str] = set()
+    pending: List[Tuple[str, Tuple[Hop, ...], int]] = []
+
+    for entry in entries:
+        target = AUDIT_TARGETS.get(entry.target)
+        if target is None:
+            continue
+
+        if not target.chains:
+            touched[target.kind].add(entry.target_id)
+            continue
+
+        if entry.action != "Delete":
+            pending.extend((target.kind, hops, entry.target_id) for hops in target.chains)
+            continue
+
+        # The row is gone, but its tombstone still names the parent.
+        parent_ids = [
+            ((entry.changes or {}).get(hops[0][1]) or {}).get("old")
+            for hops in target.chains
+        ]
+        if all(parent_id is None for parent_id in parent_ids):
+            # Deleted before tombstones were recorded.
+            resync.add(target.kind)
+        pending.extend(
+            (target.kind, hops[1:], parent_id)
+            for hops, parent_id in zip(target.chains, parent_ids)
+            if parent_id is not None
+        )
+
+    for kind, ids in (await resolve_parents(deps.db, pending)).items():
+        touched[kind] |= ids
+
+    changed: Dict[str, List[Any]] = {}
+    deleted: Dict[str, List[int]] = {}
+    for kind in CHANGE_KINDS:
+        if kind in resync or not touched[kind]:
+            continue
+        loaded = await load_changed_entities(deps, kind, touched[kind])
+        if loaded:
+            changed[kind] = [loaded[key] for key in sorted(loaded)]
+        if gone := touched[kind] - loaded.keys():
+            deleted[kind] = sorted(gone)
+
+    return Schemas.GuildChangesSchema(
+        guild_id=deps.guild_id,
+        since=since,
+        revision=max((e.revision for e in entries), default=since),
+        changed=changed,
+        deleted=deleted,
+        resync=sorted(resync)
+    )
+
+################################################################################
@@ -1,14 +1,20 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import List, Type, TypeVar, Any, Dict, Union, Literal, Optional
+from functools import lru_cache
+from typing import List, Type, TypeVar, Any, Dict, Union, Literal, Optional, Tuple
 
 from fastapi import HTTPException
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy import inspect
-from sqlalchemy.orm import Session
+from sqlalchemy import Insert, inspect, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Mapper
 
+from App.audit import queue_audit_entry
 from App.dependencies import Dependencies
+from App.revisions import mark_guild_changed
+from App.tracing import current_request_id
 from .. import Models, Schemas
 ################################################################################
 
@@ -20,9 +26,12 @@ __all__ = (
     "apply_updates",
     "next_sort_order",
     "build_audit_log_changes",
+    "build_audit_log_tombstone",
     "audit_log_create",
     "audit_log_update",
     "audit_log_delete",
+    "audit_log_bulk",
+    "dialect_insert",
     "match_or_403",
 )
 
@@ -77,9 +86,9 @@ def map_form_question(q: Union[Models.FormQuestionModel, Type[Models.FormQuestio
     })
 
 ################################################################################
-def get_shallow_or_404(db: Session, model: Type[T], **filters) -> T:
+async def get_shallow_or_404(db: AsyncSession, model: Type[T], **filters) -> T:
 
-    item = db.query(model).filter_by(**filters).first()
+    item = await db.scalar(select(model).filter_by(**filters))
     if not item:
         raise HTTPException(
             status_code=404,
@@ -107,46 +116,90 @@ def next_sort_order(opts: List[Union[Models.BaseModel, Type[Models.BaseModel]]])
 
     return next((i for i, order in enumerate(range(len(opts))) if i != order), len(opts))
 
+################################################################################
+@lru_cache(maxsize=None)
+def _audit_diff_plan(mapper: Mapper) -> Tuple[str, ...]:
+    """The column attribute keys worth diffing for a mapper, computed once per model."""
+
+    return tuple(prop.key for prop in mapper.column_attrs)
+
 ################################################################################
 def build_audit_log_changes(obj: Any) -> Dict[str, Any]:
 
     changes = {}
     state = inspect(obj)
 
-    for attr in state.attrs:
-        if not attr.history.has_changes():
+    # Only attributes touched since the last load/flush can carry history, and
+    # relationships are never recorded, so most objects need no lookups at all.
+    modified = state.committed_state
+    if not modified:
+        return changes
+
+    for key in _audit_diff_plan(state.mapper):
+        if key not in modified:
             continue
+        history = state.attrs[key].history
         old, new = None, None
         # history.deleted/new hold previous/current values in lists
-        if attr.history.deleted:
-            old = attr.history.deleted[0]
-        if attr.history.added:
-            new = attr.history.added[0]
+        if history.deleted:
+            old = history.deleted[0]
+        if history.added:
+            new = history.added[0]
         if old != new:
-            changes[attr.key] = {"old": old, "new": new}
+            changes[key] = {"old": old, "new": new}
 
     return changes
 
+################################################################################
+def build_audit_log_tombstone(obj: Any) -> Dict[str, Any]:
+    """
+    The loaded column values of an object being deleted, recorded as changes to
+    None so the entry still says what the object belonged to.
+    """
+
+    state = inspect(obj)
+    return {
+        key: {"old": state.dict[key], "new": None}
+        for key in _audit_diff_plan(state.mapper)
+        if state.dict.get(key) is not None
+    }
+
 ################################################################################
 def _record_audit_log_item(
     guild_id: int,
-    db: Session,
+    db: AsyncSession,
     obj: Any,
     target_id: int,
     op: Literal["Create", "Update", "Delete"],
     actor_id: int,
 ) -> None:
 
-    action = Models.AuditLogModel(
-        guild_id=guild_id,
-        target=obj.__class__.__name__.removesuffix("Model"),
-        target_id=target_id,
-        action=op,
-        user_id=actor_id,
-        changes=jsonable_encoder(build_audit_log_changes(obj)),
-        request_id=None
-    )
-    db.add(action)
+    changes = build_audit_log_tombstone(obj) if op == "Delete" else build_audit_log_changes(obj)
+    _write_audit_log_entry(guild_id, db, obj.__class__.__name__.removesuffix("Model"), target_id, op, actor_id, changes)
+
+################################################################################
+def _write_audit_log_entry(
+    guild_id: int,
+    db: AsyncSession,
+    target: str,
+    target_id: int,
+    op: Literal["Create", "Update", "Delete"],
+    actor_id: int,
+    changes: Dict[str, Any],
+) -> None:
+
+    entry = {
+        "guild_id": guild_id,
+        "target": target,
+        "target_id": target_id,
+        "action": op,
+        "user_id": actor_id,
+        "changes": jsonable_encoder(changes),
+        "request_id": current_request_id(),
+    }
+    mark_guild_changed(db.sync_session, guild_id)
+    # Written once the transaction commits and the entry has its revision.
+    queue_audit_entry(db.sync_session, entry)
 
 ################################################################################
 def audit_log_create(deps: Dependencies, obj: Any, target_id: int) -> None:
@@ -167,3 +220,25 @@ def audit_log_delete(deps: Dependencies, obj: Any, target_id: int) -> None:
     _record_audit_log_item(deps.guild_id, deps.db, obj, target_id, "Delete", deps.actor_id)
 
 ################################################################################
+def audit_log_bulk(
+    deps: Dependencies,
+    model: Type[Models.BaseModel],
+    target_id: int,
+    op: Literal["Create", "Update", "Delete"],
+    changes: Dict[str, Any],
+) -> None:
+    """Records a single audit log entry summarizing a bulk operation on ``model`` rows."""
+
+    _write_audit_log_entry(deps.guild_id, deps.db, model.__name__.removesuffix("Model"), target_id, op, deps.actor_id, changes)
+
+################################################################################
+def dialect_insert(db: AsyncSession, model: Type[Models.BaseModel]) -> Insert:
+    """
+    An INSERT for the session's database dialect, which supports
+    ``on_conflict_do_nothing()`` on both Postgres and SQLite.
+    """
+
+    dialect = postgresql if db.get_bind().dialect.name == "postgresql" else sqlite
+    return dialect.insert(model)
+
+################################################################################
@@ -3,23 +3,26 @@ from __future__ import annotations
 from typing import List, Union, Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Response, Query
+from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from .Common import *
 from .. import Models, Schemas
-from ..dependencies import get_dependencies, Dependencies
+from ..dependencies import get_dependencies, get_read_dependencies, get_conditional_read_dependencies, get_page, Dependencies, Page
+from ..responses import SchemaRoute
 ################################################################################
 
-router = APIRouter(prefix="/embeds", tags=["Custom Embed Management"])
+router = APIRouter(prefix="/embeds", tags=["Custom Embed Management"], route_class=SchemaRoute)
 
 ################################################################################
-def full_embed_select(
+async def full_embed_select(
     deps: Dependencies,
     mode: Literal["All", "Single"] = "Single",
-    embed_id: Optional[int] = None
+    embed_id: Optional[int] = None,
+    page: Optional[Page] = None
 ):
 
-    query = deps.db.query(Models.EmbedModel).filter_by(guild_id=deps.guild_id).options(
+    query = select(Models.EmbedModel).filter_by(guild_id=deps.guild_id).options(
         selectinload(Models.EmbedModel.images),
         selectinload(Models.EmbedModel.header),
         selectinload(Models.EmbedModel.footer),
@@ -27,45 +30,50 @@ def full_embed_select(
     )
 
     if mode == "All":
-        return query.all()
+        if page is not None:
+            return await page.load(deps.db, query, Models.EmbedModel.id)
+        return (await deps.db.scalars(query)).all()
     elif mode == "Single":
         assert embed_id is not None
-        return query.filter_by(id=embed_id).first()
+        return await deps.db.scalar(query.filter_by(id=embed_id))
 
 ################################################################################
 # GET Requests
 ################################################################################
 @router.get("/", response_model=List[Schemas.DeepEmbedSchema])
-def get_embeds(deps: Dependencies = Depends(get_dependencies)) -> List[Schemas.DeepEmbedSchema]:
+async def get_embeds(
+    page: Page = Depends(get_page),
+    deps: Dependencies = Depends(get_conditional_read_dependencies)
+) -> List[Schemas.DeepEmbedSchema]:
 
-    embeds = full_embed_select(deps, "All")
+    embeds = await full_embed_select(deps, "All", page=page)
     return [map_embed(embed) for embed in embeds]
 
 ################################################################################
 @router.get("/{embed_id}", response_model=Schemas.DeepEmbedSchema)
-def get_embed(
+async def get_embed(
     embed_id: int,
-    deps: Dependencies = Depends(get_dependencies)
+    deps: Dependencies = Depends(get_read_dependencies)
 ) -> Schemas.DeepEmbedSchema:
 
-    embed = get_shallow_or_404(deps.db, Models.EmbedModel, id=embed_id)
+    embed = await get_shallow_or_404(deps.db, Models.EmbedModel, id=embed_id)
     match_or_403(deps.guild_id, embed.guild_id)
 
-    embed = full_embed_select(deps, "Single", embed_id=embed.id)
+    embed = await full_embed_select(deps, "Single", embed_id=embed.id)
     return map_embed(embed)
 
 ################################################################################
 @router.get("/{embed_id}/fields/{field_id}", response_model=Schemas.EmbedFieldSchema)
-def get_embed_field(
+async def get_embed_field(
     embed_id: int,
     field_id: int,
-    deps: Dependencies = Depends(get_dependencies)
+    deps: Dependencies = Depends(get_read_dependencies)
 ) -> Schemas.EmbedFieldSchema:
 
-    embed = get_shallow_or_404(deps.db, Models.EmbedModel, id=embed_id)
+    embed = await get_shallow_or_404(deps.db, Models.EmbedModel, id=embed_id)
     match_or_403(deps.guild_id, embed.guild_id)
 
-    field = get_shallow_or_404(deps.db, Models.EmbedFieldModel, id=field_id)
+    field = await get_shallow_or_404(deps.db, Models.EmbedFieldModel, id=field_id)
     match_or_403(embed.id, field.embed_id)
 
     return Schemas.EmbedFieldSchema.model_validate(field)
@@ -74,13 +82,13 @@ def get_embed_field(
 # POST Requests
 ################################################################################
 @router.post("/", status_code=201, response_model=Schemas.DeepEmbedSchema)
-def create_embed(
+async def create_embed(
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.DeepEmbedSchema:
 
     new_embed = Models.EmbedModel(guild_id=deps.guild_id)
     deps.db.add(new_embed)
-    deps.db.flush()
+    await deps.db.flush()
 
     audit_log_create(deps, new_embed, new_embed.id)
 
@@ -89,22 +97,22 @@ def create_embed(
         Models.EmbedHeaderModel(embed_id=new_embed.id),
         Models.EmbedFooterModel(embed_id=new_embed.id)
     ])
-    deps.db.flush()
+    await deps.db.flush()
 
-    created = full_embed_select(deps, "Single", embed_id=new_embed.id)
+    created = await full_embed_select(deps, "Single", embed_id=new_embed.id)
     return map_embed(created)
 
 ################################################################################
 @router.post("/{embed_id}/fields", status_code=201, response_model=Schemas.EmbedFieldSchema)
-def create_embed_field(
+async def create_embed_field(
     embed_id: int,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.EmbedFieldSchema:
 
-    embed = get_shallow_or_404(deps.db, Models.EmbedModel, id=embed_id)
+    embed = await get_shallow_or_404(deps.db, Models.EmbedModel, id=embed_id)
     match_or_403(deps.guild_id, embed.guild_id)
 
-    current_fields = deps.db.query(Models.EmbedFieldModel).filter(Models.EmbedFieldModel.embed_id == embed.id).all()
+    current_fields = (await deps.db.scalars(select(Models.EmbedFieldModel).filter(Models.EmbedFieldModel.embed_id == embed.id))).all()
     current_fields.sort(key=lambda x: x.sort_order)
 
     sort_order = next_sort_order(current_fields)
@@ -112,8 +120,8 @@ def create_embed_field(
     new_field = Models.EmbedFieldModel(embed_id=embed.id, sort_order=sort_order)
 
     deps.db.add(new_field)
-    deps.db.flush()
-    deps.db.refresh(new_field)
+    await deps.db.flush()
+    await deps.db.refresh(new_field)
 
     audit_log_create(deps, new_field, new_field.id)
     return Schemas.EmbedFieldSchema.model_validate(new_field)
@@ -122,34 +130,34 @@ def create_embed_field(
 # DELETE Requests
 ################################################################################
 @router.delete("/{embed_id}", status_code=204)
-def delete_embed(embed_id: int, deps: Dependencies = Depends(get_dependencies)) -> Response:
+async def delete_embed(embed_id: int, deps: Dependencies = Depends(get_dependencies)) -> Response:
 
-    embed = get_shallow_or_404(deps.db, Models.EmbedModel, id=embed_id)
+    embed = await get_shallow_or_404(deps.db, Models.EmbedModel, id=embed_id)
     match_or_403(deps.guild_id, embed.guild_id)
 
-    deps.db.delete(embed)
-    audit_log_delete(deps, embed, deps.actor_id)
-    deps.db.flush()
+    await deps.db.delete(embed)
+    audit_log_delete(deps, embed, embed.id)
+    await deps.db.flush()
 
     return Response(status_code=204)
 
 ################################################################################
 @router.delete("/{embed_id}/fields/{field_id}", status_code=204)
-def delete_embed_field(
+async def delete_embed_field(
     embed_id: int,
     field_id: int,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Response:
 
-    embed = get_shallow_or_404(deps.db, Models.EmbedModel, id=embed_id)
+    embed = await get_shallow_or_404(deps.db, Models.EmbedModel, id=embed_id)
     match_or_403(deps.guild_id, embed.guild_id)
 
-    field = get_shallow_or_404(deps.db, Models.EmbedFieldModel, id=field_id)
+    field = await get_shallow_or_404(deps.db, Models.EmbedFieldModel, id=field_id)
     match_or_403(embed.id, field.embed_id)
 
-    deps.db.delete(field)
-    audit_log_delete(deps, field, deps.actor_id)
-    deps.db.flush()
+    await deps.db.delete(field)
+    audit_log_delete(deps, field, field.id)
+    await deps.db.flush()
 
     return Response(status_code=204)
 
@@ -157,115 +165,115 @@ def delete_embed_field(
 # PATCH Requests
 ################################################################################
 @router.patch("/{embed_id}", response_model=Schemas.DeepEmbedSchema)
-def patch_embed(
+async def patch_embed(
     embed_id: int,
     data: Schemas.EmbedUpdateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.DeepEmbedSchema:
 
-    embed = get_shallow_or_404(deps.db, Models.EmbedModel, id=embed_id)
+    embed = await get_shallow_or_404(deps.db, Models.EmbedModel, id=embed_id)
     match_or_403(deps.guild_id, embed.guild_id)
 
     apply_updates(embed, data)
     audit_log_update(deps, embed, embed.id)
 
-    deps.db.flush()
-    deps.db.refresh(embed)
+    await deps.db.flush()
+    await deps.db.refresh(embed)
 
-    embed = full_embed_select(deps, "Single", embed_id=embed.id)
+    embed = await full_embed_select(deps, "Single", embed_id=embed.id)
     return map_embed(embed)
 
 ################################################################################
 @router.patch("/{embed_id}/images", response_model=Schemas.EmbedImagesSchema)
-def patch_embed_images(
+async def patch_embed_images(
     embed_id: int,
     data: Schemas.EmbedImagesUpdateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.EmbedImagesSchema:
 
-    embed = get_shallow_or_404(deps.db, Models.EmbedModel, id=embed_id)
+    embed = await get_shallow_or_404(deps.db, Models.EmbedModel, id=embed_id)
     match_or_403(deps.guild_id, embed.guild_id)
 
-    images = get_shallow_or_404(deps.db, Models.EmbedImagesModel, embed_id=embed_id)
+    images = await get_shallow_or_404(deps.db, Models.EmbedImagesModel, embed_id=embed_id)
     match_or_403(embed.id, images.embed_id)
 
     apply_updates(images, data)
     audit_log_update(deps, images, embed.id)
 
-    deps.db.flush()
-    deps.db.refresh(images)
+    await deps.db.flush()
+    await deps.db.refresh(images)
 
     return Schemas.EmbedImagesSchema.model_validate(images)
 
 ################################################################################
 @router.patch("/{embed_id}/header", response_model=Schemas.EmbedHeaderSchema)
-def patch_embed_header(
+async def patch_embed_header(
     embed_id: int,
     data: Schemas.EmbedHeaderUpdateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.EmbedHeaderSchema:
 
-    embed = get_shallow_or_404(deps.db, Models.EmbedModel, id=embed_id)
+    embed = await get_shallow_or_404(deps.db, Models.EmbedModel, id=embed_id)
     match_or_403(deps.guild_id, embed.guild_id)
 
-    header = get_shallow_or_404(deps.db, Models.EmbedHeaderModel, embed_id=embed_id)
+    header = await get_shallow_or_404(deps.db, Models.EmbedHeaderModel, embed_id=embed_id)
     match_or_403(embed.id, header.embed_id)
 
     apply_updates(header, data)
     audit_log_update(deps, header, embed.id)
 
-    deps.db.flush()
-    deps.db.refresh(header)
+    await deps.db.flush()
+    await deps.db.refresh(header)
 
     return Schemas.EmbedHeaderSchema.model_validate(header)
 
 ################################################################################
 @router.patch("/{embed_id}/footer", response_model=Schemas.EmbedFooterSchema)
-def patch_embed_footer(
+async def patch_embed_footer(
     embed_id: int,
     data: Schemas.EmbedFooterUpdateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.EmbedFooterSchema:
 
-    embed = get_shallow_or_404(deps.db, Models.EmbedModel, id=embed_id)
+    embed = await get_shallow_or_404(deps.db, Models.EmbedModel, id=embed_id)
     match_or_403(deps.guild_id, embed.guild_id)
 
-    footer = get_shallow_or_404(deps.db, Models.EmbedFooterModel, embed_id=embed_id)
+    footer = await get_shallow_or_404(deps.db, Models.EmbedFooterModel, embed_id=embed_id)
     match_or_403(embed.id, footer.embed_id)
 
     apply_updates(footer, data)
     audit_log_update(deps, footer, embed.id)
 
-    deps.db.flush()
-    deps.db.refresh(footer)
+    await deps.db.flush()
+    await deps.db.refresh(footer)
 
     return Schemas.EmbedFooterSchema.model_validate(footer)
 
 ################################################################################
 @router.patch("/{embed_id}/fields/{field_id}", response_model=Schemas.EmbedFieldSchema)
-def patch_embed_field(
+async def patch_embed_field(
     embed_id: int,
     field_id: int,
     data: Schemas.EmbedFieldUpdateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.EmbedFieldSchema:
 
-    embed = get_shallow_or_404(deps.db, Models.EmbedModel, id=embed_id)
+    embed = await get_shallow_or_404(deps.db, Models.EmbedModel, id=embed_id)
     match_or_403(deps.guild_id, embed.guild_id)
 
-    field = get_shallow_or_404(deps.db, Models.EmbedFieldModel, id=field_id)
+    field = await get_shallow_or_404(deps.db, Models.EmbedFieldModel, id=field_id)
     match_or_403(embed.id, field.embed_id)
 
     if data.sort_order is not None:
-        exists = deps.db.query(Models.EmbedFieldModel).filter_by(embed_id=embed_id, sort_order=data.sort_order).first()
+        exists = await deps.db.scalar(select(Models.EmbedFieldModel).filter_by(embed_id=embed_id, sort_order=data.sort_order))
         if exists and exists.id != field_id:
             raise HTTPException(status_code=409, detail=f"Sort order {data.sort_order} already exists for another field in this embed")
 
     apply_updates(field, data)
-    audit_log_update(deps, field, embed.id)
+    audit_log_update(deps, field, field.id)
 
-    deps.db.flush()
-    deps.db.refresh(field)
+    await deps.db.flush()
+    await deps.db.refresh(field)
 
     return Schemas.EmbedFieldSchema.model_validate(field)
 
@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import json
+from typing import Any, AsyncIterator, Dict, Optional
+
+from fastapi import APIRouter, Depends, Header
+from fastapi.responses import StreamingResponse
+
+from ..config import settings
+from ..dependencies import get_read_dependencies, Dependencies
+from ..events import ChangeSubscription, change_feed
+from ..responses import SchemaRoute
+from ..revisions import get_guild_revision
+################################################################################
+
+router = APIRouter(prefix="/events", tags=["Change Feed"], route_class=SchemaRoute)
+
+################################################################################
+# Helper Functions
+################################################################################
+def sse_message(notification: Dict[str, Any]) -> str:
+    """
+    Format a notification as a server-sent event named after its type. Events
+    that carry a revision use it as their ID, so a reconnecting client's
+    Last-Event-ID tells us how far it got.
+    """
+
+    lines = [f"event: {notification['type']}"]
+    if notification.get("revision") is not None:
+        lines.append(f"id: {notification['revision']}")
+    lines.append(f"data: {json.dumps(notification)}")
+    return "\n".join(lines) + "\n\n"
+
+################################################################################
+async def stream_guild_events(
+    subscription: ChangeSubscription,
+    first: Dict[str, Any],
+    keepalive: float
+) -> AsyncIterator[str]:
+
+    try:
+        yield sse_message(first)
+        while True:
+            notification = await subscription.get(keepalive)
+            # Comments keep idle connections from being closed by proxies.
+            yield ": keepalive\n\n" if notification is None else sse_message(notification)
+    finally:
+        subscription.close()
+
+################################################################################
+# GET Requests
+################################################################################
+@router.get("/", summary="Stream the guild's change notifications as server-sent events", response_class=StreamingResponse)
+async def get_guild_events(
+    last_event_id: Optional[int] = Header(None, convert_underscores=False, alias="Last-Event-ID"),
+    deps: Dependencies = Depends(get_read_dependencies)
+) -> StreamingResponse:
+    """
+    Opens with a ``ready`` event carrying the guild's current revision, or a
+    ``resync`` event if the Last-Event-ID the client reconnected with is behind
+    it. Every committed write then sends a ``change`` event listing what was
+    touched; fetch /changes since the previous revision to apply it. A
+    ``resync`` event means notifications were dropped and the client should
+    delta sync from the last revision it applied.
+    """
+
+    # Subscribe before reading the revision, so no commit falls in between.
+    subscription = change_feed.subscribe(deps.guild_id)
+    try:
+        revision = await get_guild_revision(deps.db, deps.guild_id)
+    except BaseException:
+        subscription.close()
+        raise
+
+    first = {"type": "ready", "guild_id": deps.guild_id, "revision": revision}
+    if last_event_id is not None and last_event_id < revision:
+        first.update(type="resync", since=last_event_id)
+
+    # The read session is released before streaming starts; the feed needs no database.
+    return StreamingResponse(
+        stream_guild_events(subscription, first, settings.CHANGE_FEED_KEEPALIVE),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+################################################################################
@@ -3,117 +3,174 @@ from __future__ import annotations
 from typing import List, Union, Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Response, Query
+from sqlalchemy import select
 from sqlalchemy.orm import selectinload
 
 from .Common import *
 from .. import Models, Schemas
-from ..dependencies import get_dependencies, Dependencies
+from ..dependencies import get_dependencies, get_read_dependencies, get_conditional_read_dependencies, get_page, Dependencies, Page
+from ..fieldsets import get_fieldset, FieldSet, Nested, Selection, Shape
+from ..responses import SchemaRoute
 ################################################################################
 
-router = APIRouter(prefix="/forms", tags=["Fillable Forms"])
+router = APIRouter(prefix="/forms", tags=["Fillable Forms"], route_class=SchemaRoute)
 
 ################################################################################
-def full_form_select(
+def _prompt(prompts: List[Models.FormPromptModel], prompt_type: int) -> Models.FormPromptModel:
+
+    # Prompts: 0 -> Pre, 1 -> Post
+    return next(prompt for prompt in prompts if prompt.prompt_type == prompt_type)
+
+PROMPT_SHAPE = Shape(Schemas.FormPromptSchema, Models.FormPromptModel, requires=("prompt_type",))
+QUESTION_SHAPE = Shape(Schemas.DeepFormQuestionSchema, Models.FormQuestionModel, nested={
+    "options": Nested(
+        Models.FormQuestionModel.options,
+        Shape(Schemas.FormQuestionOptionSchema, Models.FormQuestionOptionModel)
+    ),
+    "responses": Nested(
+        Models.FormQuestionModel.responses,
+        Shape(Schemas.FormQuestionResponseSchema, Models.FormQuestionResponseModel)
+    ),
+    "pre_prompt": Nested(Models.FormQuestionModel.prompts, PROMPT_SHAPE, many=False, get=lambda q: _prompt(q.prompts, 0)),
+    "post_prompt": Nested(Models.FormQuestionModel.prompts, PROMPT_SHAPE, many=False, get=lambda q: _prompt(q.prompts, 1)),
+})
+FORM_SHAPE = Shape(Schemas.DeepFormSchema, Models.FormModel, nested={
+    "post_options": Nested(
+        Models.FormModel.post_options,
+        Shape(Schemas.FormPostOptionsSchema, Models.FormPostOptionsModel),
+        many=False
+    ),
+    "response_collections": Nested(
+        Models.FormModel.response_collections,
+        Shape(Schemas.FormResponseCollectionSchema, Models.FormResponseCollectionModel)
+    ),
+    "questions": Nested(Models.FormModel.questions, QUESTION_SHAPE),
+    "pre_prompt": Nested(Models.FormModel.prompts, PROMPT_SHAPE, many=False, get=lambda f: _prompt(f.prompts, 0)),
+    "post_prompt": Nested(Models.FormModel.prompts, PROMPT_SHAPE, many=False, get=lambda f: _prompt(f.prompts, 1)),
+})
+
+################################################################################
+async def full_form_select(
     deps: Dependencies,
     mode: Literal["All", "Single"] = "Single",
-    form_id: Optional[int] = None
+    form_id: Optional[int] = None,
+    page: Optional[Page] = None,
+    selection: Optional[Selection] = None
 ):
-
-    query = deps.db.query(Models.FormModel).filter_by(guild_id=deps.guild_id).options(
-        selectinload(Models.FormModel.post_options),
-        selectinload(Models.FormModel.questions).selectinload(Models.FormQuestionModel.responses),
-        selectinload(Models.FormModel.questions).selectinload(Models.FormQuestionModel.options),
-        selectinload(Models.FormModel.questions).selectinload(Models.FormQuestionModel.prompts),
-        selectinload(Models.FormModel.response_collections),
-        selectinload(Models.FormModel.prompts)
-    )
+    """With a selection, only the columns and children it names are loaded."""
+
+    query = select(Models.FormModel).filter_by(guild_id=deps.guild_id)
+    if selection is not None:
+        query = query.options(*selection.options())
+    else:
+        query = query.options(
+            selectinload(Models.FormModel.post_options),
+            selectinload(Models.FormModel.questions).selectinload(Models.FormQuestionModel.responses),
+            selectinload(Models.FormModel.questions).selectinload(Models.FormQuestionModel.options),
+            selectinload(Models.FormModel.questions).selectinload(Models.FormQuestionModel.prompts),
+            selectinload(Models.FormModel.response_collections),
+            selectinload(Models.FormModel.prompts)
+        )
 
     if mode == "All":
-        return query.all()
+        if page is not None:
+            return await page.load(deps.db, query, Models.FormModel.id)
+        return (await deps.db.scalars(query)).all()
     elif mode == "Single":
         assert form_id is not None
-        return query.filter_by(id=form_id).first()
+        return await deps.db.scalar(query.filter_by(id=form_id))
 
 ################################################################################
-def full_question_select(
+async def full_question_select(
     form_id: int,
     deps: Dependencies,
     mode: Literal["All", "Single"] = "Single",
     question_id: Optional[int] = None
 ):
 
-    query = deps.db.query(Models.FormQuestionModel).filter_by(form_id=form_id).options(
+    query = select(Models.FormQuestionModel).filter_by(form_id=form_id).options(
         selectinload(Models.FormQuestionModel.responses),
         selectinload(Models.FormQuestionModel.options),
         selectinload(Models.FormQuestionModel.prompts)
     )
 
     if mode == "All":
-        return query.all()
+        return (await deps.db.scalars(query)).all()
     elif mode == "Single":
         assert question_id is not None
-        return query.filter_by(id=question_id).first()
+        return await deps.db.scalar(query.filter_by(id=question_id))
 
 ################################################################################
 # GET Requests
 ################################################################################
 @router.get("/", response_model=List[Schemas.DeepFormSchema])
-def get_forms(deps: Dependencies = Depends(get_dependencies)) -> List[Schemas.DeepFormSchema]:
-
-    forms = full_form_select(deps, "All")
+async def get_forms(
+    page: Page = Depends(get_page),
+    fieldset: FieldSet = Depends(get_fieldset),
+    deps: Dependencies = Depends(get_conditional_read_dependencies)
+) -> List[Schemas.DeepFormSchema]:
+
+    selection = fieldset.select(FORM_SHAPE)
+    forms = await full_form_select(deps, "All", page=page, selection=selection)
+    if selection is not None:
+        return [selection.dump(form) for form in forms]
     return [map_form(form) for form in forms]
 
 ################################################################################
 @router.get("/{form_id}", response_model=Schemas.DeepFormSchema)
-def get_form(
+async def get_form(
     form_id: int,
-    deps: Dependencies = Depends(get_dependencies)
+    fieldset: FieldSet = Depends(get_fieldset),
+    deps: Dependencies = Depends(get_read_dependencies)
 ) -> Schemas.DeepFormSchema:
 
-    form = get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
+    form = await get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
     match_or_403(deps.guild_id, form.guild_id)
 
-    form = full_form_select(deps, "Single", form_id=form.id)
+    selection = fieldset.select(FORM_SHAPE)
+    form = await full_form_select(deps, "Single", form_id=form.id, selection=selection)
+    if selection is not None:
+        return selection.dump(form)
     return map_form(form)
 
 ################################################################################
 # POST Requests
 ################################################################################
 @router.post("/", status_code=201, response_model=Schemas.DeepFormSchema)
-def create_form(deps: Dependencies = Depends(get_dependencies)) -> Schemas.DeepFormSchema:
+async def create_form(deps: Dependencies = Depends(get_dependencies)) -> Schemas.DeepFormSchema:
 
     form = Models.FormModel(guild_id=deps.guild_id)
     deps.db.add(form)
-    deps.db.flush()
-    deps.db.refresh(form)
+    await deps.db.flush()
+    await deps.db.refresh(form)
 
     # Also add the post options and prompt table records
     post_opts = Models.FormPostOptionsModel(form_id=form.id)
     pre_prompt = Models.FormPromptModel(form_id=form.id, prompt_type=0)
     post_prompt = Models.FormPromptModel(form_id=form.id, prompt_type=1)
     deps.db.add_all([post_opts, pre_prompt, post_prompt])
-    deps.db.flush()
+    await deps.db.flush()
 
-    form = full_form_select(deps, "Single", form_id=form.id)
+    form = await full_form_select(deps, "Single", form_id=form.id)
     audit_log_create(deps, form, form.id)
 
     return map_form(form)
 
 ################################################################################
 @router.post("/{form_id}/response-collections", status_code=201, response_model=Schemas.FormResponseCollectionSchema)
-def create_form_response_collection(
+async def create_form_response_collection(
     form_id: int,
     data: Schemas.FormResponseCollectionCreateSchema,
     deps: Dependencies = Depends(get_dependencies),
 ) -> Schemas.FormResponseCollectionSchema:
 
-    form = get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
+    form = await get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
     match_or_403(deps.guild_id, form.guild_id)
 
     response_collection = Models.FormResponseCollectionModel(form_id=form.id, **data.model_dump())
     deps.db.add(response_collection)
-    deps.db.flush()
-    deps.db.refresh(response_collection)
+    await deps.db.flush()
+    await deps.db.refresh(response_collection)
 
     audit_log_create(deps, response_collection, response_collection.id)
 
@@ -121,54 +178,54 @@ def create_form_response_collection(
 
 ################################################################################
 @router.post("/{form_id}/questions", status_code=201, response_model=Schemas.DeepFormQuestionSchema)
-def create_form_question(
+async def create_form_question(
     form_id: int,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.DeepFormQuestionSchema:
 
-    form = get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
+    form = await get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
     match_or_403(deps.guild_id, form.guild_id)
 
-    existing = deps.db.query(Models.FormQuestionModel).filter_by(form_id=form.id).all()
+    existing = (await deps.db.scalars(select(Models.FormQuestionModel).filter_by(form_id=form.id))).all()
     existing.sort(key=lambda x: x.sort_order)
 
     new_question = Models.FormQuestionModel(form_id=form.id, sort_order=next_sort_order(existing))
     deps.db.add(new_question)
-    deps.db.flush()
-    deps.db.refresh(new_question)
+    await deps.db.flush()
+    await deps.db.refresh(new_question)
 
     pre_prompt = Models.FormPromptModel(question_id=new_question.id, prompt_type=0)
     post_prompt = Models.FormPromptModel(question_id=new_question.id, prompt_type=1)
 
     deps.db.add_all([pre_prompt, post_prompt])
-    deps.db.flush()
+    await deps.db.flush()
 
-    new_question = full_question_select(form.id, deps, "Single", question_id=new_question.id)
+    new_question = await full_question_select(form.id, deps, "Single", question_id=new_question.id)
     audit_log_create(deps, new_question, new_question.id)
 
     return map_form_question(new_question)
 
 ################################################################################
 @router.post("/{form_id}/questions/{question_id}/options", status_code=201, response_model=Schemas.FormQuestionOptionSchema)
-def create_form_question_option(
+async def create_form_question_option(
     form_id: int,
     question_id: int,
     deps: Dependencies = Depends(get_dependencies),
 ) -> Schemas.FormQuestionOptionSchema:
 
-    form = get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
+    form = await get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
     match_or_403(deps.guild_id, form.guild_id)
 
-    question = get_shallow_or_404(deps.db, Models.FormQuestionModel, id=question_id)
+    question = await get_shallow_or_404(deps.db, Models.FormQuestionModel, id=question_id)
     match_or_403(form.id, question.form_id)
 
-    existing = deps.db.query(Models.FormQuestionOptionModel).filter_by(question_id=question.id).all()
+    existing = (await deps.db.scalars(select(Models.FormQuestionOptionModel).filter_by(question_id=question.id))).all()
     existing.sort(key=lambda x: x.sort_order)
 
     option = Models.FormQuestionOptionModel(question_id=question.id, sort_order=next_sort_order(existing))
     deps.db.add(option)
-    deps.db.flush()
-    deps.db.refresh(option)
+    await deps.db.flush()
+    await deps.db.refresh(option)
 
     audit_log_create(deps, option, option.id)
 
@@ -176,23 +233,23 @@ def create_form_question_option(
 
 ################################################################################
 @router.post("/{form_id}/questions/{question_id}/responses", status_code=201, response_model=Schemas.FormQuestionResponseSchema)
-def create_form_question_response(
+async def create_form_question_response(
     form_id: int,
     question_id: int,
     data: Schemas.FormQuestionResponseCreateSchema,
     deps: Dependencies = Depends(get_dependencies),
 ) -> Schemas.FormQuestionResponseSchema:
 
-    form = get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
+    form = await get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
     match_or_403(deps.guild_id, form.guild_id)
 
-    question = get_shallow_or_404(deps.db, Models.FormQuestionModel, id=question_id)
+    question = await get_shallow_or_404(deps.db, Models.FormQuestionModel, id=question_id)
     match_or_403(form.id, question.form_id)
 
     response = Models.FormQuestionResponseModel(question_id=question.id, **data.model_dump())
     deps.db.add(response)
-    deps.db.flush()
-    deps.db.refresh(response)
+    await deps.db.flush()
+    await deps.db.refresh(response)
 
     audit_log_create(deps, response, response.id)
 
@@ -202,61 +259,61 @@ def create_form_question_response(
 # DELETE Requests
 ################################################################################
 @router.delete("/{form_id}", status_code=204)
-def delete_form(
+async def delete_form(
     form_id: int,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Response:
 
-    form = get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
+    form = await get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
     match_or_403(deps.guild_id, form.guild_id)
 
-    deps.db.delete(form)
+    await deps.db.delete(form)
     audit_log_delete(deps, form, form.id)
-    deps.db.flush()
+    await deps.db.flush()
 
     return Response(status_code=204)
 
 ################################################################################
 @router.delete("/{form_id}/questions/{question_id}", status_code=204)
-def delete_form_question(
+async def delete_form_question(
     form_id: int,
     question_id: int,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Response:
 
-    form = get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
+    form = await get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
     match_or_403(deps.guild_id, form.guild_id)
 
-    question = get_shallow_or_404(deps.db, Models.FormQuestionModel, id=question_id)
+    question = await get_shallow_or_404(deps.db, Models.FormQuestionModel, id=question_id)
     match_or_403(form.id, question.form_id)
 
-    deps.db.delete(question)
+    await deps.db.delete(question)
     audit_log_delete(deps, question, question.id)
-    deps.db.flush()
+    await deps.db.flush()
 
     return Response(status_code=204)
 
 ################################################################################
 @router.delete("/{form_id}/questions/{question_id}/options/{option_id}", status_code=204)
-def delete_form_question_option(
+async def delete_form_question_option(
     form_id: int,
     question_id: int,
     option_id: int,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Response:
 
-    form = get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
+    form = await get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
     match_or_403(deps.guild_id, form.guild_id)
 
-    question = get_shallow_or_404(deps.db, Models.FormQuestionModel, id=question_id)
+    question = await get_shallow_or_404(deps.db, Models.FormQuestionModel, id=question_id)
     match_or_403(form.id, question.form_id)
 
-    option = get_shallow_or_404(deps.db, Models.FormQuestionOptionModel, id=option_id)
+    option = await get_shallow_or_404(deps.db, Models.FormQuestionOptionModel, id=option_id)
     match_or_403(question.id, option.question_id)
 
-    deps.db.delete(option)
+    await deps.db.delete(option)
     audit_log_delete(deps, option, option.id)
-    deps.db.flush()
+    await deps.db.flush()
 
     return Response(status_code=204)
 
@@ -264,93 +321,95 @@ def delete_form_question_option(
 # PATCH Requests
 ################################################################################
 @router.patch("/{form_id}", response_model=Schemas.DeepFormSchema)
-def patch_form(
+async def patch_form(
     form_id: int,
     data: Schemas.FormUpdateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.DeepFormSchema:
 
-    form = get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
+    form = await get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
     match_or_403(deps.guild_id, form.guild_id)
 
     apply_updates(form, data)
     audit_log_update(deps, form, form.id)
 
-    deps.db.flush()
-    deps.db.refresh(form)
+    await deps.db.flush()
+    await deps.db.refresh(form)
 
+    form = await full_form_select(deps, "Single", form_id=form.id)
     return map_form(form)
 
 ################################################################################
 @router.patch("/{form_id}/prompts/{prompt_id}/", response_model=Schemas.FormPromptSchema)
-def patch_form_prompt(
+async def patch_form_prompt(
     form_id: int,
     prompt_id: int,
     data: Schemas.FormPromptUpdateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.FormPromptSchema:
 
-    form = get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
+    form = await get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
     match_or_403(deps.guild_id, form.guild_id)
 
-    prompt = get_shallow_or_404(deps.db, Models.FormPromptModel, id=prompt_id)
+    prompt = await get_shallow_or_404(deps.db, Models.FormPromptModel, id=prompt_id)
     match_or_403(form.id, prompt.form_id)
 
     apply_updates(prompt, data)
     audit_log_update(deps, prompt, prompt.id)
 
-    deps.db.flush()
-    deps.db.refresh(prompt)
+    await deps.db.flush()
+    await deps.db.refresh(prompt)
 
     return Schemas.FormPromptSchema.model_validate(prompt)
 
 ################################################################################
 @router.patch("/{form_id}/post-options", response_model=Schemas.FormPostOptionsSchema)
-def patch_form_post_options(
+async def patch_form_post_options(
     form_id: int,
     data: Schemas.FormPostOptionsUpdateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.FormPostOptionsSchema:
 
-    form = get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
+    form = await get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
     match_or_403(deps.guild_id, form.guild_id)
 
-    post_options = get_shallow_or_404(deps.db, Models.FormPostOptionsModel, form_id=form.id)
+    post_options = await get_shallow_or_404(deps.db, Models.FormPostOptionsModel, form_id=form.id)
 
     apply_updates(post_options, data)
     audit_log_update(deps, post_options, form.id)
 
-    deps.db.flush()
-    deps.db.refresh(post_options)
+    await deps.db.flush()
+    await deps.db.refresh(post_options)
 
     return Schemas.FormPostOptionsSchema.model_validate(post_options)
 
 ################################################################################
 @router.patch("/{form_id}/questions/{question_id}", response_model=Schemas.DeepFormQuestionSchema)
-def patch_form_question(
+async def patch_form_question(
     form_id: int,
     question_id: int,
     data: Schemas.FormQuestionUpdateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.DeepFormQuestionSchema:
 
-    form = get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
+    form = await get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
     match_or_403(deps.guild_id, form.guild_id)
 
-    question = get_shallow_or_404(deps.db, Models.FormQuestionModel, id=question_id)
+    question = await get_shallow_or_404(deps.db, Models.FormQuestionModel, id=question_id)
     match_or_403(form.id, question.form_id)
 
     apply_updates(question, data)
     audit_log_update(deps, question, question.id)
 
-    deps.db.flush()
-    deps.db.refresh(question)
+    await deps.db.flush()
+    await deps.db.refresh(question)
 
+    question = await full_question_select(form.id, deps, "Single", question_id=question.id)
     return map_form_question(question)
 
 ################################################################################
 @router.patch("/{form_id}/questions/{question_id}/prompts/{prompt_id}/", response_model=Schemas.FormPromptSchema)
-def patch_form_question_prompt(
+async def patch_form_question_prompt(
     form_id: int,
     question_id: int,
     prompt_id: int,
@@ -358,26 +417,26 @@ def patch_form_question_prompt(
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.FormPromptSchema:
 
-    form = get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
+    form = await get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
     match_or_403(deps.guild_id, form.guild_id)
 
-    question = get_shallow_or_404(deps.db, Models.FormQuestionModel, id=question_id)
+    question = await get_shallow_or_404(deps.db, Models.FormQuestionModel, id=question_id)
     match_or_403(form.id, question.form_id)
 
-    prompt = get_shallow_or_404(deps.db, Models.FormPromptModel, id=prompt_id)
+    prompt = await get_shallow_or_404(deps.db, Models.FormPromptModel, id=prompt_id)
     match_or_403(question.id, prompt.question_id)
 
     apply_updates(prompt, data)
     audit_log_update(deps, prompt, prompt.id)
 
-    deps.db.flush()
-    deps.db.refresh(prompt)
+    await deps.db.flush()
+    await deps.db.refresh(prompt)
 
     return Schemas.FormPromptSchema.model_validate(prompt)
 
 ################################################################################
 @router.patch("/{form_id}/questions/{question_id}/responses/{response_id}", response_model=Schemas.FormQuestionResponseSchema)
-def patch_form_question_response(
+async def patch_form_question_response(
     form_id: int,
     question_id: int,
     response_id: int,
@@ -385,26 +444,26 @@ def patch_form_question_response(
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.FormQuestionResponseSchema:
 
-    form = get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
+    form = await get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
     match_or_403(deps.guild_id, form.guild_id)
 
-    question = get_shallow_or_404(deps.db, Models.FormQuestionModel, id=question_id)
+    question = await get_shallow_or_404(deps.db, Models.FormQuestionModel, id=question_id)
     match_or_403(form.id, question.form_id)
 
-    response = get_shallow_or_404(deps.db, Models.FormQuestionResponseModel, id=response_id)
+    response = await get_shallow_or_404(deps.db, Models.FormQuestionResponseModel, id=response_id)
     match_or_403(question.id, response.question_id)
 
     apply_updates(response, data)
     audit_log_update(deps, response, response.id)
 
-    deps.db.flush()
-    deps.db.refresh(response)
+    await deps.db.flush()
+    await deps.db.refresh(response)
 
     return Schemas.FormQuestionResponseSchema.model_validate(response)
 
 ################################################################################
 @router.patch("/{form_id}/questions/{question_id}/options/{option_id}", response_model=Schemas.FormQuestionOptionSchema)
-def patch_form_question_option(
+async def patch_form_question_option(
     form_id: int,
     question_id: int,
     option_id: int,
@@ -412,20 +471,20 @@ def patch_form_question_option(
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.FormQuestionOptionSchema:
 
-    form = get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
+    form = await get_shallow_or_404(deps.db, Models.FormModel, id=form_id)
     match_or_403(deps.guild_id, form.guild_id)
 
-    question = get_shallow_or_404(deps.db, Models.FormQuestionModel, id=question_id)
+    question = await get_shallow_or_404(deps.db, Models.FormQuestionModel, id=question_id)
     match_or_403(form.id, question.form_id)
 
-    option = get_shallow_or_404(deps.db, Models.FormQuestionOptionModel, id=option_id)
+    option = await get_shallow_or_404(deps.db, Models.FormQuestionOptionModel, id=option_id)
     match_or_403(question.id, option.question_id)
 
     apply_updates(option, data)
     audit_log_update(deps, option, option.id)
 
-    deps.db.flush()
-    deps.db.refresh(option)
+    await deps.db.flush()
+    await deps.db.refresh(option)
 
     return Schemas.FormQuestionOptionSchema.model_validate(option)
 
@@ -1,60 +1,146 @@
 from __future__ import annotations
 
+from datetime import UTC, datetime
 from typing import List, Union, Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Response, Query
+from sqlalchemy import delete, select
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from .Common import *
 from .. import Models, Schemas
-from ..dependencies import get_dependencies, Dependencies
+from ..dependencies import get_dependencies, get_read_dependencies, get_conditional_read_dependencies, get_page, Dependencies, Page
+from ..fieldsets import get_fieldset, select_all, FieldSet, Nested, Selection, Shape
+from ..responses import SchemaRoute
+from ..sampling import sample_distinct
 ################################################################################
 
-router = APIRouter(prefix="/giveaways", tags=["Giveaway Creation & Management"])
+router = APIRouter(prefix="/giveaways", tags=["Giveaway Creation & Management"], route_class=SchemaRoute)
 
 ################################################################################
-def full_giveaway_select(
+GIVEAWAY_SHAPE = Shape(Schemas.DeepGiveawaySchema, Models.GiveawayModel, nested={
+    "details": Nested(
+        Models.GiveawayModel.details,
+        Shape(Schemas.GiveawayDetailsSchema, Models.GiveawayDetailsModel),
+        many=False
+    ),
+    "entries": Nested(Models.GiveawayModel.entries, Shape(Schemas.GiveawayEntrySchema, Models.GiveawayEntryModel)),
+})
+GIVEAWAY_MANAGER_SHAPE = Shape(Schemas.DeepGiveawayManagerSchema, Models.GiveawayManagerModel, nested={
+    "giveaways": Nested(Models.GiveawayManagerModel.giveaways, GIVEAWAY_SHAPE),
+})
+
+################################################################################
+async def full_giveaway_select(
     deps: Dependencies,
     mode: Literal["All", "Single"] = "Single",
-    embed_id: Optional[int] = None
+    embed_id: Optional[int] = None,
+    page: Optional[Page] = None,
+    selection: Optional[Selection] = None
 ):
-
-    query = deps.db.query(Models.GiveawayModel).filter_by(guild_id=deps.guild_id).options(
-        selectinload(Models.GiveawayModel.details),
-        selectinload(Models.GiveawayModel.entries),
-    )
+    """
+    With a page, "All" loads one page of giveaways and "Single" loads one page
+    of the giveaway's entries. With a selection, only the columns and children
+    it names are loaded.
+    """
+
+    paged = page is not None and page.enabled
+    entries_paged = paged and mode == "Single"
+    query = select(Models.GiveawayModel).filter_by(guild_id=deps.guild_id)
+    if selection is not None:
+        query = query.options(*(selection.without("entries") if entries_paged else selection).options())
+    else:
+        query = query.options(selectinload(Models.GiveawayModel.details))
+        if not entries_paged:
+            query = query.options(selectinload(Models.GiveawayModel.entries))
 
     if mode == "All":
-        return query.all()
+        if page is not None:
+            return await page.load(deps.db, query, Models.GiveawayModel.id)
+        return (await deps.db.scalars(query)).all()
     elif mode == "Single":
         assert embed_id is not None
-        return query.filter_by(id=embed_id).first()
+        giveaway = await deps.db.scalar(query.filter_by(id=embed_id))
+        entry_selection = selection.child("entries") if selection is not None else None
+        if giveaway is not None and entries_paged and (selection is None or entry_selection is not None):
+            entries = select(Models.GiveawayEntryModel).filter_by(giveaway_id=giveaway.id)
+            if entry_selection is not None:
+                entries = entries.options(*entry_selection.options())
+            set_committed_value(giveaway, "entries", await page.load(deps.db, entries, Models.GiveawayEntryModel.id))
+        return giveaway
 
 ################################################################################
-# GET Requests
-################################################################################
-@router.get("/", response_model=Schemas.DeepGiveawayManagerSchema, summary="Get the Giveaway Manager of the provided the guild")
-async def get_giveaway_manager(deps: Dependencies = Depends(get_dependencies)) -> Schemas.DeepGiveawayManagerSchema:
+async def full_giveaway_manager_select(
+    deps: Dependencies,
+    page: Optional[Page] = None,
+    selection: Optional[Selection] = None
+):
 
-    manager = deps.db.query(Models.GiveawayManagerModel).filter_by(guild_id=deps.guild_id).options(
-        selectinload(Models.GiveawayManagerModel.giveaways).selectinload(Models.GiveawayModel.details),
-        selectinload(Models.GiveawayManagerModel.giveaways).selectinload(Models.GiveawayModel.entries),
-    ).first()
+    paged = page is not None and page.enabled
+    query = select(Models.GiveawayManagerModel).filter_by(guild_id=deps.guild_id)
+    if selection is not None:
+        query = query.options(*(selection.without("giveaways") if paged else selection).options())
+    elif not paged:
+        query = query.options(
+            selectinload(Models.GiveawayManagerModel.giveaways).selectinload(Models.GiveawayModel.details),
+            selectinload(Models.GiveawayManagerModel.giveaways).selectinload(Models.GiveawayModel.entries),
+        )
+
+    manager = await deps.db.scalar(query)
     if not manager:
         raise HTTPException(status_code=404, detail="Giveaway Manager not found for this guild.")
 
+    giveaway_selection = selection.child("giveaways") if selection is not None else None
+    if paged and (selection is None or giveaway_selection is not None):
+        giveaways = await full_giveaway_select(deps, "All", page=page, selection=giveaway_selection)
+        set_committed_value(manager, "giveaways", giveaways)
+
+    return manager
+
+################################################################################
+# GET Requests
+################################################################################
+@router.get(
+    "/",
+    response_model=Schemas.DeepGiveawayManagerSchema,
+    summary="Get the Giveaway Manager of the provided the guild",
+    description=(
+        "When paged, the giveaways are returned without their entries; page "
+        "through a giveaway's entries with GET /giveaways/{giveaway_id}."
+    )
+)
+async def get_giveaway_manager(
+    page: Page = Depends(get_page),
+    fieldset: FieldSet = Depends(get_fieldset),
+    deps: Dependencies = Depends(get_conditional_read_dependencies)
+) -> Schemas.DeepGiveawayManagerSchema:
+
+    selection = fieldset.select(GIVEAWAY_MANAGER_SHAPE)
+    if page.enabled:
+        # A page bounds the giveaways but not their entries, so those are left out.
+        selection = (selection or select_all(GIVEAWAY_MANAGER_SHAPE)).without("giveaways.entries")
+    manager = await full_giveaway_manager_select(deps, page, selection)
+    if selection is not None:
+        return selection.dump(manager)
     return Schemas.DeepGiveawayManagerSchema.model_validate(manager)
 
 ################################################################################
 @router.get("/{giveaway_id}", response_model=Schemas.DeepGiveawaySchema, summary="Get a specific Giveaway by its ID")
 async def get_giveaway(
     giveaway_id: int,
-    deps: Dependencies = Depends(get_dependencies)
+    page: Page = Depends(get_page),
+    fieldset: FieldSet = Depends(get_fieldset),
+    deps: Dependencies = Depends(get_read_dependencies)
 ) -> Schemas.DeepGiveawaySchema:
 
-    giveaway = get_shallow_or_404(deps.db, Models.GiveawayModel, id=giveaway_id)
+    giveaway = await get_shallow_or_404(deps.db, Models.GiveawayModel, id=giveaway_id)
     match_or_403(deps.guild_id, giveaway.guild_id)
 
+    selection = fieldset.select(GIVEAWAY_SHAPE)
+    giveaway = await full_giveaway_select(deps, "Single", giveaway.id, page=page, selection=selection)
+    if selection is not None:
+        return selection.dump(giveaway)
     return Schemas.DeepGiveawaySchema.model_validate(giveaway)
 
 ################################################################################
@@ -65,14 +151,14 @@ async def create_giveaway(deps: Dependencies = Depends(get_dependencies)) -> Sch
 
     giveaway = Models.GiveawayModel(guild_id=deps.guild_id)
     deps.db.add(giveaway)
-    deps.db.flush()
-    deps.db.refresh(giveaway)
+    await deps.db.flush()
+    await deps.db.refresh(giveaway)
 
     details = Models.GiveawayDetailsModel(giveaway_id=giveaway.id)
     deps.db.add(details)
-    deps.db.flush()
+    await deps.db.flush()
 
-    giveaway = full_giveaway_select(deps, "Single", giveaway.id)
+    giveaway = await full_giveaway_select(deps, "Single", giveaway.id)
     audit_log_create(deps, giveaway, giveaway.id)
 
     return Schemas.DeepGiveawaySchema.model_validate(giveaway)
@@ -82,21 +168,101 @@ async def create_giveaway(deps: Dependencies = Depends(get_dependencies)) -> Sch
 async def add_giveaway_entry(
     giveaway_id: int,
     data: Schemas.GiveawayEntryCreateSchema,
+    response: Response,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.GiveawayEntrySchema:
+    """Idempotent: if the user is already entered, their existing entry is returned with a 200."""
 
-    giveaway = get_shallow_or_404(deps.db, Models.GiveawayModel, id=giveaway_id)
+    giveaway = await get_shallow_or_404(deps.db, Models.GiveawayModel, id=giveaway_id)
     match_or_403(deps.guild_id, giveaway.guild_id)
 
-    entry = Models.GiveawayEntryModel(giveaway_id=giveaway.id, user_id=data.user_id)
-    deps.db.add(entry)
-    deps.db.flush()
-    deps.db.refresh(entry)
+    query = (
+        dialect_insert(deps.db, Models.GiveawayEntryModel)
+        .values(giveaway_id=giveaway.id, user_id=data.user_id)
+        .on_conflict_do_nothing(index_elements=["giveaway_id", "user_id"])
+        .returning(Models.GiveawayEntryModel)
+    )
+    entry = await deps.db.scalar(query)
 
-    audit_log_create(deps, entry, entry.id)
+    if entry is None:
+        entry = await deps.db.scalar(select(Models.GiveawayEntryModel).filter_by(giveaway_id=giveaway.id, user_id=data.user_id))
+        response.status_code = 200
+    else:
+        deps.db.expire(giveaway, ["entries"])
+        audit_log_create(deps, entry, entry.id)
 
     return Schemas.GiveawayEntrySchema.model_validate(entry)
 
+################################################################################
+@router.post("/{giveaway_id}/entries/bulk", response_model=Schemas.GiveawayEntryBulkResultSchema, summary="Add many entries to a Giveaway at once")
+async def add_giveaway_entries_bulk(
+    giveaway_id: int,
+    data: Schemas.GiveawayEntryBulkCreateSchema,
+    deps: Dependencies = Depends(get_dependencies)
+) -> Schemas.GiveawayEntryBulkResultSchema:
+
+    giveaway = await get_shallow_or_404(deps.db, Models.GiveawayModel, id=giveaway_id)
+    match_or_403(deps.guild_id, giveaway.guild_id)
+
+    # Users already entered are skipped by the unique (giveaway_id, user_id)
+    # index; repeats within the request are dropped up front.
+    query = (
+        dialect_insert(deps.db, Models.GiveawayEntryModel)
+        .values([{"giveaway_id": giveaway.id, "user_id": user_id} for user_id in dict.fromkeys(data.user_ids)])
+        .on_conflict_do_nothing(index_elements=["giveaway_id", "user_id"])
+        .returning(Models.GiveawayEntryModel.user_id)
+    )
+    inserted = (await deps.db.scalars(query)).all()
+
+    if inserted:
+        # Entries loaded earlier in this session no longer match the table.
+        deps.db.expire(giveaway, ["entries"])
+        audit_log_bulk(deps, Models.GiveawayModel, giveaway.id, "Update", {"entries": {"old": None, "new": list(inserted)}})
+
+    return Schemas.GiveawayEntryBulkResultSchema(inserted=len(inserted), duplicates=len(data.user_ids) - len(inserted))
+
+################################################################################
+@router.post("/{giveaway_id}/roll", response_model=Schemas.GiveawayRollSchema, summary="Draw the winners of a Giveaway")
+async def roll_giveaway(
+    giveaway_id: int,
+    reroll: bool = Query(False, description="Draw again even if the giveaway has already been rolled"),
+    deps: Dependencies = Depends(get_dependencies)
+) -> Schemas.GiveawayRollSchema:
+    """
+    Picks ``num_winners`` distinct entrants at random inside the database and
+    records them as the winners. Only the winners are returned.
+    """
+
+    giveaway = await get_shallow_or_404(deps.db, Models.GiveawayModel, id=giveaway_id)
+    match_or_403(deps.guild_id, giveaway.guild_id)
+
+    # Hold the row until commit so concurrent rolls can't both go through.
+    await deps.db.refresh(giveaway, with_for_update=True)
+    if giveaway.rolled_at is not None and not reroll:
+        raise HTTPException(status_code=409, detail="Giveaway has already been rolled")
+
+    num_winners = await deps.db.scalar(
+        select(Models.GiveawayDetailsModel.num_winners).filter_by(giveaway_id=giveaway.id)
+    )
+    if num_winners is None or num_winners < 1:
+        raise HTTPException(
+            status_code=409,
+            detail="Giveaway has no number of winners configured; set details.num_winners to at least 1"
+        )
+
+    entrants = select(Models.GiveawayEntryModel.user_id).filter_by(giveaway_id=giveaway.id)
+    winners = await sample_distinct(deps.db, entrants, num_winners)
+    if not winners:
+        raise HTTPException(status_code=409, detail="Giveaway has no entries to draw from")
+
+    giveaway.winners = winners
+    giveaway.rolled_at = datetime.now(UTC).replace(tzinfo=None)
+    giveaway.rolled_by = deps.actor_id
+    audit_log_update(deps, giveaway, giveaway.id)
+    await deps.db.flush()
+
+    return Schemas.GiveawayRollSchema.model_validate(giveaway)
+
 ################################################################################
 # DELETE Requests
 ################################################################################
@@ -106,12 +272,12 @@ async def delete_giveaway(
     deps: Dependencies = Depends(get_dependencies)
 ) -> Response:
 
-    giveaway = get_shallow_or_404(deps.db, Models.GiveawayModel, id=giveaway_id)
+    giveaway = await get_shallow_or_404(deps.db, Models.GiveawayModel, id=giveaway_id)
     match_or_403(deps.guild_id, giveaway.guild_id)
 
-    deps.db.delete(giveaway)
+    await deps.db.delete(giveaway)
     audit_log_delete(deps, giveaway, giveaway.id)
-    deps.db.flush()
+    await deps.db.flush()
 
     return Response(status_code=204)
 
@@ -123,15 +289,39 @@ async def delete_giveaway_entry(
     deps: Dependencies = Depends(get_dependencies)
 ) -> Response:
 
-    giveaway = get_shallow_or_404(deps.db, Models.GiveawayModel, id=giveaway_id)
+    giveaway = await get_shallow_or_404(deps.db, Models.GiveawayModel, id=giveaway_id)
     match_or_403(deps.guild_id, giveaway.guild_id)
 
-    entry = get_shallow_or_404(deps.db, Models.GiveawayEntryModel, id=entry_id, giveaway_id=giveaway.id)
+    entry = await get_shallow_or_404(deps.db, Models.GiveawayEntryModel, id=entry_id, giveaway_id=giveaway.id)
     match_or_403(giveaway.id, entry.giveaway_id)
 
-    deps.db.delete(entry)
+    await deps.db.delete(entry)
+    audit_log_delete(deps, entry, entry.id)
+    await deps.db.flush()
+
+    return Response(status_code=204)
+
+################################################################################
+@router.delete("/{giveaway_id}/entries/by-user/{user_id}", status_code=204, summary="Delete a user's entry from a Giveaway")
+async def delete_giveaway_entry_by_user(
+    giveaway_id: int,
+    user_id: int,
+    deps: Dependencies = Depends(get_dependencies)
+) -> Response:
+
+    giveaway = await get_shallow_or_404(deps.db, Models.GiveawayModel, id=giveaway_id)
+    match_or_403(deps.guild_id, giveaway.guild_id)
+
+    entry = await deps.db.scalar(
+        delete(Models.GiveawayEntryModel)
+        .filter_by(giveaway_id=giveaway.id, user_id=user_id)
+        .returning(Models.GiveawayEntryModel)
+    )
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"User '{user_id}' has no entry in this giveaway")
+
+    deps.db.expire(giveaway, ["entries"])
     audit_log_delete(deps, entry, entry.id)
-    deps.db.flush()
 
     return Response(status_code=204)
 
@@ -144,14 +334,15 @@ async def update_giveaway_manager(
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.DeepGiveawayManagerSchema:
 
-    manager = get_shallow_or_404(deps.db, Models.GiveawayManagerModel, guild_id=deps.guild_id)
+    manager = await get_shallow_or_404(deps.db, Models.GiveawayManagerModel, guild_id=deps.guild_id)
 
     apply_updates(manager, data)
     audit_log_update(deps, manager, manager.guild_id)
 
-    deps.db.flush()
-    deps.db.refresh(manager)
+    await deps.db.flush()
+    await deps.db.refresh(manager)
 
+    manager = await full_giveaway_manager_select(deps)
     return Schemas.DeepGiveawayManagerSchema.model_validate(manager)
 
 ################################################################################
@@ -162,15 +353,16 @@ async def update_giveaway(
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.DeepGiveawaySchema:
 
-    giveaway = get_shallow_or_404(deps.db, Models.GiveawayModel, id=giveaway_id)
+    giveaway = await get_shallow_or_404(deps.db, Models.GiveawayModel, id=giveaway_id)
     match_or_403(deps.guild_id, giveaway.guild_id)
 
     apply_updates(giveaway, data)
     audit_log_update(deps, giveaway, giveaway.id)
 
-    deps.db.flush()
-    deps.db.refresh(giveaway)
+    await deps.db.flush()
+    await deps.db.refresh(giveaway)
 
+    giveaway = await full_giveaway_select(deps, "Single", giveaway.id)
     return Schemas.DeepGiveawaySchema.model_validate(giveaway)
 
 ################################################################################
@@ -181,17 +373,17 @@ async def update_giveaway_details(
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.GiveawayDetailsSchema:
 
-    giveaway = get_shallow_or_404(deps.db, Models.GiveawayModel, id=giveaway_id)
+    giveaway = await get_shallow_or_404(deps.db, Models.GiveawayModel, id=giveaway_id)
     match_or_403(deps.guild_id, giveaway.guild_id)
 
-    details = get_shallow_or_404(deps.db, Models.GiveawayDetailsModel, giveaway_id=giveaway.id)
+    details = await get_shallow_or_404(deps.db, Models.GiveawayDetailsModel, giveaway_id=giveaway.id)
 
     apply_updates(details, data)
     audit_log_update(deps, details, details.giveaway_id)
 
-    deps.db.flush()
-    deps.db.refresh(giveaway.details)
+    await deps.db.flush()
+    await deps.db.refresh(details)
 
-    return Schemas.GiveawayDetailsSchema.model_validate(giveaway.details)
+    return Schemas.GiveawayDetailsSchema.model_validate(details)
 
 ################################################################################
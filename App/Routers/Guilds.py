@@ -1,23 +1,34 @@
 from __future__ import annotations
 
-from typing import Literal, Optional, Type
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Literal, Optional, Sequence, Tuple, Type
 
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session, selectinload
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
 
 from .Common import *
+from .Common import _record_audit_log_item
 from App import Models, Schemas
-from App.dependencies import get_dependencies, Dependencies, get_db
+from App.cache import invalidate_guild_on_commit
+from App.auth import get_current_user
+from App.revisions import check_guild_etag, get_guild_revision, guild_etag, guild_etag_headers, mark_guild_changed
+from App.dependencies import get_dependencies, Dependencies, get_db, get_read_db
+from App.config import settings
+from App.database import get_streaming_read_db
+from App.responses import SchemaRoute
 ################################################################################
 
-router = APIRouter(prefix="", tags=["Guild Endpoints"])
+router = APIRouter(prefix="", tags=["Guild Endpoints"], route_class=SchemaRoute)
 
 ################################################################################
 # Helper Functions
 ################################################################################
-def full_guild_select(db: Session, mode: Literal["All", "First"] = "All", guild_id: Optional[int] = None):
+async def full_guild_select(db: AsyncSession, mode: Literal["All", "First"] = "All", guild_id: Optional[int] = None):
 
-    query = db.query(Models.GuildIDModel).options(
+    query = select(Models.GuildIDModel).options(
         selectinload(Models.GuildIDModel.configuration),
         selectinload(Models.GuildIDModel.embeds).selectinload(Models.EmbedModel.images),
         selectinload(Models.GuildIDModel.embeds).selectinload(Models.EmbedModel.header),
@@ -55,10 +66,10 @@ def full_guild_select(db: Session, mode: Literal["All", "First"] = "All", guild_
     )
 
     if mode == "All":
-        return query.all()
+        return (await db.scalars(query)).all()
     elif mode == "First":
         assert guild_id is not None, "Guild ID must be provided in 'First' mode"
-        return query.filter_by(guild_id=guild_id).first()
+        return await db.scalar(query.filter_by(guild_id=guild_id))
 
 ################################################################################
 def full_guild_validate(guild: Type[Models.GuildIDModel]) -> Schemas.GuildDataSchema:
@@ -125,16 +136,198 @@ def full_guild_validate(guild: Type[Models.GuildIDModel]) -> Schemas.GuildDataSc
         # )
     )
 
+################################################################################
+@dataclass(frozen=True)
+class SnapshotSection:
+    """A top-level part of a guild's data, loaded for any number of guilds at once."""
+
+    name: str
+    model: Type[Models.BaseModel]
+    mapper: Callable[[Any], Any]
+    many: bool = False
+    options: Tuple[Any, ...] = ()
+
+    def query(self, guild_ids: Sequence[int]):
+
+        return select(self.model).filter(self.model.guild_id.in_(guild_ids)).options(*self.options)
+
+################################################################################
+SNAPSHOT_SECTIONS: Tuple[SnapshotSection, ...] = (
+    SnapshotSection("configuration", Models.GuildConfigurationModel, Schemas.GuildConfigurationSchema.model_validate),
+    SnapshotSection("embeds", Models.EmbedModel, map_embed, many=True, options=(
+        selectinload(Models.EmbedModel.images),
+        selectinload(Models.EmbedModel.header),
+        selectinload(Models.EmbedModel.footer),
+        selectinload(Models.EmbedModel.fields),
+    )),
+    SnapshotSection("forms", Models.FormModel, map_form, many=True, options=(
+        selectinload(Models.FormModel.post_options),
+        selectinload(Models.FormModel.questions).selectinload(Models.FormQuestionModel.responses),
+        selectinload(Models.FormModel.questions).selectinload(Models.FormQuestionModel.options),
+        selectinload(Models.FormModel.questions).selectinload(Models.FormQuestionModel.prompts),
+        selectinload(Models.FormModel.response_collections),
+        selectinload(Models.FormModel.prompts),
+    )),
+    SnapshotSection("giveaway_mgr", Models.GiveawayManagerModel, Schemas.DeepGiveawayManagerSchema.model_validate, options=(
+        selectinload(Models.GiveawayManagerModel.giveaways).selectinload(Models.GiveawayModel.details),
+        selectinload(Models.GiveawayManagerModel.giveaways).selectinload(Models.GiveawayModel.entries),
+    )),
+    SnapshotSection("glyph_messages", Models.GlyphMessageModel, Schemas.GlyphMessageSchema.model_validate, many=True),
+    SnapshotSection("positions", Models.PositionModel, Schemas.PositionSchema.model_validate, many=True),
+    SnapshotSection("profile_mgr", Models.ProfileManagerModel, Schemas.DeepProfileManagerSchema.model_validate, options=(
+        selectinload(Models.ProfileManagerModel.requirements),
+        selectinload(Models.ProfileManagerModel.channel_groups),
+        selectinload(Models.ProfileManagerModel.profiles).selectinload(Models.ProfileModel.details),
+        selectinload(Models.ProfileManagerModel.profiles).selectinload(Models.ProfileModel.ataglance),
+        selectinload(Models.ProfileManagerModel.profiles).selectinload(Models.ProfileModel.personality),
+        selectinload(Models.ProfileManagerModel.profiles).selectinload(Models.ProfileModel.images).selectinload(Models.ProfileImagesModel.addl_images),
+    )),
+    SnapshotSection("raffle_mgr", Models.RaffleManagerModel, Schemas.DeepRaffleManagerSchema.model_validate, options=(
+        selectinload(Models.RaffleManagerModel.raffles).selectinload(Models.RaffleModel.entries),
+    )),
+    SnapshotSection("reaction_roles_mgr", Models.ReactionRoleManagerModel, Schemas.DeepReactionRoleManagerSchema.model_validate, options=(
+        selectinload(Models.ReactionRoleManagerModel.messages).selectinload(Models.ReactionRoleMessageModel.roles),
+    )),
+)
+
+################################################################################
+async def load_snapshot_section(db: AsyncSession, section: SnapshotSection, guild_ids: Sequence[int]) -> Dict[int, Any]:
+    """
+    Load one section for every given guild with a single IN-list query (plus
+    its selectinloads). Guilds without data get an empty list or None.
+    """
+
+    result: Dict[int, Any] = {gid: [] if section.many else None for gid in guild_ids}
+    for obj in (await db.scalars(section.query(guild_ids))).all():
+        if section.many:
+            result[obj.guild_id].append(section.mapper(obj))
+        else:
+            result[obj.guild_id] = section.mapper(obj)
+
+    return result
+
+################################################################################
+def snapshot_line(section: str, data: Any) -> str:
+
+    return Schemas.GuildSnapshotSectionSchema(section=section, data=data).model_dump_json() + "\n"
+
+################################################################################
+async def stream_guild_snapshot(db: AsyncSession, guild_id: int, revision: int) -> AsyncIterator[str]:
+    """
+    Yield a guild's snapshot as NDJSON: a "guild" header line, one line per
+    section in ``SNAPSHOT_SECTIONS`` and a closing "end" line. Only one section
+    is held in memory at a time. If loading fails part way through, an "error"
+    line is written in place of the "end" line, since the status code has
+    already been sent. The session is closed once the stream ends, however
+    it ends.
+    """
+
+    try:
+        yield snapshot_line("guild", Schemas.GuildRevisionSchema(guild_id=guild_id, revision=revision))
+        for section in SNAPSHOT_SECTIONS:
+            data = await load_snapshot_section(db, section, [guild_id])
+            yield snapshot_line(section.name, data[guild_id])
+            # Drop the section's ORM objects before loading the next one.
+            db.expunge_all()
+        yield snapshot_line("end", {"sections": len(SNAPSHOT_SECTIONS)})
+    except Exception as e:
+        print(f"Snapshot of guild '{guild_id}' failed: {str(e)}")
+        yield snapshot_line("error", {"detail": "Failed to load the guild snapshot"})
+    finally:
+        await db.close()
+
+################################################################################
+def shard_filter(shard_id: int, shard_count: int):
+    """Discord's shard formula: ``(guild_id >> 22) % shard_count == shard_id``."""
+
+    return Models.GuildIDModel.guild_id.op(">>")(22) % shard_count == shard_id
+
+################################################################################
+async def stream_shard_bootstrap(
+    db: AsyncSession,
+    shard_id: int,
+    shard_count: int,
+    batch_size: int
+) -> AsyncIterator[str]:
+    """
+    Yield one "guild" line per guild owned by the shard, with every snapshot
+    section, followed by an "end" line. Guilds are taken ``batch_size`` at a
+    time in guild ID order, and each batch is deep-loaded with one IN-list
+    query per section, so the number of round trips grows with the number of
+    batches rather than the number of guilds. The session is closed once the
+    stream ends, however it ends.
+    """
+
+    total, last_id = 0, None
+    try:
+        while True:
+            query = select(Models.GuildIDModel.guild_id, Models.GuildIDModel.revision).filter(
+                shard_filter(shard_id, shard_count)
+            )
+            if last_id is not None:
+                query = query.filter(Models.GuildIDModel.guild_id > last_id)
+            batch = (await db.execute(query.order_by(Models.GuildIDModel.guild_id).limit(batch_size))).all()
+            if not batch:
+                break
+
+            guild_ids = [row.guild_id for row in batch]
+            sections = {
+                section.name: await load_snapshot_section(db, section, guild_ids)
+                for section in SNAPSHOT_SECTIONS
+            }
+            for row in batch:
+                yield snapshot_line("guild", Schemas.BootstrapGuildSchema(
+                    guild_id=row.guild_id,
+                    revision=row.revision,
+                    data={name: data[row.guild_id] for name, data in sections.items()}
+                ))
+
+            total += len(batch)
+            last_id = guild_ids[-1]
+            db.expunge_all()
+        yield snapshot_line("end", {"guilds": total})
+    except Exception as e:
+        print(f"Bootstrap of shard {shard_id}/{shard_count} failed: {str(e)}")
+        yield snapshot_line("error", {"detail": "Failed to load the shard's guilds"})
+    finally:
+        await db.close()
+
 ################################################################################
 # GET Requests
+################################################################################
+# Declared before /guilds/{guild_id} so "bootstrap" isn't taken for a guild ID.
+@router.get(
+    "/guilds/bootstrap",
+    response_class=StreamingResponse,
+    summary="Stream every guild owned by a Discord shard as NDJSON"
+)
+async def get_shard_bootstrap(
+    shard_id: int = Query(..., ge=0, description="The ID of the shard being started"),
+    shard_count: int = Query(..., ge=1, description="The total number of shards"),
+    db: AsyncSession = Depends(get_streaming_read_db),
+    _: int = Depends(get_current_user)
+) -> StreamingResponse:
+
+    if shard_id >= shard_count:
+        await db.close()
+        raise HTTPException(status_code=400, detail="shard_id must be less than shard_count")
+
+    return StreamingResponse(
+        stream_shard_bootstrap(db, shard_id, shard_count, settings.GUILD_BOOTSTRAP_BATCH_SIZE),
+        media_type="application/x-ndjson"
+    )
+
 ################################################################################
 @router.get("/guilds/{guild_id}", response_model=Schemas.TopLevelGuildSchema)
-def get_single_guild(
+async def get_single_guild(
     guild_id: int,
-    db: Session = Depends(get_db)
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db)
 ) -> Schemas.TopLevelGuildSchema:
 
-    guild = full_guild_select(db, "First", guild_id=guild_id)
+    await check_guild_etag(db, guild_id, request, response)
+    guild = await full_guild_select(db, "First", guild_id=guild_id)
     if guild is None:
         raise HTTPException(status_code=404, detail=f"Guild ID '{guild_id}' not found")
 
@@ -143,17 +336,62 @@ def get_single_guild(
         data=full_guild_validate(guild)
     )
 
+################################################################################
+@router.get("/guilds/{guild_id}/revision", response_model=Schemas.GuildRevisionSchema)
+async def get_guild_revision_by_id(
+    guild_id: int,
+    response: Response,
+    db: AsyncSession = Depends(get_read_db),
+    _: int = Depends(get_current_user)
+) -> Schemas.GuildRevisionSchema:
+
+    revision = await get_guild_revision(db, guild_id)
+    if revision is None:
+        raise HTTPException(status_code=404, detail=f"Guild ID '{guild_id}' not found")
+
+    response.headers["ETag"] = guild_etag(guild_id, revision)
+    return Schemas.GuildRevisionSchema(guild_id=guild_id, revision=revision)
+
+################################################################################
+@router.get(
+    "/guilds/{guild_id}/snapshot",
+    response_class=StreamingResponse,
+    summary="Stream every section of a guild's data as NDJSON"
+)
+async def get_guild_snapshot(
+    guild_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_streaming_read_db),
+    _: int = Depends(get_current_user)
+) -> StreamingResponse:
+
+    try:
+        revision = await get_guild_revision(db, guild_id)
+        if revision is None:
+            raise HTTPException(status_code=404, detail=f"Guild ID '{guild_id}' not found")
+        headers = guild_etag_headers(guild_id, revision, request)
+    except Exception:
+        # The session is only closed by the stream once there is one.
+        await db.close()
+        raise
+
+    return StreamingResponse(
+        stream_guild_snapshot(db, guild_id, revision),
+        media_type="application/x-ndjson",
+        headers=headers
+    )
+
 ################################################################################
 # POST Requests
 ################################################################################
 @router.post("/guilds", status_code=201, response_model=Schemas.TopLevelGuildSchema)
-def create_guild(
+async def create_guild(
     data: Schemas.GuildIDSchema,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Schemas.TopLevelGuildSchema:
 
     gid = data.guild_id
-    guild = db.query(Models.GuildIDModel).filter(Models.GuildIDModel.guild_id == gid).first()
+    guild = await db.scalar(select(Models.GuildIDModel).filter(Models.GuildIDModel.guild_id == gid))
     if guild is not None:
         raise HTTPException(status_code=409, detail=f"Guild ID '{gid}' already exists")
 
@@ -173,9 +411,12 @@ def create_guild(
 
     db.add_all([id_model, config, giveaway_mgr, profile_mgr, profile_reqs,
                 raffle_mgr, reaction_role_mgr])
-    db.flush()
+    await db.flush()
+    mark_guild_changed(db.sync_session, gid)
+    # Drop any cached "not found" once the new guild is committed.
+    invalidate_guild_on_commit(db.sync_session, gid)
 
-    guild = full_guild_select(db, "First", guild_id=gid)
+    guild = await full_guild_select(db, "First", guild_id=gid)
     if guild is None:
         raise HTTPException(status_code=500, detail="Failed to create guild data")
 
@@ -188,28 +429,19 @@ def create_guild(
 # PATCH Requests
 ################################################################################
 @router.patch("/guilds/{guild_id}/configuration", response_model=Schemas.GuildConfigurationSchema)
-def patch_guild_config(
+async def patch_guild_config(
     guild_id: int,
     data: Schemas.GuildConfigurationUpdateSchema,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ) -> Schemas.GuildConfigurationSchema:
 
-    existing = get_shallow_or_404(db, Models.GuildConfigurationModel, guild_id=guild_id)
+    existing = await get_shallow_or_404(db, Models.GuildConfigurationModel, guild_id=guild_id)
 
     apply_updates(existing, data)
-    action = Models.AuditLogModel(
-        guild_id=guild_id,
-        target=existing.__class__.__name__.rstrip("Model"),
-        target_id=existing.guild_id,
-        action="Update",
-        user_id=data.editor_id,
-        changes=build_audit_log_changes(existing),
-        request_id=None
-    )
-    db.add(action)
+    _record_audit_log_item(guild_id, db, existing, existing.guild_id, "Update", data.editor_id)
 
-    db.flush()
-    db.refresh(existing)
+    await db.flush()
+    await db.refresh(existing)
 
     return Schemas.GuildConfigurationSchema.model_validate(existing)
 
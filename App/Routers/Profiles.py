@@ -4,40 +4,52 @@ from datetime import datetime
 from typing import List, Union, Literal, Optional, Type
 
 from fastapi import APIRouter, Depends, HTTPException, Response
+from sqlalchemy import select
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from .Common import *
 from .. import Models, Schemas
-from ..dependencies import get_dependencies, Dependencies
+from ..dependencies import get_dependencies, get_read_dependencies, get_conditional_read_dependencies, get_page, Dependencies, Page
+from ..responses import SchemaRoute
 ################################################################################
 
-router = APIRouter(prefix="/profiles", tags=["Character Profile Creation"])
+router = APIRouter(prefix="/profiles", tags=["Character Profile Creation"], route_class=SchemaRoute)
 
 ################################################################################
-def full_profile_manager_select(deps: Dependencies) -> Type[Models.ProfileManagerModel]:
+async def full_profile_manager_select(deps: Dependencies, page: Optional[Page] = None) -> Type[Models.ProfileManagerModel]:
 
-    profile_mgr = deps.db.query(Models.ProfileManagerModel).filter_by(guild_id=deps.guild_id).options(
+    paged = page is not None and page.enabled
+    query = select(Models.ProfileManagerModel).filter_by(guild_id=deps.guild_id).options(
         selectinload(Models.ProfileManagerModel.requirements),
         selectinload(Models.ProfileManagerModel.channel_groups),
-        selectinload(Models.ProfileManagerModel.profiles).selectinload(Models.ProfileModel.details),
-        selectinload(Models.ProfileManagerModel.profiles).selectinload(Models.ProfileModel.ataglance),
-        selectinload(Models.ProfileManagerModel.profiles).selectinload(Models.ProfileModel.personality),
-        selectinload(Models.ProfileManagerModel.profiles).selectinload(Models.ProfileModel.images).selectinload(Models.ProfileImagesModel.addl_images),
-    ).first()
-
+    )
+    if not paged:
+        query = query.options(
+            selectinload(Models.ProfileManagerModel.profiles).selectinload(Models.ProfileModel.details),
+            selectinload(Models.ProfileManagerModel.profiles).selectinload(Models.ProfileModel.ataglance),
+            selectinload(Models.ProfileManagerModel.profiles).selectinload(Models.ProfileModel.personality),
+            selectinload(Models.ProfileManagerModel.profiles).selectinload(Models.ProfileModel.images).selectinload(Models.ProfileImagesModel.addl_images),
+        )
+
+    profile_mgr = await deps.db.scalar(query)
     if not profile_mgr:
         raise HTTPException(status_code=404, detail="Profile Manager not found for this guild.")
 
+    if paged:
+        set_committed_value(profile_mgr, "profiles", await full_profile_select(deps, "All", page=page))
+
     return profile_mgr
 
 ################################################################################
-def full_profile_select(
+async def full_profile_select(
     deps: Dependencies,
     mode: Literal["All", "Single"] = "Single",
-    profile_id: Optional[int] = None
+    profile_id: Optional[int] = None,
+    page: Optional[Page] = None
 ):
 
-    query = deps.db.query(Models.ProfileModel).filter_by(guild_id=deps.guild_id).options(
+    query = select(Models.ProfileModel).filter_by(guild_id=deps.guild_id).options(
         selectinload(Models.ProfileModel.details),
         selectinload(Models.ProfileModel.ataglance),
         selectinload(Models.ProfileModel.personality),
@@ -45,46 +57,51 @@ def full_profile_select(
     )
 
     if mode == "All":
-        return query.all()
+        if page is not None:
+            return await page.load(deps.db, query, Models.ProfileModel.id)
+        return (await deps.db.scalars(query)).all()
     elif mode == "Single":
         assert profile_id is not None
-        return query.filter_by(id=profile_id).first()
+        return await deps.db.scalar(query.filter_by(id=profile_id))
 
 ################################################################################
 # GET Requests
 ################################################################################
 @router.get("/", response_model=Schemas.DeepProfileManagerSchema, summary="Get the Profile Manager of the provided guild")
-def get_profile_manager(deps: Dependencies = Depends(get_dependencies)) -> Schemas.DeepProfileManagerSchema:
+async def get_profile_manager(
+    page: Page = Depends(get_page),
+    deps: Dependencies = Depends(get_conditional_read_dependencies)
+) -> Schemas.DeepProfileManagerSchema:
 
-    profile_mgr = full_profile_manager_select(deps)
+    profile_mgr = await full_profile_manager_select(deps, page)
     return Schemas.DeepProfileManagerSchema.model_validate(profile_mgr)
 
 ################################################################################
 @router.get("/{profile_id}", response_model=Schemas.DeepProfileSchema, summary="Get a specific Profile by its ID")
-def get_profile_by_id(
+async def get_profile_by_id(
     profile_id: int,
-    deps: Dependencies = Depends(get_dependencies)
+    deps: Dependencies = Depends(get_read_dependencies)
 ) -> Schemas.DeepProfileSchema:
 
-    profile = get_shallow_or_404(deps.db, Models.ProfileModel, id=profile_id)
+    profile = await get_shallow_or_404(deps.db, Models.ProfileModel, id=profile_id)
     match_or_403(deps.guild_id, profile.guild_id)
 
-    profile = full_profile_select(deps, mode="Single", profile_id=profile_id)
+    profile = await full_profile_select(deps, mode="Single", profile_id=profile_id)
     return Schemas.DeepProfileSchema.model_validate(profile)
 
 ################################################################################
 # POST Requests
 ################################################################################
 @router.post("/", status_code=201, response_model=Schemas.DeepProfileSchema, summary="Create a new Profile")
-def create_profile(
+async def create_profile(
     data: Schemas.ProfileCreateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.DeepProfileSchema:
 
     new_profile = Models.ProfileModel(guild_id=deps.guild_id, **data.model_dump())
     deps.db.add(new_profile)
-    deps.db.flush()
-    deps.db.refresh(new_profile)
+    await deps.db.flush()
+    await deps.db.refresh(new_profile)
 
     audit_log_create(deps, new_profile, new_profile.id)
 
@@ -95,93 +112,93 @@ def create_profile(
     images = Models.ProfileImagesModel(profile_id=new_profile.id)
 
     deps.db.add_all([details, ataglance, personality, images])
-    deps.db.flush()
+    await deps.db.flush()
 
-    profile = full_profile_select(deps, "Single", profile_id=new_profile.id)
+    profile = await full_profile_select(deps, "Single", profile_id=new_profile.id)
     return Schemas.DeepProfileSchema.model_validate(profile)
 
 ################################################################################
 @router.post("/channel-groups", status_code=201, response_model=Schemas.ProfileChannelGroupSchema, summary="Create a new Profile Channel Group")
-def create_profile_channel_group(deps: Dependencies = Depends(get_dependencies)) -> Schemas.ProfileChannelGroupSchema:
+async def create_profile_channel_group(deps: Dependencies = Depends(get_dependencies)) -> Schemas.ProfileChannelGroupSchema:
 
     new_group = Models.ProfileChannelGroupModel(guild_id=deps.guild_id)
     deps.db.add(new_group)
-    deps.db.flush()
-    deps.db.refresh(new_group)
+    await deps.db.flush()
+    await deps.db.refresh(new_group)
 
     audit_log_create(deps, new_group, new_group.id)
     return Schemas.ProfileChannelGroupSchema.model_validate(new_group)
 
 ################################################################################
 @router.post("/{profile_id}/images/additional", status_code=201, response_model=Schemas.ProfileAdditionalImageSchema, summary="Add an additional image to a Profile")
-def add_additional_image(
+async def add_additional_image(
     profile_id: int,
     data: Schemas.ProfileAdditionalImageCreateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.ProfileAdditionalImageSchema:
 
-    profile = get_shallow_or_404(deps.db, Models.ProfileModel, id=profile_id)
+    profile = await get_shallow_or_404(deps.db, Models.ProfileModel, id=profile_id)
     match_or_403(deps.guild_id, profile.guild_id)
 
     new_image = Models.ProfileAdditionalImageModel(profile_id=profile.id, **data.model_dump())
     deps.db.add(new_image)
-    deps.db.flush()
-    deps.db.refresh(new_image)
+    await deps.db.flush()
+    await deps.db.refresh(new_image)
 
-    audit_log_create(deps, new_image, new_image.profile_id)
+    audit_log_create(deps, new_image, new_image.id)
     return Schemas.ProfileAdditionalImageSchema.model_validate(new_image)
 
 ################################################################################
 # DELETE Requests
 ################################################################################
 @router.delete("/{profile_id}", status_code=204, summary="Delete a Profile by its ID")
-def delete_profile(
+async def delete_profile(
     profile_id: int,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Response:
 
-    profile = get_shallow_or_404(deps.db, Models.ProfileModel, id=profile_id)
+    profile = await get_shallow_or_404(deps.db, Models.ProfileModel, id=profile_id)
     match_or_403(deps.guild_id, profile.guild_id)
 
-    deps.db.delete(profile)
+    await deps.db.delete(profile)
     audit_log_delete(deps, profile, profile.id)
-    deps.db.flush()
+    await deps.db.flush()
 
     return Response(status_code=204)
 
 ################################################################################
 @router.delete("/channel-groups/{group_id}", status_code=204, summary="Delete a Profile Channel Group by its ID")
-def delete_profile_channel_group(
+async def delete_profile_channel_group(
     group_id: int,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Response:
 
-    group = get_shallow_or_404(deps.db, Models.ProfileChannelGroupModel, id=group_id)
+    group = await get_shallow_or_404(deps.db, Models.ProfileChannelGroupModel, id=group_id)
     match_or_403(deps.guild_id, group.guild_id)
 
-    deps.db.delete(group)
+    await deps.db.delete(group)
     audit_log_delete(deps, group, group.id)
-    deps.db.flush()
+    await deps.db.flush()
 
     return Response(status_code=204)
 
 ################################################################################
 @router.delete("/{profile_id}/images/additional/{image_id}", status_code=204, summary="Delete an additional image from a Profile")
-def delete_additional_image(
+async def delete_additional_image(
     profile_id: int,
     image_id: int,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Response:
 
-    profile = get_shallow_or_404(deps.db, Models.ProfileModel, id=profile_id)
+    profile = await get_shallow_or_404(deps.db, Models.ProfileModel, id=profile_id)
     match_or_403(deps.guild_id, profile.guild_id)
 
-    image = get_shallow_or_404(deps.db, Models.ProfileAdditionalImageModel, id=image_id)
+    image = await get_shallow_or_404(deps.db, Models.ProfileAdditionalImageModel, id=image_id)
     match_or_403(profile.id, image.profile_id)
 
-    deps.db.delete(image)
+    await deps.db.delete(image)
     audit_log_delete(deps, image, image.id)
-    deps.db.flush()
+    await deps.db.flush()
 
     return Response(status_code=204)
 
@@ -189,164 +206,168 @@ def delete_additional_image(
 # PATCH Requests
 ################################################################################
 @router.patch("/requirements", response_model=Schemas.ProfileRequirementsSchema, summary="Update server Profile Requirements")
-def update_profile_requirements(
+async def update_profile_requirements(
     data: Schemas.ProfileRequirementsUpdateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.ProfileRequirementsSchema:
 
-    requirements = get_shallow_or_404(deps.db, Models.ProfileRequirementsModel, guild_id=deps.guild_id)
+    requirements = await get_shallow_or_404(deps.db, Models.ProfileRequirementsModel, guild_id=deps.guild_id)
     match_or_403(deps.guild_id, requirements.guild_id)
 
     apply_updates(requirements, data)
     audit_log_update(deps, requirements, requirements.guild_id)
 
-    deps.db.flush()
-    deps.db.refresh(requirements)
+    await deps.db.flush()
+    await deps.db.refresh(requirements)
 
     return Schemas.ProfileRequirementsSchema.model_validate(requirements)
 
 ################################################################################
 @router.patch("/channel-groups/{group_id}", response_model=Schemas.ProfileChannelGroupSchema, summary="Update a Profile Channel Group")
-def update_profile_channel_group(
+async def update_profile_channel_group(
     group_id: int,
     data: Schemas.ProfileChannelGroupUpdateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.ProfileChannelGroupSchema:
 
-    group = get_shallow_or_404(deps.db, Models.ProfileChannelGroupModel, id=group_id)
+    group = await get_shallow_or_404(deps.db, Models.ProfileChannelGroupModel, id=group_id)
     match_or_403(deps.guild_id, group.guild_id)
 
     apply_updates(group, data)
     audit_log_update(deps, group, group.id)
 
-    deps.db.flush()
-    deps.db.refresh(group)
+    await deps.db.flush()
+    await deps.db.refresh(group)
 
     return Schemas.ProfileChannelGroupSchema.model_validate(group)
 
 ################################################################################
 @router.patch("/{profile_id}", response_model=Schemas.DeepProfileSchema, summary="Update a Profile's core data.")
-def update_profile(
+async def update_profile(
     profile_id: int,
     data: Schemas.ProfileUpdateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.DeepProfileSchema:
 
-    profile = get_shallow_or_404(deps.db, Models.ProfileModel, id=profile_id)
+    profile = await get_shallow_or_404(deps.db, Models.ProfileModel, id=profile_id)
     match_or_403(deps.guild_id, profile.guild_id)
 
     apply_updates(profile, data)
     audit_log_update(deps, profile, profile.id)
 
-    deps.db.flush()
-    deps.db.refresh(profile)
+    await deps.db.flush()
+    await deps.db.refresh(profile)
 
+    profile = await full_profile_select(deps, "Single", profile_id=profile.id)
     return Schemas.DeepProfileSchema.model_validate(profile)
 
 ################################################################################
 @router.patch("/{profile_id}/details", response_model=Schemas.ProfileDetailsSchema, summary="Update a Profile's details.")
-def update_profile_details(
+async def update_profile_details(
     profile_id: int,
     data: Schemas.ProfileDetailsUpdateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.ProfileDetailsSchema:
 
-    profile = get_shallow_or_404(deps.db, Models.ProfileModel, id=profile_id)
+    profile = await get_shallow_or_404(deps.db, Models.ProfileModel, id=profile_id)
     match_or_403(deps.guild_id, profile.guild_id)
 
-    details = get_shallow_or_404(deps.db, Models.ProfileDetailsModel, profile_id=profile.id)
+    details = await get_shallow_or_404(deps.db, Models.ProfileDetailsModel, profile_id=profile.id)
 
     apply_updates(details, data)
     audit_log_update(deps, details, details.profile_id)
 
-    deps.db.flush()
-    deps.db.refresh(details)
+    await deps.db.flush()
+    await deps.db.refresh(details)
 
     return Schemas.ProfileDetailsSchema.model_validate(details)
 
 ################################################################################
 @router.patch("/{profile_id}/at-a-glance", response_model=Schemas.ProfileAtAGlanceSchema, summary="Update a Profile's At-A-Glance data.")
-def update_profile_at_a_glance(
+async def update_profile_at_a_glance(
     profile_id: int,
     data: Schemas.ProfileAtAGlanceUpdateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.ProfileAtAGlanceSchema:
 
-    profile = get_shallow_or_404(deps.db, Models.ProfileModel, id=profile_id)
+    profile = await get_shallow_or_404(deps.db, Models.ProfileModel, id=profile_id)
     match_or_403(deps.guild_id, profile.guild_id)
 
-    ataglance = get_shallow_or_404(deps.db, Models.ProfileAtAGlanceModel, profile_id=profile.id)
+    ataglance = await get_shallow_or_404(deps.db, Models.ProfileAtAGlanceModel, profile_id=profile.id)
 
     apply_updates(ataglance, data)
     audit_log_update(deps, ataglance, ataglance.profile_id)
 
-    deps.db.flush()
-    deps.db.refresh(ataglance)
+    await deps.db.flush()
+    await deps.db.refresh(ataglance)
 
     return Schemas.ProfileAtAGlanceSchema.model_validate(ataglance)
 
 ################################################################################
 @router.patch("/{profile_id}/personality", response_model=Schemas.ProfilePersonalitySchema, summary="Update a Profile's Personality data.")
-def update_profile_personality(
+async def update_profile_personality(
     profile_id: int,
     data: Schemas.ProfilePersonalityUpdateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.ProfilePersonalitySchema:
 
-    profile = get_shallow_or_404(deps.db, Models.ProfileModel, id=profile_id)
+    profile = await get_shallow_or_404(deps.db, Models.ProfileModel, id=profile_id)
     match_or_403(deps.guild_id, profile.guild_id)
 
-    personality = get_shallow_or_404(deps.db, Models.ProfilePersonalityModel, profile_id=profile.id)
+    personality = await get_shallow_or_404(deps.db, Models.ProfilePersonalityModel, profile_id=profile.id)
 
     apply_updates(personality, data)
     audit_log_update(deps, personality, personality.profile_id)
 
-    deps.db.flush()
-    deps.db.refresh(personality)
+    await deps.db.flush()
+    await deps.db.refresh(personality)
 
     return Schemas.ProfilePersonalitySchema.model_validate(personality)
 
 ################################################################################
 @router.patch("/{profile_id}/images", response_model=Schemas.ProfileImagesSchema, summary="Update a Profile's images.")
-def update_profile_images(
+async def update_profile_images(
     profile_id: int,
     data: Schemas.ProfileImagesUpdateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.ProfileImagesSchema:
 
-    profile = get_shallow_or_404(deps.db, Models.ProfileModel, id=profile_id)
+    profile = await get_shallow_or_404(deps.db, Models.ProfileModel, id=profile_id)
     match_or_403(deps.guild_id, profile.guild_id)
 
-    images = get_shallow_or_404(deps.db, Models.ProfileImagesModel, profile_id=profile.id)
+    images = await get_shallow_or_404(deps.db, Models.ProfileImagesModel, profile_id=profile.id)
 
     apply_updates(images, data)
     audit_log_update(deps, images, images.profile_id)
 
-    deps.db.flush()
-    deps.db.refresh(images)
+    await deps.db.flush()
+    await deps.db.refresh(images)
 
+    images = await deps.db.scalar(select(Models.ProfileImagesModel).filter_by(profile_id=profile.id).options(
+        selectinload(Models.ProfileImagesModel.addl_images)
+    ))
     return Schemas.ProfileImagesSchema.model_validate(images)
 
 ################################################################################
 @router.patch("/{profile_id}/images/additional/{image_id}", response_model=Schemas.ProfileAdditionalImageSchema, summary="Update an additional image of a Profile")
-def update_additional_image(
+async def update_additional_image(
     profile_id: int,
     image_id: int,
     data: Schemas.ProfileAdditionalImageUpdateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.ProfileAdditionalImageSchema:
 
-    profile = get_shallow_or_404(deps.db, Models.ProfileModel, id=profile_id)
+    profile = await get_shallow_or_404(deps.db, Models.ProfileModel, id=profile_id)
     match_or_403(deps.guild_id, profile.guild_id)
 
-    image = get_shallow_or_404(deps.db, Models.ProfileAdditionalImageModel, id=image_id)
+    image = await get_shallow_or_404(deps.db, Models.ProfileAdditionalImageModel, id=image_id)
     match_or_403(profile.id, image.profile_id)
 
     apply_updates(image, data)
     audit_log_update(deps, image, image.id)
 
-    deps.db.flush()
-    deps.db.refresh(image)
+    await deps.db.flush()
+    await deps.db.refresh(image)
 
     return Schemas.ProfileAdditionalImageSchema.model_validate(image)
 
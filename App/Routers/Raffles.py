@@ -1,136 +1,257 @@
 from __future__ import annotations
 
-from datetime import datetime
+import secrets
+from datetime import UTC, datetime
 from typing import List, Union, Literal, Optional, Type
 
-from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import func, select
 from sqlalchemy.orm import selectinload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from .Common import *
 from .. import Models, Schemas
-from ..dependencies import get_dependencies, Dependencies
+from ..dependencies import get_dependencies, get_read_dependencies, get_page, Dependencies, Page
+from ..fieldsets import select_all, Nested, Selection, Shape
+from ..responses import SchemaRoute
+from ..sampling import sample_weighted
 ################################################################################
 
-router = APIRouter(prefix="/raffles", tags=["Raffle Management"])
+router = APIRouter(prefix="/raffles", tags=["Raffle Management"], route_class=SchemaRoute)
 
-################################################################################
-def full_raffle_manager_select(deps: Dependencies) -> Type[Models.RaffleManagerModel]:
+# Draw seeds stay within the integers a JavaScript client can hold exactly.
+SEED_BITS = 53
 
-    manager = deps.db.query(Models.RaffleManagerModel).filter_by(guild_id=deps.guild_id).options(
-        selectinload(Models.RaffleManagerModel.raffles).selectinload(Models.RaffleModel.entries),
-    ).first()
+################################################################################
+RAFFLE_SHAPE = Shape(Schemas.DeepRaffleSchema, Models.RaffleModel, nested={
+    "entries": Nested(Models.RaffleModel.entries, Shape(Schemas.RaffleEntrySchema, Models.RaffleEntryModel)),
+})
+RAFFLE_MANAGER_SHAPE = Shape(Schemas.DeepRaffleManagerSchema, Models.RaffleManagerModel, nested={
+    "raffles": Nested(Models.RaffleManagerModel.raffles, RAFFLE_SHAPE),
+})
 
+################################################################################
+async def full_raffle_manager_select(
+    deps: Dependencies,
+    page: Optional[Page] = None,
+    selection: Optional[Selection] = None
+) -> Type[Models.RaffleManagerModel]:
+
+    paged = page is not None and page.enabled
+    query = select(Models.RaffleManagerModel).filter_by(guild_id=deps.guild_id)
+    if selection is not None:
+        query = query.options(*(selection.without("raffles") if paged else selection).options())
+    elif not paged:
+        query = query.options(selectinload(Models.RaffleManagerModel.raffles).selectinload(Models.RaffleModel.entries))
+
+    manager = await deps.db.scalar(query)
     if not manager:
         raise HTTPException(status_code=404, detail="Raffle Manager not found for this guild.")
 
+    raffle_selection = selection.child("raffles") if selection is not None else None
+    if paged and (selection is None or raffle_selection is not None):
+        raffles = await full_raffle_select(deps, "All", page=page, selection=raffle_selection)
+        set_committed_value(manager, "raffles", raffles)
+
     return manager
 
 ################################################################################
-def full_raffle_select(
+async def full_raffle_select(
     deps: Dependencies,
     mode: Literal["All", "Single"] = "Single",
-    raffle_id: Optional[int] = None
+    raffle_id: Optional[int] = None,
+    page: Optional[Page] = None,
+    selection: Optional[Selection] = None
 ) -> Union[List[Type[Models.RaffleModel]], Type[Models.RaffleModel]]:
-
-    query = deps.db.query(Models.RaffleModel).filter_by(guild_id=deps.guild_id).options(
-        selectinload(Models.RaffleModel.entries),
-    )
+    """
+    With a page, "All" loads one page of raffles and "Single" loads one page
+    of the raffle's entries. With a selection, only the columns and children
+    it names are loaded.
+    """
+
+    paged = page is not None and page.enabled
+    entries_paged = paged and mode == "Single"
+    query = select(Models.RaffleModel).filter_by(guild_id=deps.guild_id)
+    if selection is not None:
+        query = query.options(*(selection.without("entries") if entries_paged else selection).options())
+    elif not entries_paged:
+        query = query.options(selectinload(Models.RaffleModel.entries))
 
     if mode == "All":
-        return query.all()
+        if page is not None:
+            return await page.load(deps.db, query, Models.RaffleModel.id)
+        return (await deps.db.scalars(query)).all()
     elif mode == "Single":
         assert raffle_id is not None
-        return query.filter_by(id=raffle_id).first()
+        raffle = await deps.db.scalar(query.filter_by(id=raffle_id))
+        if raffle is not None and entries_paged:
+            entries = select(Models.RaffleEntryModel).filter_by(raffle_id=raffle.id)
+            set_committed_value(raffle, "entries", await page.load(deps.db, entries, Models.RaffleEntryModel.id))
+        return raffle
 
 ################################################################################
 # GET Requests
 ################################################################################
-@router.get("/", response_model=Schemas.DeepRaffleManagerSchema, summary="Get the Raffle Manager of the provided guild")
-def get_raffle_manager(deps: Dependencies = Depends(get_dependencies)) -> Schemas.DeepRaffleManagerSchema:
+@router.get(
+    "/",
+    response_model=Schemas.DeepRaffleManagerSchema,
+    summary="Get the Raffle Manager of the provided guild",
+    description=(
+        "When paged, the raffles are returned without their entries; page "
+        "through a raffle's entries with GET /raffles/{raffle_id}."
+    )
+)
+async def get_raffle_manager(
+    page: Page = Depends(get_page),
+    deps: Dependencies = Depends(get_read_dependencies)
+) -> Schemas.DeepRaffleManagerSchema:
 
-    manager = full_raffle_manager_select(deps)
+    if page.enabled:
+        # A page bounds the raffles but not their entries, so those are left out.
+        selection = select_all(RAFFLE_MANAGER_SHAPE).without("raffles.entries")
+        return selection.dump(await full_raffle_manager_select(deps, page, selection))
+
+    manager = await full_raffle_manager_select(deps, page)
     return Schemas.DeepRaffleManagerSchema.model_validate(manager)
 
 ################################################################################
 @router.get("/{raffle_id}", response_model=Schemas.DeepRaffleSchema, summary="Get a specific Raffle by its ID")
-def get_raffle(
+async def get_raffle(
     raffle_id: int,
-    deps: Dependencies = Depends(get_dependencies)
+    page: Page = Depends(get_page),
+    deps: Dependencies = Depends(get_read_dependencies)
 ) -> Schemas.DeepRaffleSchema:
 
-    raffle = get_shallow_or_404(deps.db, Models.RaffleModel, id=raffle_id)
+    raffle = await get_shallow_or_404(deps.db, Models.RaffleModel, id=raffle_id)
     match_or_403(deps.guild_id, raffle.guild_id)
 
-    raffle = full_raffle_select(deps, mode="Single", raffle_id=raffle_id)
+    raffle = await full_raffle_select(deps, mode="Single", raffle_id=raffle_id, page=page)
     return Schemas.DeepRaffleSchema.model_validate(raffle)
 
 ################################################################################
 # POST Requests
 ################################################################################
 @router.post("/", status_code=201, response_model=Schemas.DeepRaffleSchema, summary="Create a new Raffle")
-def create_raffle(deps: Dependencies = Depends(get_dependencies)) -> Schemas.DeepRaffleSchema:
+async def create_raffle(deps: Dependencies = Depends(get_dependencies)) -> Schemas.DeepRaffleSchema:
 
     new_raffle = Models.RaffleModel(guild_id=deps.guild_id)
     deps.db.add(new_raffle)
-    deps.db.flush()
-    deps.db.refresh(new_raffle)
+    await deps.db.flush()
+    await deps.db.refresh(new_raffle)
 
     audit_log_create(deps, new_raffle, new_raffle.id)
+
+    new_raffle = await full_raffle_select(deps, "Single", raffle_id=new_raffle.id)
     return Schemas.DeepRaffleSchema.model_validate(new_raffle)
 
 ################################################################################
 @router.post("/{raffle_id}/entries", status_code=201, response_model=Schemas.RaffleEntrySchema, summary="Create a new entry for a user in a Raffle")
-def create_raffle_entry(
+async def create_raffle_entry(
     raffle_id: int,
     data: Schemas.RaffleEntryCreateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.RaffleEntrySchema:
 
-    raffle = get_shallow_or_404(deps.db, Models.RaffleModel, id=raffle_id)
+    raffle = await get_shallow_or_404(deps.db, Models.RaffleModel, id=raffle_id)
     match_or_403(deps.guild_id, raffle.guild_id)
 
     entry = Models.RaffleEntryModel(raffle_id=raffle.id, **data.model_dump())
     deps.db.add(entry)
-    deps.db.flush()
-    deps.db.refresh(entry)
+    await deps.db.flush()
+    await deps.db.refresh(entry)
 
     audit_log_create(deps, entry, entry.id)
     return Schemas.RaffleEntrySchema.model_validate(entry)
 
+################################################################################
+@router.post("/{raffle_id}/draw", response_model=Schemas.RaffleDrawSchema, summary="Draw the winners of a Raffle")
+async def draw_raffle(
+    raffle_id: int,
+    seed: Optional[int] = Query(
+        None,
+        ge=0,
+        lt=2 ** SEED_BITS,
+        description="Seed for a reproducible draw; a random one is used if omitted"
+    ),
+    reroll: bool = Query(False, description="Draw again even if the raffle has already been rolled"),
+    deps: Dependencies = Depends(get_dependencies)
+) -> Schemas.RaffleDrawSchema:
+    """
+    Draws ``num_winners`` distinct users, each weighted by their total ticket
+    quantity, and records them as the winners. Tickets are never expanded:
+    one row per user is streamed from the database.
+    """
+
+    raffle = await get_shallow_or_404(deps.db, Models.RaffleModel, id=raffle_id)
+    match_or_403(deps.guild_id, raffle.guild_id)
+
+    # Hold the row until commit so concurrent draws can't both go through.
+    await deps.db.refresh(raffle, with_for_update=True)
+    if raffle.rolled_at is not None and not reroll:
+        raise HTTPException(status_code=409, detail="Raffle has already been rolled")
+
+    if raffle.num_winners is None or raffle.num_winners < 1:
+        raise HTTPException(
+            status_code=409,
+            detail="Raffle has no number of winners configured; set num_winners to at least 1"
+        )
+
+    if seed is None:
+        seed = secrets.randbits(SEED_BITS)
+
+    # Ordered so that a seed always replays the same draw over the same entries.
+    tickets = (
+        select(Models.RaffleEntryModel.user_id, func.sum(Models.RaffleEntryModel.quantity))
+        .filter_by(raffle_id=raffle.id)
+        .group_by(Models.RaffleEntryModel.user_id)
+        .order_by(Models.RaffleEntryModel.user_id)
+    )
+    winners = await sample_weighted(deps.db, tickets, raffle.num_winners, seed=seed)
+    if not winners:
+        raise HTTPException(status_code=409, detail="Raffle has no tickets to draw from")
+
+    raffle.winners = winners
+    raffle.rolled_at = datetime.now(UTC).replace(tzinfo=None)
+    raffle.rolled_by = deps.actor_id
+    audit_log_update(deps, raffle, raffle.id)
+    await deps.db.flush()
+
+    return Schemas.RaffleDrawSchema(winners=winners, rolled_at=raffle.rolled_at, rolled_by=raffle.rolled_by, seed=seed)
+
 ################################################################################
 # DELETE Requests
 ################################################################################
 @router.delete("/{raffle_id}", status_code=204, summary="Delete a Raffle by its ID")
-def delete_raffle(
+async def delete_raffle(
     raffle_id: int,
     deps: Dependencies = Depends(get_dependencies)
 ):
 
-    raffle = get_shallow_or_404(deps.db, Models.RaffleModel, id=raffle_id)
+    raffle = await get_shallow_or_404(deps.db, Models.RaffleModel, id=raffle_id)
 
-    deps.db.delete(raffle)
+    await deps.db.delete(raffle)
     audit_log_delete(deps, raffle, raffle.id)
-    deps.db.flush()
+    await deps.db.flush()
 
     return Response(status_code=204)
 
 ################################################################################
 @router.delete("/{raffle_id}/entries/{entry_id}", status_code=204, summary="Delete a Raffle Entry by its ID")
-def delete_raffle_entry(
+async def delete_raffle_entry(
     raffle_id: int,
     entry_id: int,
     deps: Dependencies = Depends(get_dependencies)
 ):
 
-    raffle = get_shallow_or_404(deps.db, Models.RaffleModel, id=raffle_id)
+    raffle = await get_shallow_or_404(deps.db, Models.RaffleModel, id=raffle_id)
     match_or_403(deps.guild_id, raffle.guild_id)
 
-    entry = get_shallow_or_404(deps.db, Models.RaffleEntryModel, id=entry_id, raffle_id=raffle.id)
+    entry = await get_shallow_or_404(deps.db, Models.RaffleEntryModel, id=entry_id, raffle_id=raffle.id)
     match_or_403(raffle.id, entry.raffle_id)
 
-    deps.db.delete(entry)
+    await deps.db.delete(entry)
     audit_log_delete(deps, entry, entry.id)
-    deps.db.flush()
+    await deps.db.flush()
 
     return Response(status_code=204)
 
@@ -138,60 +259,62 @@ def delete_raffle_entry(
 # PATCH Requests
 ################################################################################
 @router.patch("/", response_model=Schemas.DeepRaffleManagerSchema, summary="Update the Raffle Manager")
-def update_raffle_manager(
+async def update_raffle_manager(
     data: Schemas.RaffleManagerUpdateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.DeepRaffleManagerSchema:
 
-    manager = full_raffle_manager_select(deps)
+    manager = await full_raffle_manager_select(deps)
 
     apply_updates(manager, data)
     audit_log_update(deps, manager, manager.guild_id)
 
-    deps.db.flush()
-    deps.db.refresh(manager)
+    await deps.db.flush()
+    await deps.db.refresh(manager)
 
+    manager = await full_raffle_manager_select(deps)
     return Schemas.DeepRaffleManagerSchema.model_validate(manager)
 
 ################################################################################
 @router.patch("/{raffle_id}", response_model=Schemas.DeepRaffleSchema, summary="Update a Raffle by its ID")
-def update_raffle(
+async def update_raffle(
     raffle_id: int,
     data: Schemas.RaffleUpdateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.DeepRaffleSchema:
 
-    raffle = get_shallow_or_404(deps.db, Models.RaffleModel, id=raffle_id)
+    raffle = await get_shallow_or_404(deps.db, Models.RaffleModel, id=raffle_id)
     match_or_403(deps.guild_id, raffle.guild_id)
 
     apply_updates(raffle, data)
     audit_log_update(deps, raffle, raffle.id)
 
-    deps.db.flush()
-    deps.db.refresh(raffle)
+    await deps.db.flush()
+    await deps.db.refresh(raffle)
 
+    raffle = await full_raffle_select(deps, "Single", raffle_id=raffle.id)
     return Schemas.DeepRaffleSchema.model_validate(raffle)
 
 ################################################################################
 @router.patch("/{raffle_id}/entries/{entry_id}", response_model=Schemas.RaffleEntrySchema, summary="Update a Raffle Entry by its ID")
-def update_raffle_entry(
+async def update_raffle_entry(
     raffle_id: int,
     entry_id: int,
     data: Schemas.RaffleEntryUpdateSchema,
     deps: Dependencies = Depends(get_dependencies)
 ) -> Schemas.RaffleEntrySchema:
 
-    raffle = get_shallow_or_404(deps.db, Models.RaffleModel, id=raffle_id)
+    raffle = await get_shallow_or_404(deps.db, Models.RaffleModel, id=raffle_id)
     match_or_403(deps.guild_id, raffle.guild_id)
 
-    entry = get_shallow_or_404(deps.db, Models.RaffleEntryModel, id=entry_id, raffle_id=raffle.id)
+    entry = await get_shallow_or_404(deps.db, Models.RaffleEntryModel, id=entry_id, raffle_id=raffle.id)
     match_or_403(raffle.id, entry.raffle_id)
 
     apply_updates(entry, data)
     audit_log_update(deps, entry, entry.id)
 
-    deps.db.flush()
-    deps.db.refresh(entry)
+    await deps.db.flush()
+    await deps.db.refresh(entry)
 
     return Schemas.RaffleEntrySchema.model_validate(entry)
 
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+from typing import Literal
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from .. import Schemas
+from ..audit import audit_writer
+from ..auth import get_current_user, password_pool
+from ..cache import guild_cache
+from ..database import engine, replica_engine, pool_status
+from ..events import change_bridge, change_feed
+from ..responses import SchemaRoute
+from ..tracing import trace_buffer
+################################################################################
+
+router = APIRouter(prefix="/system", tags=["System Diagnostics"], route_class=SchemaRoute)
+
+################################################################################
+@router.get("/pool", response_model=Schemas.PoolStatusSchema, summary="Get the database pool status of this worker")
+async def get_pool_status(
+    target: Literal["primary", "replica"] = Query("primary", description="Which engine's pool to report on"),
+    _: int = Depends(get_current_user)
+) -> Schemas.PoolStatusSchema:
+
+    if target == "replica":
+        if replica_engine is None:
+            raise HTTPException(status_code=404, detail="No read replica is configured")
+        return Schemas.PoolStatusSchema.model_validate(pool_status(replica_engine))
+
+    return Schemas.PoolStatusSchema.model_validate(pool_status(engine))
+
+################################################################################
+@router.get("/guild-cache", response_model=Schemas.GuildCacheStatusSchema, summary="Get the guild cache statistics of this worker")
+async def get_guild_cache_status(_: int = Depends(get_current_user)) -> Schemas.GuildCacheStatusSchema:
+
+    return Schemas.GuildCacheStatusSchema.model_validate(guild_cache.stats())
+
+################################################################################
+@router.get("/password-hash", response_model=Schemas.PasswordHashPoolStatusSchema, summary="Get the password hashing pool status of this worker")
+async def get_password_hash_status(_: int = Depends(get_current_user)) -> Schemas.PasswordHashPoolStatusSchema:
+
+    return Schemas.PasswordHashPoolStatusSchema.model_validate(password_pool.snapshot())
+
+################################################################################
+@router.get("/audit-writer", response_model=Schemas.AuditWriterStatusSchema, summary="Get the audit log writer status of this worker")
+async def get_audit_writer_status(_: int = Depends(get_current_user)) -> Schemas.AuditWriterStatusSchema:
+
+    return Schemas.AuditWriterStatusSchema.model_validate(audit_writer.stats())
+
+################################################################################
+@router.get("/change-feed", response_model=Schemas.ChangeFeedStatusSchema, summary="Get the change feed status of this worker")
+async def get_change_feed_status(_: int = Depends(get_current_user)) -> Schemas.ChangeFeedStatusSchema:
+
+    return Schemas.ChangeFeedStatusSchema.model_validate({**change_feed.stats(), **change_bridge.stats()})
+
+################################################################################
+@router.get("/requests/{request_id}", response_model=Schemas.RequestTraceSchema, summary="Get the timing record of a recent request")
+async def get_request_trace(
+    request_id: UUID,
+    _: int = Depends(get_current_user)
+) -> Schemas.RequestTraceSchema:
+
+    trace = trace_buffer.get(request_id)
+    if trace is None:
+        raise HTTPException(status_code=404, detail=f"Request '{request_id}' not found on this worker")
+
+    return Schemas.RequestTraceSchema.model_validate(trace)
+
+################################################################################
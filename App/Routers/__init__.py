@@ -1,5 +1,8 @@
+from .AuditLog import *
 from .Auth import *
+from .Changes import *
 from .Embeds import *
+from .Events import *
 from .Forms import *
 from .Giveaways import *
 from .Glyphs import *
@@ -8,4 +11,5 @@ from .Positions import *
 from .Profiles import *
 from .Raffles import *
 from .ReactionRoles import *
+from .System import *
 ################################################################################
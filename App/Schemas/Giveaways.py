@@ -3,6 +3,7 @@ from typing import Optional, List, Any, Dict
 from datetime import datetime
 from pydantic import Field
 from App import limits
+from App.config import settings
 
 from .Common import *
 ################################################################################
@@ -15,6 +16,9 @@ __all__ = (
     "GiveawayDetailsSchema",
     "GiveawayEntrySchema",
     "GiveawayEntryCreateSchema",
+    "GiveawayEntryBulkCreateSchema",
+    "GiveawayEntryBulkResultSchema",
+    "GiveawayRollSchema",
     "GiveawayManagerUpdateSchema",
     "GiveawayUpdateSchema",
     "GiveawayDetailsUpdateSchema",
@@ -92,6 +96,38 @@ class GiveawayEntryCreateSchema(BaseSchema):
 
     user_id: int = Field(..., description="The user ID of the participant in the giveaway.")
 
+################################################################################
+class GiveawayEntryBulkCreateSchema(BaseSchema):
+    """
+    Schema for adding many entries to a giveaway at once.
+    """
+
+    user_ids: List[int] = Field(
+        ...,
+        min_length=1,
+        max_length=settings.GIVEAWAY_BULK_ENTRY_MAX,
+        description="The user IDs of the participants to enter into the giveaway.",
+    )
+
+################################################################################
+class GiveawayEntryBulkResultSchema(BaseSchema):
+    """
+    Schema for the outcome of a bulk entry request.
+    """
+
+    inserted: int = Field(..., description="The number of new entries created.")
+    duplicates: int = Field(..., description="The number of user IDs that were already entered or repeated in the request.")
+
+################################################################################
+class GiveawayRollSchema(BaseSchema):
+    """
+    Schema for the outcome of rolling a giveaway.
+    """
+
+    winners: List[int] = Field(..., description="The user IDs of the winners drawn.")
+    rolled_at: datetime = Field(..., description="The timestamp when the giveaway was rolled.")
+    rolled_by: int = Field(..., description="The user ID of the person who rolled the giveaway.")
+
 ################################################################################
 class GiveawayManagerUpdateSchema(BaseSchema):
     """
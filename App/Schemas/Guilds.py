@@ -1,7 +1,7 @@
 from __future__ import annotations
 
 from pydantic import RootModel, Field
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
 from .Common import *
 from .Embeds import DeepEmbedSchema
@@ -13,6 +13,10 @@ __all__ = (
     "GuildDataSchema",
     "GuildConfigurationSchema",
     "GuildConfigurationUpdateSchema",
+    "GuildRevisionSchema",
+    "GuildSnapshotSectionSchema",
+    "BootstrapGuildSchema",
+    "GuildChangesSchema",
 )
 
 ################################################################################
@@ -71,3 +75,49 @@ class GuildConfigurationUpdateSchema(BaseSchema):
     editor_id: int = Field(..., description="The ID of the user making the changes to the guild configuration.")
 
 ################################################################################
+class GuildRevisionSchema(GuildIDSchema):
+    """
+    Schema for a guild's current revision.
+    """
+
+    revision: int = Field(..., description="Incremented on every committed write to the guild.")
+
+################################################################################
+class GuildSnapshotSectionSchema(BaseSchema):
+    """
+    Schema for a single line of a streamed guild snapshot.
+    """
+
+    section: str = Field(..., description="The name of the section, e.g. 'configuration' or 'giveaway_mgr'.")
+    data: Any = Field(..., description="The fully hydrated data for the section.")
+
+################################################################################
+class BootstrapGuildSchema(GuildRevisionSchema):
+    """
+    Schema for a single guild in a shard's bootstrap stream.
+    """
+
+    data: Dict[str, Any] = Field(..., description="Every snapshot section of the guild, keyed by section name.")
+
+################################################################################
+class GuildChangesSchema(GuildIDSchema):
+    """
+    Schema for the coalesced changes made to a guild after a given revision.
+    """
+
+    since: int = Field(..., description="The revision the changes were requested from.")
+    revision: int = Field(..., description="The revision these changes bring the caller up to; pass it as 'since' next time.")
+    changed: Dict[str, List[Any]] = Field(
+        default_factory=dict,
+        description="The current state of every created or updated entity, keyed by entity type.",
+    )
+    deleted: Dict[str, List[int]] = Field(
+        default_factory=dict,
+        description="The IDs of deleted entities, keyed by entity type.",
+    )
+    resync: List[str] = Field(
+        default_factory=list,
+        description="Entity types whose changes could not be resolved and have to be reloaded in full.",
+    )
+
+################################################################################
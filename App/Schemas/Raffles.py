@@ -17,6 +17,7 @@ __all__ = (
     "RaffleUpdateSchema",
     "RaffleEntryUpdateSchema",
     "RaffleEntryCreateSchema",
+    "RaffleDrawSchema",
 )
 
 ################################################################################
@@ -126,3 +127,14 @@ class RaffleEntryCreateSchema(BaseSchema):
     quantity: int = Field(..., description="The number of tickets purchased by the user for this raffle.")
 
 ################################################################################
+class RaffleDrawSchema(BaseSchema):
+    """
+    Schema for the outcome of drawing a raffle.
+    """
+
+    winners: List[int] = Field(..., description="The user IDs of the winners, in the order they were drawn.")
+    rolled_at: datetime = Field(..., description="The time when the raffle was rolled.")
+    rolled_by: int = Field(..., description="The user who rolled the raffle.")
+    seed: int = Field(..., description="The seed the draw used; the same seed over the same entries gives the same winners.")
+
+################################################################################
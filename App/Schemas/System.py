@@ -1,5 +1,6 @@
 from __future__ import annotations
-from typing import Optional, List
+from typing import Optional, List, Dict, Any
+from uuid import UUID
 from datetime import datetime
 from pydantic import Field
 from App import limits
@@ -14,6 +15,15 @@ __all__ = (
     "LoginSchema",
     "AccessTokenSchema",
     "TokenDataSchema",
+    "PoolStatusSchema",
+    "GuildCacheStatusSchema",
+    "PasswordHashPoolStatusSchema",
+    "AuditWriterStatusSchema",
+    "ChangeFeedStatusSchema",
+    "AuditLogEntrySchema",
+    "AuditLogPageSchema",
+    "TracedStatementSchema",
+    "RequestTraceSchema",
 )
 
 ################################################################################
@@ -53,3 +63,138 @@ class TokenDataSchema(BaseSchema):
     id: Optional[int] = None
 
 ################################################################################
+class PoolStatusSchema(BaseSchema):
+    """
+    Schema for a single worker's database connection pool status.
+    """
+
+    pid: int = Field(..., description="The process ID of the worker reporting this status.")
+    size: int = Field(..., description="The configured number of persistent connections.")
+    checked_in: int = Field(..., description="The number of idle connections available in the pool.")
+    checked_out: int = Field(..., description="The number of connections currently in use.")
+    overflow: int = Field(..., description="The number of overflow connections currently open.")
+    max_overflow: int = Field(..., description="The maximum number of overflow connections allowed.")
+    timeout: float = Field(..., description="Seconds a request waits for a connection before failing.")
+    fast_fail: bool = Field(..., description="Whether exhausted-pool requests are rejected with a 503.")
+    checkouts: int = Field(0, description="The number of successful connection checkouts.")
+    timeouts: int = Field(0, description="The number of checkouts that timed out waiting for a connection.")
+    avg_wait: float = Field(0.0, description="The average checkout wait time, in seconds.")
+    max_wait: float = Field(0.0, description="The longest checkout wait time, in seconds.")
+    wait_histogram: Dict[str, int] = Field(
+        default_factory=dict,
+        description="Checkout counts keyed by wait time upper bound, in seconds.",
+    )
+
+################################################################################
+class GuildCacheStatusSchema(BaseSchema):
+    """
+    Schema for a single worker's guild existence cache statistics.
+    """
+
+    size: int = Field(..., description="The number of guild IDs currently cached.")
+    max_size: int = Field(..., description="The maximum number of guild IDs kept before eviction.")
+    ttl: float = Field(..., description="Seconds an existing guild stays cached.")
+    negative_ttl: float = Field(..., description="Seconds an unknown guild stays cached.")
+    hits: int = Field(..., description="The number of lookups answered from the cache.")
+    misses: int = Field(..., description="The number of lookups that had to query the database.")
+    hit_ratio: float = Field(..., description="The fraction of lookups answered from the cache.")
+
+################################################################################
+class PasswordHashPoolStatusSchema(BaseSchema):
+    """
+    Schema for a single worker's password hashing pool status.
+    """
+
+    workers: int = Field(..., description="The number of threads dedicated to password hashing.")
+    max_queue: int = Field(..., description="The number of calls allowed to wait before new ones are rejected.")
+    running: int = Field(..., description="The number of hashing calls currently executing.")
+    queued: int = Field(..., description="The number of hashing calls waiting for a free worker.")
+    completed: int = Field(..., description="The number of hashing calls that have finished.")
+    rejected: int = Field(..., description="The number of hashing calls rejected because the queue was full.")
+    avg_wait: float = Field(..., description="The average time a call waited for a worker, in seconds.")
+    max_wait: float = Field(..., description="The longest time a call waited for a worker, in seconds.")
+    avg_run: float = Field(..., description="The average time a hashing call took to run, in seconds.")
+
+################################################################################
+class AuditWriterStatusSchema(BaseSchema):
+    """
+    Schema for a single worker's buffered audit log writer status.
+    """
+
+    buffered: int = Field(..., description="The number of entries waiting to be written.")
+    submitted: int = Field(..., description="The number of committed entries handed to the writer.")
+    written: int = Field(..., description="The number of entries inserted into the audit log.")
+    batches: int = Field(..., description="The number of bulk inserts performed.")
+    failures: int = Field(..., description="The number of bulk inserts that failed and were retried.")
+    batch_size: int = Field(..., description="The number of buffered entries that triggers an early flush.")
+    flush_interval: float = Field(..., description="Seconds between scheduled flushes.")
+    spool_enabled: bool = Field(..., description="Whether buffered entries are spooled to disk.")
+
+################################################################################
+class ChangeFeedStatusSchema(BaseSchema):
+    """
+    Schema for a single worker's change feed status.
+    """
+
+    guilds: int = Field(..., description="The number of guilds with at least one subscriber.")
+    subscribers: int = Field(..., description="The number of open change feed streams.")
+    published: int = Field(..., description="The number of notifications published to this worker's feed.")
+    delivered: int = Field(..., description="The number of notifications queued for a subscriber.")
+    overflows: int = Field(..., description="The number of times a full subscriber queue was replaced by a resync.")
+    queue_size: int = Field(..., description="The number of notifications a subscriber can fall behind by.")
+    bridge_enabled: bool = Field(..., description="Whether notifications are relayed through Postgres LISTEN/NOTIFY.")
+    bridge_connected: bool = Field(..., description="Whether the LISTEN connection is currently open.")
+    bridge_received: int = Field(..., description="The number of notifications received over LISTEN.")
+    bridge_failures: int = Field(..., description="The number of times the LISTEN connection was lost.")
+
+################################################################################
+class AuditLogEntrySchema(IdentifiableSchema):
+    """
+    Schema for a single audit log entry.
+    """
+
+    guild_id: int = Field(..., description="The ID of the guild the change was made in.")
+    target: str = Field(..., description="The type of object that was changed.")
+    target_id: int = Field(..., description="The ID of the object that was changed.")
+    action: str = Field(..., description="The kind of change: Create, Update or Delete.")
+    user_id: int = Field(..., description="The ID of the user who made the change.")
+    changes: Dict[str, Any] = Field(..., description="The changed attributes with their old and new values.")
+    request_id: Optional[UUID] = Field(None, description="The ID of the request that made the change.")
+    revision: Optional[int] = Field(None, description="The guild revision the change was committed as.")
+    created_at: datetime = Field(..., description="When the change was made.")
+
+################################################################################
+class AuditLogPageSchema(BaseSchema):
+    """
+    Schema for one page of audit log entries, newest first.
+    """
+
+    items: List[AuditLogEntrySchema] = Field(..., description="The entries on this page.")
+    next_cursor: Optional[str] = Field(None, description="Pass as 'cursor' to fetch the next page; null on the last page.")
+
+################################################################################
+class TracedStatementSchema(BaseSchema):
+    """
+    Schema for a single SQL statement executed during a request.
+    """
+
+    sql: str = Field(..., description="The statement text, truncated if very long.")
+    duration: float = Field(..., description="How long the statement took, in seconds.")
+
+################################################################################
+class RequestTraceSchema(BaseSchema):
+    """
+    Schema for the timing record of a single request.
+    """
+
+    request_id: UUID = Field(..., description="The ID of the request, as returned in the X-Request-Id header.")
+    method: str = Field(..., description="The HTTP method of the request.")
+    path: str = Field(..., description="The path of the request.")
+    started_at: datetime = Field(..., description="When the request was received.")
+    status_code: Optional[int] = Field(None, description="The response status code.")
+    wall_time: float = Field(..., description="Total time spent handling the request, in seconds.")
+    db_time: float = Field(..., description="Time spent executing SQL statements, in seconds.")
+    statement_count: int = Field(..., description="The number of SQL statements executed.")
+    statements: List[TracedStatementSchema] = Field(..., description="The first statements executed, in order.")
+
+################################################################################
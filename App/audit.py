@@ -0,0 +1,335 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import uuid
+from datetime import datetime, UTC
+from typing import Any, Dict, List, Optional
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event, insert
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.orm import Session
+
+from . import Models
+from .config import settings
+from .database import SessionLocal
+################################################################################
+
+__all__ = (
+    "AuditLogWriter",
+    "audit_writer",
+    "queue_audit_entry",
+    "write_pending_entries",
+)
+
+# Key under ``Session.info`` holding the entries recorded by the current transaction.
+PENDING_KEY = "pending_audit_entries"
+# Key under ``Session.info`` holding the entries inserted by the current transaction.
+WRITTEN_KEY = "written_audit_entries"
+
+################################################################################
+class AuditLogWriter:
+    """
+    Collects audit log entries off the request path and bulk-inserts them,
+    either every ``flush_interval`` seconds or as soon as ``batch_size``
+    entries are waiting.
+
+    If ``spool_path`` is set, every entry is appended to that file as soon as
+    it is submitted, on a worker thread so the event loop never waits on the
+    disk, and the file is only cleared once the entries are in the database.
+    Entries left behind by a crashed process are replayed on start.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker,
+        batch_size: int,
+        flush_interval: float,
+        spool_path: Optional[str] = None
+    ) -> None:
+
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.spool_path = spool_path
+
+        self.submitted = 0
+        self.written = 0
+        self.batches = 0
+        self.failures = 0
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._unspooled: List[Dict[str, Any]] = []
+        self._spool_task: Optional[asyncio.Task] = None
+        self._task: Optional[asyncio.Task] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._starts = 0
+        self._flush_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def pending(self) -> int:
+
+        return len(self._buffer)
+
+    def submit(self, entries: List[Dict[str, Any]]) -> None:
+        """Queue committed entries for the next bulk insert."""
+
+        if not entries:
+            return
+
+        self._buffer.extend(entries)
+        self.submitted += len(entries)
+        self._schedule_spool(entries)
+
+        if self._wake is not None and len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    async def flush(self) -> int:
+        """Write everything buffered so far. Returns the number of rows inserted."""
+
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+
+        async with self._flush_lock:
+            if not self._buffer:
+                return 0
+
+            # Every buffered entry has to be on disk before the spool is
+            # rotated, or it would be spooled again after being written.
+            await self._drain_spool()
+
+            # Swap the buffer and spool out together so entries submitted while
+            # this batch is in flight land in the next one.
+            batch, self._buffer = self._buffer, []
+            flushing = self._rotate_spool()
+
+            try:
+                async with self.session_factory() as db:
+                    await db.execute(insert(Models.AuditLogModel), [_to_row(e) for e in batch])
+                    # Announced by this commit, now that a delta sync can see them.
+                    db.info[WRITTEN_KEY] = batch
+                    await db.commit()
+            except Exception as e:
+                print(f"Audit log flush failed, keeping {len(batch)} entries buffered: {str(e)}")
+                self.failures += 1
+                self._buffer[:0] = batch
+                self._schedule_spool(batch)
+                await self._drain_spool()
+                raise
+            finally:
+                if flushing is not None:
+                    await asyncio.to_thread(os.remove, flushing)
+
+            self.written += len(batch)
+            self.batches += 1
+            return len(batch)
+
+    async def start(self) -> None:
+        """Replay any spooled entries and start the background flush loop."""
+
+        self._starts += 1
+        if self._task is not None:
+            return
+
+        self._buffer[:0] = await asyncio.to_thread(self._replay_spool)
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush loop and write out whatever is still buffered."""
+
+        self._starts = max(self._starts - 1, 0)
+        if self._starts or self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        self._wake = None
+
+        try:
+            await self.flush()
+        except Exception:
+            # Still spooled (if enabled); the next start will replay them.
+            pass
+
+    async def _run(self) -> None:
+
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+
+            try:
+                await self.flush()
+            except Exception:
+                await asyncio.sleep(self.flush_interval)
+
+    def _schedule_spool(self, entries: List[Dict[str, Any]]) -> None:
+
+        if not self.spool_path:
+            return
+
+        self._unspooled.extend(entries)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            # No event loop to hand the write to (e.g. a script); do it here.
+            self._spool(self._take_unspooled())
+            return
+
+        # One spooling task at a time keeps the appends in submission order;
+        # entries submitted while it runs are picked up by the same task.
+        if self._spool_task is None or self._spool_task.done():
+            self._spool_task = loop.create_task(self._spool_pending())
+
+    def _take_unspooled(self) -> List[Dict[str, Any]]:
+
+        entries, self._unspooled = self._unspooled, []
+        return entries
+
+    async def _spool_pending(self) -> None:
+
+        while self._unspooled:
+            entries = self._take_unspooled()
+            try:
+                await asyncio.to_thread(self._spool, entries)
+            except OSError as e:
+                # Still buffered, so they'll be written; only the crash safety is lost.
+                print(f"Audit log spool write failed for {len(entries)} entries: {str(e)}")
+                self.failures += 1
+
+    async def _drain_spool(self) -> None:
+
+        if self._spool_task is not None:
+            await self._spool_task
+
+    def _spool(self, entries: List[Dict[str, Any]]) -> None:
+
+        if not self.spool_path or not entries:
+            return
+
+        with open(self.spool_path, "a", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(jsonable_encoder(entry)) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _rotate_spool(self) -> Optional[str]:
+
+        if not self.spool_path or not os.path.exists(self.spool_path):
+            return None
+
+        flushing = f"{self.spool_path}.flushing"
+        os.replace(self.spool_path, flushing)
+        return flushing
+
+    def _replay_spool(self) -> List[Dict[str, Any]]:
+
+        if not self.spool_path:
+            return []
+
+        entries = []
+        for path in (f"{self.spool_path}.flushing", self.spool_path):
+            if not os.path.exists(path):
+                continue
+            with open(path, encoding="utf-8") as f:
+                entries.extend(json.loads(line) for line in f if line.strip())
+
+        if entries:
+            print(f"Replaying {len(entries)} spooled audit log entries.")
+            # Rewrite them as a single spool so the replayed batch is durable again.
+            for path in (f"{self.spool_path}.flushing", self.spool_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self._spool(entries)
+
+        return entries
+
+    def stats(self) -> Dict[str, Any]:
+
+        return {
+            "buffered": self.pending,
+            "submitted": self.submitted,
+            "written": self.written,
+            "batches": self.batches,
+            "failures": self.failures,
+            "batch_size": self.batch_size,
+            "flush_interval": self.flush_interval,
+            "spool_enabled": bool(self.spool_path),
+        }
+
+################################################################################
+def _to_row(entry: Dict[str, Any]) -> Dict[str, Any]:
+    """Restore the column types of an entry that may have come from the spool."""
+
+    row = dict(entry)
+    # Spooled entries from before revisions were recorded lack the key, and
+    # every row of an executemany needs the same columns.
+    row.setdefault("revision", None)
+    if isinstance(row.get("created_at"), str):
+        row["created_at"] = datetime.fromisoformat(row["created_at"])
+    if isinstance(row.get("request_id"), str):
+        row["request_id"] = uuid.UUID(row["request_id"])
+    return row
+
+################################################################################
+def queue_audit_entry(session: Session, entry: Dict[str, Any]) -> None:
+    """
+    Attach an audit entry to the session's current transaction. Nothing is
+    written unless that transaction commits, by the commit itself or, if
+    buffering is enabled, by the writer afterwards.
+    """
+
+    entry.setdefault("created_at", datetime.now(UTC).replace(tzinfo=None))
+    session.info.setdefault(PENDING_KEY, []).append(entry)
+
+################################################################################
+def write_pending_entries(session: Session) -> None:
+    """
+    Insert the transaction's audit entries as part of it, unless they are left
+    to the buffered writer. Runs at commit, once the entries carry their guild
+    revisions, so each row is inserted exactly once.
+    """
+
+    if settings.AUDIT_LOG_BUFFERED:
+        return
+
+    entries = session.info.pop(PENDING_KEY, None)
+    if not entries:
+        return
+
+    session.execute(insert(Models.AuditLogModel), [_to_row(e) for e in entries])
+    session.info[WRITTEN_KEY] = entries
+
+################################################################################
+@event.listens_for(Session, "after_commit")
+def _submit_pending_entries(session: Session) -> None:
+
+    session.info.pop(WRITTEN_KEY, None)
+    audit_writer.submit(session.info.pop(PENDING_KEY, []))
+
+################################################################################
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_pending_entries(session: Session, _) -> None:
+
+    session.info.pop(WRITTEN_KEY, None)
+    session.info.pop(PENDING_KEY, None)
+
+################################################################################
+
+audit_writer = AuditLogWriter(
+    session_factory=SessionLocal,
+    batch_size=settings.AUDIT_LOG_BATCH_SIZE,
+    flush_interval=settings.AUDIT_LOG_FLUSH_INTERVAL,
+    spool_path=settings.AUDIT_LOG_SPOOL_PATH
+)
+
+################################################################################
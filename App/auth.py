@@ -1,12 +1,22 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, UTC
-from typing import Dict, Any
+from typing import Dict, Any, Callable, Optional, Tuple, TypeVar
 
 from fastapi import Depends, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 from passlib.context import CryptContext
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from . import Schemas
+from .Models import RevokedTokenModel
+from .cache import token_cache
+from .config import settings
+from .database import get_db
 ################################################################################
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -16,6 +26,90 @@ SECRET_KEY = ""
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440
 
+T = TypeVar("T")
+
+################################################################################
+class PasswordHashPool:
+    """
+    Dedicated, bounded worker pool for bcrypt hashing and verification.
+
+    Keeping bcrypt off the shared threadpool means a burst of logins can only
+    ever occupy these workers; once ``max_queue`` calls are already waiting,
+    further ones are rejected with a 503 rather than piling up.
+    """
+
+    def __init__(self, workers: int, max_queue: int) -> None:
+
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-hash")
+        self._lock = threading.Lock()
+
+        self.pending = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.total_run = 0.0
+
+    async def run(self, fn: Callable[..., T], *args: Any) -> T:
+
+        if self.pending >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=503,
+                detail="Too many authentication requests. Please retry shortly.",
+                headers={"Retry-After": str(settings.PASSWORD_HASH_RETRY_AFTER)}
+            )
+
+        submitted = time.perf_counter()
+        timings = {}
+
+        def _job() -> T:
+            timings["started"] = time.perf_counter()
+            with self._lock:
+                self.running += 1
+            try:
+                return fn(*args)
+            finally:
+                with self._lock:
+                    self.running -= 1
+                timings["finished"] = time.perf_counter()
+
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, _job)
+        finally:
+            self.pending -= 1
+            if "finished" in timings:
+                waited = timings["started"] - submitted
+                self.completed += 1
+                self.total_wait += waited
+                self.max_wait = max(self.max_wait, waited)
+                self.total_run += timings["finished"] - timings["started"]
+
+    def snapshot(self) -> Dict[str, Any]:
+
+        return {
+            "workers": self.workers,
+            "max_queue": self.max_queue,
+            "running": self.running,
+            "queued": max(self.pending - self.running, 0),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_wait": (self.total_wait / self.completed) if self.completed else 0.0,
+            "max_wait": self.max_wait,
+            "avg_run": (self.total_run / self.completed) if self.completed else 0.0,
+        }
+
+################################################################################
+
+password_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_queue=settings.PASSWORD_HASH_MAX_QUEUE
+)
+
 ################################################################################
 def hash_password(password: str) -> str:
     """
@@ -32,6 +126,22 @@ def verify_password(password: str, hashed_password: str) -> bool:
 
     return pwd_context.verify(password, hashed_password)
 
+################################################################################
+async def hash_password_async(password: str) -> str:
+    """
+    Hash a password on the dedicated password hashing pool.
+    """
+
+    return await password_pool.run(hash_password, password)
+
+################################################################################
+async def verify_password_async(password: str, hashed_password: str) -> bool:
+    """
+    Verify a password on the dedicated password hashing pool.
+    """
+
+    return await password_pool.run(verify_password, password, hashed_password)
+
 ################################################################################
 def generate_access_token(data: Dict[str, Any]) -> str:
     """
@@ -46,26 +156,105 @@ def generate_access_token(data: Dict[str, Any]) -> str:
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 ################################################################################
-def verify_access_token(token: str) -> Schemas.TokenDataSchema:
-    """
-    Verify the access token and return the token data.
-    """
+def _decode_access_token(token: str) -> Dict[str, Any]:
 
     try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-        user_id: str = payload.get("user_id")
-        if user_id is None:
-            raise HTTPException(status_code=401, detail="User ID not found", headers={"WWW-Authenticate": "Bearer"})
-        return Schemas.TokenDataSchema(id=int(user_id))
+        return jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except JWTError:
         raise HTTPException(status_code=401, detail="Invalid Password", headers={"WWW-Authenticate": "Bearer"})
 
 ################################################################################
-def get_current_user(token: str = Depends(oauth2_scheme)):
+def _revoked_exception() -> HTTPException:
+
+    return HTTPException(status_code=401, detail="Token has been revoked", headers={"WWW-Authenticate": "Bearer"})
+
+################################################################################
+def _decode_token_data(token: str) -> Tuple[Schemas.TokenDataSchema, Optional[float]]:
+
+    if token_cache.is_revoked(token):
+        raise _revoked_exception()
+
+    payload = _decode_access_token(token)
+    user_id: str = payload.get("user_id")
+    if user_id is None:
+        raise HTTPException(status_code=401, detail="User ID not found", headers={"WWW-Authenticate": "Bearer"})
+
+    expires_at = payload.get("exp")
+    return Schemas.TokenDataSchema(id=int(user_id)), (float(expires_at) if expires_at is not None else None)
+
+################################################################################
+def _cache_token_data(token: str, token_data: Schemas.TokenDataSchema, expires_at: Optional[float]) -> None:
+
+    # Tokens without an expiry are never cached, so revocation can't be outlived.
+    if expires_at is not None:
+        token_cache.set(token, token_data, min(expires_at, time.time() + settings.JWT_REVOCATION_CHECK_INTERVAL))
+
+################################################################################
+def verify_access_token(token: str) -> Schemas.TokenDataSchema:
+    """
+    Verify the access token and return the token data, using only what this
+    worker knows. Verified tokens are cached for up to
+    ``JWT_REVOCATION_CHECK_INTERVAL`` seconds.
+    """
+
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+
+    token_data, expires_at = _decode_token_data(token)
+    _cache_token_data(token, token_data, expires_at)
+    return token_data
+
+################################################################################
+async def revoke_access_token(token: str, db: AsyncSession) -> None:
     """
-    Get the current user from the access token.
+    Revoke a still-valid access token for the remainder of its lifetime.
+    The revocation is recorded in the database so every worker honors it,
+    and expired revocations are pruned on the way.
     """
 
-    return verify_access_token(token)
+    payload = _decode_access_token(token)
+    expires_at = payload.get("exp")
+    expires_at = (
+        float(expires_at)
+        if expires_at is not None
+        else (datetime.now(UTC) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)).timestamp()
+    )
+
+    now = datetime.now(UTC).replace(tzinfo=None)
+    await db.execute(delete(RevokedTokenModel).where(RevokedTokenModel.expires_at <= now))
+
+    digest = token_cache.digest(token)
+    if await db.get(RevokedTokenModel, digest) is None:
+        db.add(RevokedTokenModel(
+            digest=digest,
+            expires_at=datetime.fromtimestamp(expires_at, UTC).replace(tzinfo=None)
+        ))
+        await db.flush()
+
+    token_cache.revoke(token, expires_at)
+
+################################################################################
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)):
+    """
+    Get the current user from the access token. Tokens that aren't cached are
+    checked against the shared revocation table before they are accepted.
+    """
+
+    cached = token_cache.get(token)
+    if cached is not None:
+        return cached
+
+    token_data, expires_at = _decode_token_data(token)
+    revoked = await db.scalar(
+        select(RevokedTokenModel.digest)
+        .filter_by(digest=token_cache.digest(token))
+        .where(RevokedTokenModel.expires_at > datetime.now(UTC).replace(tzinfo=None))
+    )
+    if revoked is not None:
+        raise _revoked_exception()
+
+    _cache_token_data(token, token_data, expires_at)
+    return token_data
 
 ################################################################################
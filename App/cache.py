@@ -0,0 +1,210 @@
+from __future__ import annotations
+
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .config import settings
+################################################################################
+
+__all__ = (
+    "GuildExistenceCache",
+    "guild_cache",
+    "invalidate_guild_on_commit",
+    "apply_guild_cache_invalidations",
+    "TokenCache",
+    "token_cache",
+)
+
+# Key under ``Session.info`` holding guild IDs to drop from the cache on commit.
+INVALIDATED_GUILDS_KEY = "invalidated_guild_ids"
+
+################################################################################
+class GuildExistenceCache:
+    """
+    Per-process record of which guild IDs exist, so guild-scoped requests can
+    skip the lookup query. Unknown guilds are remembered for a shorter time
+    than known ones, and the least recently used entries are evicted first.
+    """
+
+    def __init__(self, ttl: float, negative_ttl: float, max_size: int) -> None:
+
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[int, Tuple[bool, float]] = OrderedDict()
+
+    def get(self, guild_id: int) -> Optional[bool]:
+        """Return whether the guild exists, or None if that isn't cached."""
+
+        entry = self._entries.get(guild_id)
+        if entry is None or entry[1] <= time.monotonic():
+            self._entries.pop(guild_id, None)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(guild_id)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, guild_id: int, exists: bool) -> None:
+
+        ttl = self.ttl if exists else self.negative_ttl
+        if ttl <= 0:
+            return
+
+        self._entries[guild_id] = (exists, time.monotonic() + ttl)
+        self._entries.move_to_end(guild_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, guild_id: int) -> None:
+        """Forget a guild, e.g. after it has been created or deleted."""
+
+        self._entries.pop(guild_id, None)
+
+    def clear(self) -> None:
+
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "negative_ttl": self.negative_ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": (self.hits / lookups) if lookups else 0.0,
+        }
+
+################################################################################
+class TokenCache:
+    """
+    Bounded LRU cache of verified access tokens, keyed by the SHA-256 digest of
+    the token so raw tokens are never held in memory. Entries are only served
+    until the expiry they were stored with, which is never past the token's
+    own ``exp``. Tokens revoked by this worker are remembered locally until
+    they would have expired anyway; the database holds the shared record.
+    """
+
+    def __init__(self, max_size: int) -> None:
+
+        self.max_size = max_size
+
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, Tuple[Any, float]] = OrderedDict()
+        self._revoked: Dict[str, float] = {}
+
+    @staticmethod
+    def digest(token: str) -> str:
+
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[Any]:
+        """Return the cached token data, or None if it must be verified again."""
+
+        key = self.digest(token)
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, token: str, data: Any, expires_at: float) -> None:
+
+        if self.max_size <= 0 or expires_at <= time.time():
+            return
+
+        key = self.digest(token)
+        self._entries[key] = (data, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def revoke(self, token: str, expires_at: float) -> None:
+        """Reject a token from now on, even though its signature is still valid."""
+
+        now = time.time()
+        self._revoked = {k: exp for k, exp in self._revoked.items() if exp > now}
+
+        key = self.digest(token)
+        self._entries.pop(key, None)
+        self._revoked[key] = expires_at
+
+    def is_revoked(self, token: str) -> bool:
+
+        expires_at = self._revoked.get(self.digest(token))
+        return expires_at is not None and expires_at > time.time()
+
+    def clear(self) -> None:
+
+        self._entries.clear()
+        self._revoked.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "revoked": len(self._revoked),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+################################################################################
+
+guild_cache = GuildExistenceCache(
+    ttl=settings.GUILD_CACHE_TTL,
+    negative_ttl=settings.GUILD_CACHE_NEGATIVE_TTL,
+    max_size=settings.GUILD_CACHE_MAX_SIZE
+)
+token_cache = TokenCache(max_size=settings.JWT_CACHE_MAX_SIZE)
+
+################################################################################
+def invalidate_guild_on_commit(session: Session, guild_id: int) -> None:
+    """
+    Forget the cached existence of a guild once the current transaction
+    commits. Invalidating any earlier would let a concurrent request cache
+    "not found" again before the new guild is visible to it.
+    """
+
+    session.info.setdefault(INVALIDATED_GUILDS_KEY, set()).add(guild_id)
+
+################################################################################
+def apply_guild_cache_invalidations(session: Session) -> None:
+
+    for guild_id in session.info.pop(INVALIDATED_GUILDS_KEY, set()):
+        guild_cache.invalidate(guild_id)
+
+################################################################################
+@event.listens_for(Session, "after_commit")
+def _invalidate_on_commit(session: Session) -> None:
+
+    apply_guild_cache_invalidations(session)
+
+################################################################################
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_on_rollback(session: Session, _) -> None:
+
+    session.info.pop(INVALIDATED_GUILDS_KEY, None)
+
+################################################################################
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 ################################################################################
@@ -6,11 +8,93 @@ class Settings(BaseSettings):
     DEVELOPMENT_DATABASE_URL: str
     PRODUCTION_DATABASE_URL: str
 
+    # Optional read replica for GET routes; falls back to the primary if unset.
+    REPLICA_DATABASE_URL: Optional[str] = None
+
     DEBUG: bool = False
 
+    # Connection pool sizing (per worker process)
+    DATABASE_POOL_SIZE: int = 5
+    DATABASE_MAX_OVERFLOW: int = 10
+    DATABASE_POOL_TIMEOUT: float = 30
+    # When enabled, requests that can't get a connection within the fast-fail
+    # timeout are rejected with a 503 instead of waiting out the full timeout.
+    DATABASE_POOL_FAST_FAIL: bool = False
+    DATABASE_POOL_FAST_FAIL_TIMEOUT: float = 0.5
+    DATABASE_POOL_RETRY_AFTER: int = 1
+
+    # In-process guild existence cache used by guild-scoped routes (seconds).
+    # Unknown guilds are cached briefly so a freshly created guild shows up
+    # on other workers without waiting out the full TTL.
+    GUILD_CACHE_TTL: float = 300
+    GUILD_CACHE_NEGATIVE_TTL: float = 5
+    GUILD_CACHE_MAX_SIZE: int = 10000
+
+    # Largest page size accepted by the opt-in ``limit`` parameter of list and
+    # manager endpoints.
+    PAGE_MAX_LIMIT: int = 500
+
+    # Most user IDs accepted by one POST /giveaways/{id}/entries/bulk call.
+    # They go out as a single multi-row INSERT, so this has to stay well under
+    # the driver's bind parameter limit (two per row; 32767 on asyncpg).
+    GIVEAWAY_BULK_ENTRY_MAX: int = 5000
+
+    # Number of guilds deep-loaded together per round of queries when a shard
+    # bootstraps through GET /guilds/bootstrap.
+    GUILD_BOOTSTRAP_BATCH_SIZE: int = 250
+
+    # By default each audit entry is written inside the request transaction.
+    # Buffering is opt-in: entries are then bulk-inserted in batches after
+    # commit, and without a spool path any still buffered when the process
+    # dies are lost. Either way an entry carries the guild revision its
+    # transaction committed as, but buffered entries only reach delta sync
+    # and the change feed once flushed, so with several workers a client can
+    # see a later revision before an earlier one's entries are written.
+    AUDIT_LOG_BUFFERED: bool = False
+    AUDIT_LOG_BATCH_SIZE: int = 500
+    AUDIT_LOG_FLUSH_INTERVAL: float = 1.0
+    AUDIT_LOG_SPOOL_PATH: Optional[str] = None
+    # Months of audit log kept in the database (0 keeps everything). Older
+    # months are archived as gzipped NDJSON by `python -m App.retention`.
+    AUDIT_LOG_RETENTION_MONTHS: int = 12
+    AUDIT_LOG_ARCHIVE_DIR: str = "archive/audit_log"
+    AUDIT_LOG_PARTITION_MONTHS_AHEAD: int = 3
+
+    # Committed changes are pushed to subscribers of GET /guilds/{id}/events.
+    # Each subscriber buffers up to CHANGE_FEED_QUEUE_SIZE notifications before
+    # it is told to resync instead. Setting a channel on Postgres relays them
+    # through LISTEN/NOTIFY so every worker's subscribers see every write; each
+    # worker then keeps one pooled connection for listening.
+    CHANGE_FEED_QUEUE_SIZE: int = 100
+    CHANGE_FEED_MAX_CHANGES: int = 50
+    CHANGE_FEED_KEEPALIVE: float = 15.0
+    CHANGE_FEED_PG_CHANNEL: Optional[str] = None
+
+    # Per-request traces (wall/DB time and statements) kept per worker for
+    # lookup by request ID.
+    REQUEST_TRACE_BUFFER_SIZE: int = 1000
+    REQUEST_TRACE_MAX_STATEMENTS: int = 50
+    REQUEST_TRACE_MAX_SQL_LENGTH: int = 500
+
+    # Responses that already are the route's declared schema are rendered with
+    # orjson as they are. Turning this on validates them again against the
+    # response model, as FastAPI does by default; useful to catch drift.
+    RESPONSE_REVALIDATION: bool = False
+
     JWT_SECRET_KEY: str
     JWT_ALGORITHM: str
     JWT_EXPIRATION_MINUTES: int
+    # Number of verified tokens kept per worker; 0 disables the cache.
+    JWT_CACHE_MAX_SIZE: int = 1024
+    # Seconds a verified token is trusted before the shared revocation table
+    # is checked again, i.e. how long another worker may still accept a token
+    # after it has been revoked.
+    JWT_REVOCATION_CHECK_INTERVAL: float = 60
+
+    # bcrypt runs on its own bounded pool so logins can't starve other requests.
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    PASSWORD_HASH_RETRY_AFTER: int = 1
 
     FROGGE_REGISTRATION_PASSWORD: str
 
@@ -1,24 +1,166 @@
-from typing import Any, Generator
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator, AsyncIterator, Dict, Optional
 
-from fastapi import HTTPException
-from sqlalchemy import create_engine, event
-from sqlalchemy.engine import Engine
-from sqlalchemy.exc import SQLAlchemyError, DataError, IntegrityError
-from sqlalchemy.orm import sessionmaker, Session
+from fastapi import HTTPException, Header
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.exc import SQLAlchemyError, DataError, IntegrityError, TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession, AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 
 from .config import settings
 ################################################################################
 
-engine = create_engine(
+# Synchronous drivers (used by Alembic) mapped to their asyncio counterparts.
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+################################################################################
+def as_async_url(url: str) -> str:
+    """
+    Convert a configured database URL to its asyncio driver equivalent.
+    URLs that already name an async driver are returned unchanged.
+    """
+
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+################################################################################
+class PoolMetrics:
+    """
+    Per-process connection pool checkout statistics.
+    Wait times are bucketed by upper bound in seconds.
+    """
+
+    BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+
+    def __init__(self) -> None:
+
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.histogram = [0] * (len(self.BUCKETS) + 1)
+
+    def record(self, waited: float, timed_out: bool = False) -> None:
+
+        if timed_out:
+            self.timeouts += 1
+        else:
+            self.checkouts += 1
+
+        self.total_wait += waited
+        self.max_wait = max(self.max_wait, waited)
+        self.histogram[self._bucket(waited)] += 1
+
+    def _bucket(self, waited: float) -> int:
+
+        for i, bound in enumerate(self.BUCKETS):
+            if waited <= bound:
+                return i
+        return len(self.BUCKETS)
+
+    def snapshot(self) -> Dict[str, Any]:
+
+        labels = [str(b) for b in self.BUCKETS] + ["+Inf"]
+        attempts = self.checkouts + self.timeouts
+        return {
+            "checkouts": self.checkouts,
+            "timeouts": self.timeouts,
+            "avg_wait": (self.total_wait / attempts) if attempts else 0.0,
+            "max_wait": self.max_wait,
+            "wait_histogram": dict(zip(labels, self.histogram)),
+        }
+
+################################################################################
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Queue pool that records how long each checkout waited for a connection."""
+
+    def __init__(self, *args, **kwargs) -> None:
+
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record(time.perf_counter() - start, timed_out=True)
+            raise
+
+        self.metrics.record(time.perf_counter() - start)
+        return conn
+
+################################################################################
+def create_pooled_engine(url: str) -> AsyncEngine:
+    """Create an async engine whose pool is sized from the application settings."""
+
+    return create_async_engine(
+        as_async_url(url),
+        poolclass=InstrumentedQueuePool,
+        pool_size=settings.DATABASE_POOL_SIZE,
+        max_overflow=settings.DATABASE_MAX_OVERFLOW,
+        pool_pre_ping=True,
+        pool_timeout=(
+            settings.DATABASE_POOL_FAST_FAIL_TIMEOUT
+            if settings.DATABASE_POOL_FAST_FAIL
+            else settings.DATABASE_POOL_TIMEOUT
+        )
+    )
+
+################################################################################
+def pool_status(target: AsyncEngine) -> Dict[str, Any]:
+    """Report the current state of an engine's pool for this worker process."""
+
+    pool = target.pool
+    status = {
+        "pid": os.getpid(),
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": pool.overflow(),
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+        "timeout": pool.timeout(),
+        "fast_fail": settings.DATABASE_POOL_FAST_FAIL,
+    }
+    if isinstance(pool, InstrumentedQueuePool):
+        status.update(pool.metrics.snapshot())
+
+    return status
+
+################################################################################
+
+engine = create_pooled_engine(
     settings.DEVELOPMENT_DATABASE_URL
     if settings.DEBUG
-    else settings.PRODUCTION_DATABASE_URL,
-    pool_size=5,
-    max_overflow=0,
-    pool_pre_ping=True,
-    pool_timeout=30
+    else settings.PRODUCTION_DATABASE_URL
+)
+SessionLocal = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
+
+# GET routes read from the replica when one is configured. Postgres replicas
+# additionally get READ ONLY transactions so a stray write fails loudly.
+replica_engine = (
+    create_pooled_engine(settings.REPLICA_DATABASE_URL)
+    if settings.REPLICA_DATABASE_URL
+    else None
+)
+if replica_engine is not None and replica_engine.dialect.name == "postgresql":
+    replica_engine = replica_engine.execution_options(postgresql_readonly=True)
+
+ReadSessionLocal = async_sessionmaker(
+    bind=replica_engine or engine,
+    autoflush=False,
+    expire_on_commit=False
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 ################################################################################
 if engine.dialect.name == "sqlite":
@@ -32,32 +174,100 @@ if engine.dialect.name == "sqlite":
         cursor.close()
 
 ################################################################################
-def get_db() -> Generator[Session, Any, None]:
+@asynccontextmanager
+async def _session_scope(factory: async_sessionmaker, commit: bool) -> AsyncIterator[AsyncSession]:
+    """
+    Open a session for the duration of a request and translate database
+    errors into HTTP responses. Read-only scopes never commit.
+    """
 
-    db = SessionLocal()
+    db = factory()
     try:
         yield db
-        db.commit()
+        if commit:
+            await db.commit()
     except HTTPException:
-        db.rollback()
+        await db.rollback()
         raise
+    except PoolTimeoutError as e:
+        await db.rollback()
+        print(f"Connection pool exhausted: {str(e)}")
+        raise HTTPException(
+            status_code=503,
+            detail="The database is busy. Please retry shortly.",
+            headers={"Retry-After": str(settings.DATABASE_POOL_RETRY_AFTER)}
+        )
     except DataError as e:
-        db.rollback()
+        await db.rollback()
         print(f"DataError: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Input string too long for column: {str(e)}")
     except IntegrityError as e:
-        db.rollback()
+        await db.rollback()
         print(f"IntegrityError: {str(e)}")
         raise HTTPException(status_code=409, detail=f"Integrity error: {str(e)}")
     except SQLAlchemyError as e:
-        db.rollback()
+        await db.rollback()
         print(f"SQLAlchemyError: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"Unexpected error: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
     finally:
-        db.close()
+        await db.close()
+
+################################################################################
+async def get_db() -> AsyncGenerator[AsyncSession, Any]:
+
+    async with _session_scope(SessionLocal, commit=True) as db:
+        yield db
+
+################################################################################
+def read_session_factory(consistency: Optional[str]) -> async_sessionmaker:
+
+    return SessionLocal if (consistency or "").lower() == "strong" else ReadSessionLocal
+
+################################################################################
+def is_replica_session(db: AsyncSession) -> bool:
+    """Whether a session reads from the replica, which may lag behind the primary."""
+
+    return replica_engine is not None and db.get_bind() is replica_engine.sync_engine
+
+################################################################################
+async def get_read_db(
+    x_consistency: Optional[str] = Header(
+        None,
+        convert_underscores=False,
+        alias="X-Consistency",
+        description="Send 'strong' to read from the primary, e.g. directly after a write."
+    )
+) -> AsyncGenerator[AsyncSession, Any]:
+    """
+    Session for GET routes. Served by the read replica when one is configured,
+    otherwise by the primary; the session is never committed.
+    """
+
+    async with _session_scope(read_session_factory(x_consistency), commit=False) as db:
+        yield db
+
+################################################################################
+async def get_streaming_read_db(
+    x_consistency: Optional[str] = Header(
+        None,
+        convert_underscores=False,
+        alias="X-Consistency",
+        description="Send 'strong' to read from the primary, e.g. directly after a write."
+    )
+) -> AsyncSession:
+    """
+    Read session for routes that return a ``StreamingResponse``. Dependencies
+    with ``yield`` are torn down before a streamed body is sent, so the session
+    is handed over unmanaged: the body's generator closes it in a ``finally``
+    block, which also runs if the client disconnects mid-stream, and the route
+    closes it itself if it fails before returning the response.
+    Errors raised while streaming are not translated into HTTP responses.
+    """
+
+    return read_session_factory(x_consistency)()
 
 ################################################################################
@@ -1,39 +1,130 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Optional
+from typing import Any, Optional, Sequence
 
-from fastapi import Depends, Path, HTTPException, Header
-from sqlalchemy.orm import Session
+from fastapi import Depends, Path, HTTPException, Header, Query, Request, Response
+from sqlalchemy import Select, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from .Models import GuildIDModel
 from .auth import get_current_user
-from .database import get_db
+from .cache import guild_cache
+from .config import settings
+from .database import get_db, get_read_db, is_replica_session
+from .revisions import check_guild_etag
 ################################################################################
-def get_dependencies(
-    db: Session = Depends(get_db),
+async def get_dependencies(
+    db: AsyncSession = Depends(get_db),
     guild_id: int = Path(..., description="ID of the guild being accessed"),
     x_actor_id: int = Header(..., convert_underscores=False, alias="X-Actor-Id"),
     _: int = Depends(get_current_user),
 ) -> Dependencies:
 
-    guild_model = db.query(GuildIDModel).filter(GuildIDModel.guild_id == guild_id).first()
-    if guild_model is None:
+    # The guild's revision is bumped by the audit entries a write records, so
+    # requests that end up changing nothing leave it alone.
+    return await _build_dependencies(db, guild_id, x_actor_id)
+
+################################################################################
+async def get_read_dependencies(
+    db: AsyncSession = Depends(get_read_db),
+    guild_id: int = Path(..., description="ID of the guild being accessed"),
+    x_actor_id: int = Header(..., convert_underscores=False, alias="X-Actor-Id"),
+    _: int = Depends(get_current_user),
+) -> Dependencies:
+    """Same as ``get_dependencies``, but backed by a read-only session for GET routes."""
+
+    return await _build_dependencies(db, guild_id, x_actor_id)
+
+################################################################################
+async def get_conditional_read_dependencies(
+    request: Request,
+    response: Response,
+    deps: Dependencies = Depends(get_read_dependencies)
+) -> Dependencies:
+    """
+    Read dependencies for deep GET routes that support ETags. Returns 304 Not
+    Modified before the route body runs if the client's copy is current.
+    """
+
+    await check_guild_etag(deps.db, deps.guild_id, request, response)
+    return deps
+
+################################################################################
+async def _build_dependencies(db: AsyncSession, guild_id: int, actor_id: int) -> Dependencies:
+
+    exists = guild_cache.get(guild_id)
+    if exists is None:
+        found = await db.scalar(select(GuildIDModel.guild_id).filter(GuildIDModel.guild_id == guild_id))
+        exists = found is not None
+        # A lagging replica may not have a just-created guild yet, and caching
+        # that would outlast the creating commit's invalidation.
+        if exists or not is_replica_session(db):
+            guild_cache.set(guild_id, exists)
+
+    if not exists:
         raise HTTPException(status_code=404, detail="Guild not found")
 
     return Dependencies(
         db=db,
         guild_id=guild_id,
-        actor_id=x_actor_id
+        actor_id=actor_id
     )
 
 ################################################################################
 @dataclass
 class Dependencies:
 
-    db: Session
+    db: AsyncSession
     guild_id: int
     actor_id: int
 
 ################################################################################
 
+################################################################################
+def get_page(
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1, le=settings.PAGE_MAX_LIMIT, description="Page size; omit to get every item"),
+    after: Optional[int] = Query(None, ge=0, description="Only items with an ID greater than this, e.g. the previous page's X-Next-After"),
+) -> Page:
+
+    return Page(response=response, limit=limit, after=after)
+
+################################################################################
+@dataclass
+class Page:
+    """
+    Opt-in keyset pagination by ascending ID. Without ``limit`` or ``after``
+    every row is returned, as before. When a page is cut short, the ID to pass
+    as ``after`` for the next one is sent in the X-Next-After header.
+    """
+
+    response: Response
+    limit: Optional[int] = None
+    after: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+
+        return self.limit is not None or self.after is not None
+
+    async def load(self, db: AsyncSession, query: Select, column: Any) -> Sequence[Any]:
+
+        if not self.enabled:
+            return (await db.scalars(query)).all()
+
+        if self.after is not None:
+            query = query.filter(column > self.after)
+        query = query.order_by(column)
+        if self.limit is not None:
+            # One extra row tells us whether there is another page.
+            query = query.limit(self.limit + 1)
+
+        rows = (await db.scalars(query)).all()
+        if self.limit is not None and len(rows) > self.limit:
+            rows = rows[:self.limit]
+            self.response.headers["X-Next-After"] = str(getattr(rows[-1], column.key))
+
+        return rows
+
+################################################################################
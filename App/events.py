@@ -0,0 +1,314 @@
+from __future__ import annotations
+
+import asyncio
+import json
+from contextlib import suppress
+from typing import Any, Dict, List, Optional, Set
+
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+# Imported first so its before_commit hook stamps the revisions collected here
+# and inserts the entries into the committing transaction.
+from . import revisions  # noqa: F401
+from .audit import WRITTEN_KEY
+from .config import settings
+from .database import engine
+################################################################################
+
+__all__ = (
+    "ChangeFeed",
+    "ChangeSubscription",
+    "PostgresChangeBridge",
+    "change_feed",
+    "change_bridge",
+    "collect_change_events",
+)
+
+# Key under ``Session.info`` holding the notifications of the committing transaction.
+EVENTS_KEY = "change_events"
+
+################################################################################
+class ChangeSubscription:
+    """One listener's queue of change notifications for a single guild."""
+
+    def __init__(self, feed: ChangeFeed, guild_id: int) -> None:
+
+        self.feed = feed
+        self.guild_id = guild_id
+        self.queue: asyncio.Queue = asyncio.Queue(feed.queue_size)
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Wait for the next notification, or return None after ``timeout`` seconds."""
+
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+
+        self.feed.unsubscribe(self)
+
+################################################################################
+class ChangeFeed:
+    """
+    In-process fan-out of committed change notifications to every subscriber
+    of the guild they belong to. Publishing never blocks: a subscriber whose
+    queue is full has its backlog replaced by a single resync notification.
+    """
+
+    def __init__(self, queue_size: int) -> None:
+
+        self.queue_size = queue_size
+
+        self.published = 0
+        self.delivered = 0
+        self.overflows = 0
+
+        self._subscribers: Dict[int, Set[ChangeSubscription]] = {}
+
+    @property
+    def subscriber_count(self) -> int:
+
+        return sum(len(subs) for subs in self._subscribers.values())
+
+    def subscribe(self, guild_id: int) -> ChangeSubscription:
+
+        subscription = ChangeSubscription(self, guild_id)
+        self._subscribers.setdefault(guild_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: ChangeSubscription) -> None:
+
+        subs = self._subscribers.get(subscription.guild_id)
+        if subs is None:
+            return
+
+        subs.discard(subscription)
+        if not subs:
+            del self._subscribers[subscription.guild_id]
+
+    def publish(self, notification: Dict[str, Any]) -> None:
+
+        self.published += 1
+        for subscription in tuple(self._subscribers.get(notification["guild_id"], ())):
+            self._deliver(subscription, notification)
+
+    def resync_all(self) -> None:
+        """Tell every subscriber to resync, e.g. after notifications may have been missed."""
+
+        for guild_id, subs in tuple(self._subscribers.items()):
+            for subscription in tuple(subs):
+                self._replace_backlog(subscription, resync_notification(guild_id))
+
+    def _deliver(self, subscription: ChangeSubscription, notification: Dict[str, Any]) -> None:
+
+        try:
+            subscription.queue.put_nowait(notification)
+            self.delivered += 1
+        except asyncio.QueueFull:
+            # A subscriber this far behind is better served by one delta sync
+            # than by working through the backlog.
+            self.overflows += 1
+            self._replace_backlog(subscription, resync_notification(subscription.guild_id))
+
+    @staticmethod
+    def _replace_backlog(subscription: ChangeSubscription, notification: Dict[str, Any]) -> None:
+
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(notification)
+
+    def stats(self) -> Dict[str, Any]:
+
+        return {
+            "guilds": len(self._subscribers),
+            "subscribers": self.subscriber_count,
+            "published": self.published,
+            "delivered": self.delivered,
+            "overflows": self.overflows,
+            "queue_size": self.queue_size,
+        }
+
+################################################################################
+class PostgresChangeBridge:
+    """
+    Relays notifications between workers through Postgres LISTEN/NOTIFY.
+
+    While enabled, committing transactions NOTIFY ``channel`` instead of
+    publishing locally, and every worker LISTENs on a dedicated connection and
+    publishes what it receives to its own subscribers. If the connection drops,
+    subscribers are told to resync, since notifications sent in the meantime
+    are lost.
+    """
+
+    def __init__(
+        self,
+        target_engine: AsyncEngine,
+        feed: ChangeFeed,
+        channel: Optional[str],
+        retry_interval: float = 5.0
+    ) -> None:
+
+        self.engine = target_engine
+        self.feed = feed
+        self.channel = channel
+        self.retry_interval = retry_interval
+
+        self.connected = False
+        self.received = 0
+        self.failures = 0
+
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+
+        return bool(self.channel) and self.engine.dialect.name == "postgresql"
+
+    async def start(self) -> None:
+
+        if self.enabled and self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        with suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        self.connected = False
+
+    async def _run(self) -> None:
+
+        while True:
+            try:
+                await self._listen()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                print(f"Change feed listener failed: {exc!r}")
+
+            self.failures += 1
+            self.connected = False
+            self.feed.resync_all()
+            await asyncio.sleep(self.retry_interval)
+
+    async def _listen(self) -> None:
+
+        async with self.engine.connect() as conn:
+            raw = (await conn.get_raw_connection()).driver_connection
+            lost = asyncio.Event()
+            raw.add_termination_listener(lambda _: lost.set())
+
+            await raw.add_listener(self.channel, self._on_notify)
+            self.connected = True
+            try:
+                await lost.wait()
+            finally:
+                with suppress(Exception):
+                    await raw.remove_listener(self.channel, self._on_notify)
+
+    def _on_notify(self, _connection: Any, _pid: int, _channel: str, payload: str) -> None:
+
+        self.received += 1
+        self.feed.publish(json.loads(payload))
+
+    def stats(self) -> Dict[str, Any]:
+
+        return {
+            "bridge_enabled": self.enabled,
+            "bridge_connected": self.connected,
+            "bridge_received": self.received,
+            "bridge_failures": self.failures,
+        }
+
+################################################################################
+def resync_notification(guild_id: int) -> Dict[str, Any]:
+
+    return {"type": "resync", "guild_id": guild_id}
+
+################################################################################
+def collect_change_events(session: Session) -> List[Dict[str, Any]]:
+    """
+    Build one notification per guild from the audit entries the current
+    transaction inserts. Each lists what changed, up to CHANGE_FEED_MAX_CHANGES
+    entries, so subscribers can decide whether a delta sync is worth it.
+    Entries are only announced by the transaction that writes them, the
+    request's own or the buffered writer's, so a delta sync started by the
+    notification always finds them.
+    """
+
+    notifications: Dict[int, Dict[str, Any]] = {}
+    for entry in session.info.get(WRITTEN_KEY, []):
+        guild_id = entry["guild_id"]
+        notification = notifications.get(guild_id)
+        if notification is None:
+            notification = notifications[guild_id] = {
+                "type": "change",
+                "guild_id": guild_id,
+                "revision": None,
+                "changes": [],
+                "truncated": False,
+            }
+
+        # A batch from the buffered writer can span several revisions.
+        revision = entry.get("revision")
+        if revision is not None and (notification["revision"] is None or revision > notification["revision"]):
+            notification["revision"] = revision
+
+        if len(notification["changes"]) >= settings.CHANGE_FEED_MAX_CHANGES:
+            notification["truncated"] = True
+            continue
+        notification["changes"].append({
+            "target": entry["target"],
+            "target_id": entry["target_id"],
+            "action": entry["action"],
+        })
+
+    return list(notifications.values())
+
+################################################################################
+@event.listens_for(Session, "before_commit")
+def _collect_on_commit(session: Session) -> None:
+
+    notifications = collect_change_events(session)
+    if not notifications:
+        return
+
+    if change_bridge.enabled:
+        # NOTIFY is transactional: listeners, this worker's included, hear
+        # about the change only if the commit goes through.
+        for notification in notifications:
+            session.execute(select(func.pg_notify(change_bridge.channel, json.dumps(notification))))
+    else:
+        session.info[EVENTS_KEY] = notifications
+
+################################################################################
+@event.listens_for(Session, "after_commit")
+def _publish_on_commit(session: Session) -> None:
+
+    for notification in session.info.pop(EVENTS_KEY, []):
+        change_feed.publish(notification)
+
+################################################################################
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_on_rollback(session: Session, _) -> None:
+
+    session.info.pop(EVENTS_KEY, None)
+
+################################################################################
+
+change_feed = ChangeFeed(queue_size=settings.CHANGE_FEED_QUEUE_SIZE)
+change_bridge = PostgresChangeBridge(
+    target_engine=engine,
+    feed=change_feed,
+    channel=settings.CHANGE_FEED_PG_CHANNEL
+)
+
+################################################################################
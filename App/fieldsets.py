@@ -0,0 +1,285 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Set, Tuple, Type
+
+from fastapi import HTTPException, Query
+from pydantic import create_model, field_validator
+from sqlalchemy import inspect
+from sqlalchemy.orm import load_only, selectinload
+
+from .Schemas import BaseSchema
+################################################################################
+
+__all__ = (
+    "Shape",
+    "Nested",
+    "Selection",
+    "FieldSet",
+    "SparseSchema",
+    "select_all",
+    "get_fieldset",
+)
+
+Path = Tuple[str, ...]
+
+################################################################################
+@dataclass(frozen=True, eq=False)
+class Shape:
+    """
+    How a deep schema is built from an ORM model: its schema fields named in
+    ``nested`` come from relationships, the rest are columns of the same name.
+    ``requires`` lists columns to load even when they aren't returned, such as
+    ones a parent's ``Nested.get`` reads.
+    """
+
+    schema: Type[BaseSchema]
+    model: Type[Any]
+    nested: Dict[str, Nested] = field(default_factory=dict)
+    requires: Tuple[str, ...] = ()
+
+    @property
+    def scalars(self) -> Tuple[str, ...]:
+
+        return tuple(name for name in self.schema.model_fields if name not in self.nested)
+
+################################################################################
+@dataclass(frozen=True, eq=False)
+class Nested:
+    """
+    A schema field filled from ``relationship``. ``get`` picks the value out
+    of the parent when it isn't simply the relationship itself.
+    """
+
+    relationship: Any
+    shape: Shape
+    many: bool = True
+    get: Optional[Callable[[Any], Any]] = None
+
+################################################################################
+class SparseSchema(BaseSchema):
+    """
+    Base of the trimmed copies of deep schemas built for sparse requests.
+    They are returned in place of the route's declared schema as they are.
+    """
+
+################################################################################
+@dataclass(frozen=True)
+class Selection:
+    """
+    The part of a shape one request asked for: the columns to return and the
+    nested fields to load, each with its own selection.
+    """
+
+    shape: Shape
+    columns: Tuple[str, ...]
+    nested: Tuple[Tuple[str, Selection], ...] = ()
+
+    def child(self, name: str) -> Optional[Selection]:
+
+        return dict(self.nested).get(name)
+
+    def without(self, path: str) -> Selection:
+        """This selection less the nested field at ``path``, dotted for deeper ones."""
+
+        name, _, rest = path.partition(".")
+        if rest:
+            nested = tuple((n, child.without(rest) if n == name else child) for n, child in self.nested)
+        else:
+            nested = tuple(n for n in self.nested if n[0] != name)
+        return Selection(self.shape, self.columns, nested)
+
+    def options(self) -> List[Any]:
+        """Loader options that fetch exactly this selection and nothing else."""
+
+        model = self.shape.model
+        column_keys = inspect(model).column_attrs.keys()
+        wanted = dict.fromkeys((*self.columns, *self.shape.requires))
+
+        options: List[Any] = []
+        columns = [getattr(model, name) for name in wanted if name in column_keys]
+        if columns:
+            options.append(load_only(*columns))
+
+        # Fields built from the same relationship (e.g. pre_prompt and
+        # post_prompt) share one load.
+        loads: Dict[str, Tuple[Any, Selection]] = {}
+        for name, child in self.nested:
+            relationship = self.shape.nested[name].relationship
+            if relationship.key in loads:
+                child = _merge(loads[relationship.key][1], child)
+            loads[relationship.key] = (relationship, child)
+
+        for relationship, child in loads.values():
+            options.append(selectinload(relationship).options(*child.options()))
+
+        return options
+
+    def dump(self, obj: Any) -> SparseSchema:
+
+        return _sparse_schema(self).model_validate(self._extract(obj))
+
+    def _extract(self, obj: Any) -> Dict[str, Any]:
+
+        data = {name: getattr(obj, name) for name in self.columns}
+        for name, child in self.nested:
+            nested = self.shape.nested[name]
+            value = nested.get(obj) if nested.get else getattr(obj, nested.relationship.key)
+            if nested.many:
+                data[name] = [child._extract(item) for item in value]
+            else:
+                data[name] = None if value is None else child._extract(value)
+
+        return data
+
+################################################################################
+def _merge(a: Selection, b: Selection) -> Selection:
+
+    columns = tuple(name for name in a.shape.scalars if name in a.columns or name in b.columns)
+    nested = dict(a.nested)
+    for name, child in b.nested:
+        nested[name] = _merge(nested[name], child) if name in nested else child
+
+    return Selection(a.shape, columns, tuple(nested.items()))
+
+################################################################################
+@lru_cache(maxsize=256)
+def _sparse_schema(selection: Selection) -> Type[SparseSchema]:
+    """A schema with only the selected fields, keeping their original definitions."""
+
+    nested = dict(selection.nested)
+    definitions: Dict[str, Any] = {}
+    for name, info in selection.shape.schema.model_fields.items():
+        if name in selection.columns:
+            definitions[name] = (info.annotation, info)
+        elif name in nested:
+            child = _sparse_schema(nested[name])
+            definitions[name] = (List[child] if selection.shape.nested[name].many else Optional[child], ...)
+
+    # Field validators of the original schema still apply to the fields kept.
+    validators = {}
+    for name, decorator in selection.shape.schema.__pydantic_decorators__.field_validators.items():
+        kept = [f for f in decorator.info.fields if f in definitions]
+        if kept:
+            function = getattr(decorator.func, "__func__", decorator.func)
+            validators[name] = field_validator(*kept, mode=decorator.info.mode)(classmethod(function))
+
+    return create_model(
+        f"Sparse{selection.shape.schema.__name__}",
+        __base__=SparseSchema,
+        __validators__=validators,
+        **definitions
+    )
+
+################################################################################
+@dataclass
+class _FieldTree:
+
+    names: Set[str] = field(default_factory=set)
+    children: Dict[str, _FieldTree] = field(default_factory=dict)
+
+################################################################################
+@dataclass
+class FieldSet:
+    """
+    The ``fields`` and ``expand`` query parameters of a deep GET route.
+
+    ``fields`` lists the fields to return, dotted for nested ones
+    (``name,questions.primary_text``). A level with no fields named returns
+    all of its own, and ``id`` is always returned. ``expand`` lists nested
+    fields to embed, or to leave out when prefixed with ``-``
+    (``-questions.responses``). Once it names any to embed, nested fields it
+    doesn't name are only embedded if ``fields`` names them.
+
+    Without either parameter the route returns its full deep schema.
+    """
+
+    fields: Optional[str] = None
+    expand: Optional[str] = None
+
+    @property
+    def enabled(self) -> bool:
+
+        return self.fields is not None or self.expand is not None
+
+    def select(self, shape: Shape) -> Optional[Selection]:
+        """Resolve the parameters against ``shape``; None if neither was given."""
+
+        if not self.enabled:
+            return None
+
+        tree = _FieldTree()
+        for parts in _split(self.fields):
+            node = tree
+            for part in parts[:-1]:
+                node.names.add(part)
+                node = node.children.setdefault(part, _FieldTree())
+            node.names.add(parts[-1])
+
+        includes: Set[Path] = set()
+        excludes: Set[Path] = set()
+        for parts in _split(self.expand):
+            if parts[0].startswith("-"):
+                parts = (parts[0][1:], *parts[1:])
+                excludes.add(parts)
+            else:
+                includes.update(parts[:i] for i in range(1, len(parts) + 1))
+            _check_nested(shape, parts)
+
+        return _resolve(shape, tree, (), frozenset(includes), frozenset(excludes))
+
+################################################################################
+def _split(value: Optional[str]) -> List[Path]:
+
+    if not value:
+        return []
+    return [tuple(item.strip().split(".")) for item in value.split(",") if item.strip()]
+
+################################################################################
+def _check_nested(shape: Shape, parts: Path) -> None:
+
+    for i, part in enumerate(parts):
+        if part not in shape.nested:
+            raise HTTPException(status_code=400, detail=f"Unknown nested field '{'.'.join(parts[:i + 1])}'")
+        shape = shape.nested[part].shape
+
+################################################################################
+def _resolve(shape: Shape, tree: _FieldTree, path: Path, includes: FrozenSet[Path], excludes: FrozenSet[Path]) -> Selection:
+
+    for name in sorted(tree.names):
+        if name not in shape.schema.model_fields or (name in tree.children and name not in shape.nested):
+            raise HTTPException(status_code=400, detail=f"Unknown field '{'.'.join((*path, name))}'")
+
+    columns = tuple(name for name in shape.scalars if not tree.names or name in tree.names or name == "id")
+
+    nested = []
+    for name, relation in shape.nested.items():
+        nested_path = (*path, name)
+        if nested_path in excludes:
+            continue
+        if tree.names:
+            wanted = name in tree.names or nested_path in includes
+        else:
+            wanted = not includes or nested_path in includes
+        if wanted:
+            child = _resolve(relation.shape, tree.children.get(name, _FieldTree()), nested_path, includes, excludes)
+            nested.append((name, child))
+
+    return Selection(shape, columns, tuple(nested))
+
+################################################################################
+def select_all(shape: Shape) -> Selection:
+    """The selection of the full deep schema, as returned without a fieldset."""
+
+    return _resolve(shape, _FieldTree(), (), frozenset(), frozenset())
+
+################################################################################
+def get_fieldset(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, dotted for nested ones, e.g. name,questions.primary_text"),
+    expand: Optional[str] = Query(None, description="Comma-separated nested fields to embed; prefix one with - to leave it out, e.g. -questions.responses"),
+) -> FieldSet:
+
+    return FieldSet(fields=fields, expand=expand)
+
+################################################################################
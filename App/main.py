@@ -1,21 +1,42 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, APIRouter
 
 from . import Routers
+from .audit import audit_writer
+from .events import change_bridge
+from .responses import ORJSONSchemaResponse, SchemaRoute
+from .tracing import RequestTraceMiddleware
+################################################################################
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+
+    await audit_writer.start()
+    await change_bridge.start()
+    yield
+    await change_bridge.stop()
+    await audit_writer.stop()
+
 ################################################################################
 # Main app instantiation
-app = FastAPI()
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONSchemaResponse)
+app.add_middleware(RequestTraceMiddleware)
 # Include these routers to the MAIN app because we don't want them under the
 # 'guilds/{guild_id}' context
 app.include_router(Routers.Auth.router)
 # app.include_router(App.Routers.Old.LoadAll.router)
 app.include_router(Routers.Guilds.router)
+app.include_router(Routers.System.router)
 
 ################################################################################
 # Router Inclusion
-main_router = APIRouter(prefix="/guilds/{guild_id}")
+main_router = APIRouter(prefix="/guilds/{guild_id}", route_class=SchemaRoute)
 
 # All other routers are included under the main_router to get the guild_id context
+main_router.include_router(Routers.AuditLog.router)
+main_router.include_router(Routers.Changes.router)
 main_router.include_router(Routers.Embeds.router)
+main_router.include_router(Routers.Events.router)
 main_router.include_router(Routers.Forms.router)
 main_router.include_router(Routers.Giveaways.router)
 main_router.include_router(Routers.Glyphs.router)
@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Coroutine, List, Optional, Tuple, Type, get_args, get_origin
+
+import orjson
+from fastapi import Request, Response
+from fastapi.datastructures import DefaultPlaceholder
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel
+
+from .config import settings
+from .fieldsets import SparseSchema
+################################################################################
+
+__all__ = (
+    "ORJSONSchemaResponse",
+    "SchemaResponseField",
+    "SchemaRoute",
+)
+
+################################################################################
+class ORJSONSchemaResponse(JSONResponse):
+    """
+    JSON response rendered with orjson. Schemas are dumped to plain Python and
+    encoded in one pass, rather than converted to JSON-compatible data first
+    and then encoded by the standard library.
+    """
+
+    def render(self, content: Any) -> bytes:
+
+        return orjson.dumps(content, default=_encode, option=orjson.OPT_NON_STR_KEYS)
+
+################################################################################
+def _encode(obj: Any) -> Any:
+    """Fallback for the types orjson does not handle natively."""
+
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(by_alias=True)
+    return jsonable_encoder(obj)
+
+################################################################################
+class SchemaResponseField:
+    """
+    Wraps a route's response field so that values which already are instances
+    of the declared schema (or lists of them) are handed to the response class
+    as they are. FastAPI would otherwise validate them again and convert them
+    to JSON-compatible data before rendering. Anything else, such as ORM
+    objects or dicts, goes through the wrapped field as usual.
+
+    Only exact instances are passed through: a subclass carries fields the
+    declared schema would have stripped. Sparse schemas are the exception, as
+    they are trimmed copies of the declared schema built for the request.
+    """
+
+    def __init__(self, field: Any) -> None:
+
+        self.field = field
+        self.schema, self.many = _schema_of(field.field_info.annotation)
+
+    def __getattr__(self, name: str) -> Any:
+
+        return getattr(self.field, name)
+
+    def is_validated(self, value: Any) -> bool:
+
+        if isinstance(value, SparseSchema):
+            return True
+        if isinstance(value, list) and value and all(isinstance(item, SparseSchema) for item in value):
+            return True
+        if self.schema is None or settings.RESPONSE_REVALIDATION:
+            return False
+        if self.many:
+            return isinstance(value, list) and all(type(item) is self.schema for item in value)
+        return type(value) is self.schema
+
+    def validate(self, value: Any, values: Any = None, *, loc: Tuple[Any, ...] = ()) -> Tuple[Any, Any]:
+
+        if self.is_validated(value):
+            return value, None
+        return self.field.validate(value, values or {}, loc=loc)
+
+    def serialize(self, value: Any, **kwargs: Any) -> Any:
+
+        if self.is_validated(value):
+            return value
+        return self.field.serialize(value, **kwargs)
+
+################################################################################
+def _schema_of(annotation: Any) -> Tuple[Optional[Type[BaseModel]], bool]:
+    """Return the schema a response annotation declares, and whether it is a list of them."""
+
+    many = get_origin(annotation) in (list, List)
+    if many:
+        annotation = get_args(annotation)[0]
+
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation, many
+    return None, False
+
+################################################################################
+class SchemaRoute(APIRoute):
+    """
+    Route class used by every router. Responses that are already validated
+    schemas skip FastAPI's second validation and serialization pass.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+
+        # Only ORJSONSchemaResponse can render a schema as it is, and
+        # include/exclude options need FastAPI's serializer, so other routes
+        # keep the default behaviour. The OpenAPI schema is generated from
+        # ``response_field``, which is left untouched.
+        response_class = self.response_class
+        if isinstance(response_class, DefaultPlaceholder):
+            response_class = response_class.value
+
+        field = self.secure_cloned_response_field
+        if (
+            field is not None
+            and not isinstance(field, SchemaResponseField)
+            and issubclass(response_class, ORJSONSchemaResponse)
+            and not any((
+                self.response_model_include,
+                self.response_model_exclude,
+                self.response_model_exclude_unset,
+                self.response_model_exclude_defaults,
+                self.response_model_exclude_none,
+            ))
+        ):
+            self.secure_cloned_response_field = SchemaResponseField(field)
+
+        return super().get_route_handler()
+
+################################################################################
@@ -0,0 +1,312 @@
+"""
+Audit log retention job. Run it from cron with ``python -m App.retention``.
+
+On Postgres, ``audit_log`` is partitioned by month: upcoming partitions are
+created ahead of time and expired ones are archived, then detached and dropped.
+Elsewhere (SQLite) expired rows are archived and deleted from the plain table.
+"""
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import os
+import re
+from datetime import date, datetime, UTC
+from typing import Any, Dict, List, Optional, Tuple
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import column, delete, select, table, text
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+
+from . import Models
+from .config import settings
+################################################################################
+
+__all__ = (
+    "partition_name",
+    "ensure_audit_partitions",
+    "archive_expired_audit_log",
+    "run_audit_log_maintenance",
+)
+
+PARTITION_PATTERN = re.compile(r"^audit_log_p(\d{4})_(\d{2})$")
+
+################################################################################
+def month_start(value: datetime | date) -> date:
+
+    return date(value.year, value.month, 1)
+
+################################################################################
+def add_months(value: date, months: int) -> date:
+
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+################################################################################
+def partition_name(month: date) -> str:
+
+    return f"audit_log_p{month:%Y_%m}"
+
+################################################################################
+def retention_cutoff(retention_months: int, now: Optional[datetime] = None) -> date:
+    """Everything created before the returned date is outside the retention window."""
+
+    return add_months(month_start(now or datetime.now(UTC)), -retention_months)
+
+################################################################################
+async def _is_partitioned(conn: AsyncConnection) -> bool:
+
+    if conn.dialect.name != "postgresql":
+        return False
+
+    kind = await conn.scalar(text("SELECT relkind FROM pg_class WHERE relname = 'audit_log'"))
+    return kind == "p"
+
+################################################################################
+async def _default_partition(conn: AsyncConnection) -> Optional[str]:
+
+    return await conn.scalar(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'audit_log' AND pg_get_expr(c.relpartbound, c.oid) = 'DEFAULT'"
+    ))
+
+################################################################################
+def _month_bound(month: date) -> datetime:
+
+    return datetime.combine(month, datetime.min.time())
+
+################################################################################
+async def _create_partition(conn: AsyncConnection, name: str, start: date, default: Optional[str]) -> None:
+    """
+    Create the partition for the month starting at ``start``. Postgres refuses
+    to add a partition while the default partition holds rows that belong in
+    it, so the table is created on its own, those rows are moved over, and
+    only then is it attached.
+    """
+
+    end = add_months(start, 1)
+    await conn.execute(text(f"CREATE TABLE {name} (LIKE audit_log INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    if default is not None:
+        await conn.execute(
+            text(
+                f"WITH moved AS ("
+                f"DELETE FROM {default} WHERE created_at >= :start AND created_at < :end RETURNING *"
+                f") INSERT INTO {name} SELECT * FROM moved"
+            ),
+            {"start": _month_bound(start), "end": _month_bound(end)}
+        )
+    await conn.execute(text(
+        f"ALTER TABLE audit_log ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    ))
+
+################################################################################
+async def ensure_audit_partitions(
+    conn: AsyncConnection,
+    months_ahead: int,
+    now: Optional[datetime] = None
+) -> List[str]:
+    """
+    Create the partitions for the current month and the next ``months_ahead``
+    months, so new entries never land in the default partition. Entries that
+    already did are moved into the new partition.
+    Returns the names of the partitions that were checked. No-op if the table
+    isn't partitioned.
+    """
+
+    if not await _is_partitioned(conn):
+        return []
+
+    default = await _default_partition(conn)
+    current = month_start(now or datetime.now(UTC))
+    names = []
+    for offset in range(months_ahead + 1):
+        start = add_months(current, offset)
+        name = partition_name(start)
+        if await conn.scalar(text("SELECT to_regclass(:name)"), {"name": name}) is None:
+            await _create_partition(conn, name, start, default)
+        names.append(name)
+
+    return names
+
+################################################################################
+async def _list_partitions(conn: AsyncConnection) -> List[Tuple[str, date]]:
+
+    result = await conn.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = 'audit_log'"
+    ))
+
+    partitions = []
+    for (name,) in result:
+        match = PARTITION_PATTERN.match(name)
+        if match:
+            partitions.append((name, date(int(match.group(1)), int(match.group(2)), 1)))
+
+    return sorted(partitions, key=lambda p: p[1])
+
+################################################################################
+def _partition_table(name: str):
+
+    return table(name, *(column(c.name, c.type) for c in Models.AuditLogModel.__table__.c))
+
+################################################################################
+def _archive_path(archive_dir: str, month: date) -> str:
+    """Pick a file name for a month's archive without overwriting an earlier one."""
+
+    base = os.path.join(archive_dir, f"audit_log_{month:%Y_%m}")
+    path, n = f"{base}.ndjson.gz", 1
+    while os.path.exists(path):
+        path, n = f"{base}.{n}.ndjson.gz", n + 1
+    return path
+
+################################################################################
+class _MonthlyArchive:
+    """
+    Writes rows, in ``created_at`` order, straight into one gzipped NDJSON file
+    per month. Each file is written under a ``.partial`` name and only renamed
+    once its month is complete; if writing fails, the partial file is removed.
+    """
+
+    def __init__(self, archive_dir: str) -> None:
+
+        self.archive_dir = archive_dir
+        self.written: List[str] = []
+
+        self._month: Optional[date] = None
+        self._path: Optional[str] = None
+        self._file: Optional[Any] = None
+
+    def __enter__(self) -> _MonthlyArchive:
+
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+
+        if exc_type is None:
+            self._finish()
+        elif self._file is not None:
+            self._file.close()
+            os.remove(f"{self._path}.partial")
+            self._file = None
+
+    def write(self, row: Dict[str, Any]) -> None:
+
+        month = month_start(row["created_at"])
+        if month != self._month:
+            self._finish()
+            self._month = month
+            self._path = _archive_path(self.archive_dir, month)
+            self._file = gzip.open(f"{self._path}.partial", "wt", encoding="utf-8")
+
+        self._file.write(json.dumps(jsonable_encoder(row)) + "\n")
+
+    def _finish(self) -> None:
+
+        if self._file is None:
+            return
+
+        self._file.close()
+        os.replace(f"{self._path}.partial", self._path)
+        self.written.append(self._path)
+        self._file = None
+
+################################################################################
+async def _export(conn: AsyncConnection, source, archive_dir: str, cutoff: Optional[date] = None) -> List[str]:
+    """Stream the rows of ``source`` (before ``cutoff``, if given) into monthly archives."""
+
+    query = select(*source.c).order_by(source.c.created_at, source.c.id)
+    if cutoff is not None:
+        query = query.filter(source.c.created_at < _month_bound(cutoff))
+
+    with _MonthlyArchive(archive_dir) as archive:
+        async for row in await conn.stream(query):
+            archive.write(dict(row._mapping))
+
+    return archive.written
+
+################################################################################
+async def _archive_expired_rows(conn: AsyncConnection, source, archive_dir: str, cutoff: date) -> List[str]:
+    """Archive the rows of ``source`` created before ``cutoff``, then delete them."""
+
+    written = await _export(conn, source, archive_dir, cutoff)
+    if written:
+        await conn.execute(delete(source).where(source.c.created_at < _month_bound(cutoff)))
+
+    return written
+
+################################################################################
+async def archive_expired_audit_log(
+    target: AsyncEngine,
+    retention_months: int,
+    archive_dir: str,
+    now: Optional[datetime] = None
+) -> List[str]:
+    """
+    Export every month older than the retention window to ``archive_dir`` and
+    remove it from the database. A month is only removed after its archive has
+    been written completely. Returns the archive files written.
+    """
+
+    if retention_months <= 0:
+        return []
+
+    os.makedirs(archive_dir, exist_ok=True)
+    cutoff = retention_cutoff(retention_months, now)
+
+    async with target.begin() as conn:
+        if not await _is_partitioned(conn):
+            return await _archive_expired_rows(conn, Models.AuditLogModel.__table__, archive_dir, cutoff)
+
+        partitions = await _list_partitions(conn)
+        default = await _default_partition(conn)
+
+    written = []
+    for name, month in partitions:
+        if add_months(month, 1) > cutoff:
+            continue
+
+        # One transaction per partition, so a failure only holds back that month.
+        async with target.begin() as conn:
+            written.extend(await _export(conn, _partition_table(name), archive_dir))
+            await conn.execute(text(f"ALTER TABLE audit_log DETACH PARTITION {name}"))
+            await conn.execute(text(f"DROP TABLE {name}"))
+
+    # Entries from months that had no partition yet sit in the default one.
+    if default is not None:
+        async with target.begin() as conn:
+            written.extend(await _archive_expired_rows(conn, _partition_table(default), archive_dir, cutoff))
+
+    return written
+
+################################################################################
+async def run_audit_log_maintenance(target: AsyncEngine, now: Optional[datetime] = None) -> Dict[str, List[str]]:
+    """Create upcoming partitions, then archive and drop expired ones."""
+
+    async with target.begin() as conn:
+        created = await ensure_audit_partitions(conn, settings.AUDIT_LOG_PARTITION_MONTHS_AHEAD, now)
+
+    archived = await archive_expired_audit_log(
+        target,
+        settings.AUDIT_LOG_RETENTION_MONTHS,
+        settings.AUDIT_LOG_ARCHIVE_DIR,
+        now
+    )
+
+    return {"partitions": created, "archived": archived}
+
+################################################################################
+if __name__ == "__main__":
+    from .database import engine
+
+    result = asyncio.run(run_audit_log_maintenance(engine))
+    print(f"Checked {len(result['partitions'])} audit log partitions.")
+    for path in result["archived"]:
+        print(f"Archived expired audit log entries to {path}")
+
+################################################################################
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from typing import Dict, Optional, Set
+
+from fastapi import HTTPException, Request, Response
+from sqlalchemy import event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from .Models import GuildIDModel
+from .audit import PENDING_KEY, write_pending_entries
+################################################################################
+
+__all__ = (
+    "mark_guild_changed",
+    "apply_guild_revision_bumps",
+    "get_guild_revision",
+    "guild_etag",
+    "guild_etag_headers",
+    "check_guild_etag",
+)
+
+# Key under ``Session.info`` holding the guild IDs written to by the current transaction.
+CHANGED_GUILDS_KEY = "changed_guild_ids"
+
+################################################################################
+def mark_guild_changed(session: Session, guild_id: int) -> None:
+    """Bump the guild's revision when the current transaction commits."""
+
+    session.info.setdefault(CHANGED_GUILDS_KEY, set()).add(guild_id)
+
+################################################################################
+def apply_guild_revision_bumps(session: Session) -> None:
+    """
+    Increment the revision of every guild marked as changed in this transaction,
+    stamp the transaction's audit entries with the new revisions and hand them
+    on to be written.
+    """
+
+    guild_ids: Set[int] = session.info.pop(CHANGED_GUILDS_KEY, set())
+    if guild_ids:
+        # A single atomic UPDATE at the end of the transaction, so concurrent
+        # writers to the same guild only contend on its row briefly.
+        result = session.execute(
+            update(GuildIDModel)
+            .where(GuildIDModel.guild_id.in_(guild_ids))
+            .values(revision=GuildIDModel.revision + 1)
+            .returning(GuildIDModel.guild_id, GuildIDModel.revision)
+            .execution_options(synchronize_session=False)
+        )
+        _stamp_audit_entries(session, {gid: rev for gid, rev in result})
+
+    write_pending_entries(session)
+
+################################################################################
+def _stamp_audit_entries(session: Session, revisions: Dict[int, int]) -> None:
+    """Record the new revision on the audit entries of this transaction."""
+
+    for entry in session.info.get(PENDING_KEY, []):
+        if entry.get("revision") is None:
+            entry["revision"] = revisions.get(entry["guild_id"])
+
+################################################################################
+@event.listens_for(Session, "before_commit")
+def _bump_on_commit(session: Session) -> None:
+
+    apply_guild_revision_bumps(session)
+
+################################################################################
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_on_rollback(session: Session, _) -> None:
+
+    session.info.pop(CHANGED_GUILDS_KEY, None)
+
+################################################################################
+async def get_guild_revision(db: AsyncSession, guild_id: int) -> Optional[int]:
+
+    return await db.scalar(select(GuildIDModel.revision).filter_by(guild_id=guild_id))
+
+################################################################################
+def guild_etag(guild_id: int, revision: int) -> str:
+
+    return f'W/"{guild_id}-{revision}"'
+
+################################################################################
+def guild_etag_headers(guild_id: int, revision: int, request: Request) -> Dict[str, str]:
+    """
+    Raise 304 Not Modified if the client's If-None-Match matches the given
+    revision; otherwise return the ETag headers to send with the response.
+    """
+
+    etag = guild_etag(guild_id, revision)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if_none_match = request.headers.get("If-None-Match")
+    if if_none_match:
+        # Weak comparison: W/ prefixes are ignored on both sides.
+        candidates = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        if "*" in candidates or etag.removeprefix("W/") in candidates:
+            raise HTTPException(status_code=304, headers=headers)
+
+    return headers
+
+################################################################################
+async def check_guild_etag(db: AsyncSession, guild_id: int, request: Request, response: Response) -> None:
+    """
+    Answer with 304 Not Modified if the client's If-None-Match still matches the
+    guild's current revision; otherwise attach the current ETag to the response.
+    Runs before any deep load, so unchanged guilds cost one primary-key lookup.
+    """
+
+    revision = await get_guild_revision(db, guild_id)
+    if revision is None:
+        return
+
+    response.headers.update(guild_etag_headers(guild_id, revision, request))
+
+################################################################################
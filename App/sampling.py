@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import heapq
+import math
+import random
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import Select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+################################################################################
+
+__all__ = (
+    "sample_distinct",
+    "WeightedReservoir",
+    "sample_weighted",
+)
+
+# SQL random functions by dialect; other dialects sample in Python instead.
+RANDOM_FUNCTIONS: Dict[str, Callable[[], Any]] = {
+    "postgresql": func.random,
+    "sqlite": func.random,
+}
+
+################################################################################
+async def sample_distinct(db: AsyncSession, query: Select, k: int) -> List[Any]:
+    """
+    Pick up to ``k`` rows of a single-column ``query`` uniformly at random,
+    without replacement. Where the dialect has a random function the rows are
+    picked with ORDER BY random() LIMIT k, so only the sample leaves the
+    database. Otherwise the rows are streamed through a reservoir of ``k``.
+    """
+
+    if k <= 0:
+        return []
+
+    random_function = RANDOM_FUNCTIONS.get(db.get_bind().dialect.name)
+    if random_function is not None:
+        return list((await db.scalars(query.order_by(random_function()).limit(k))).all())
+
+    rng = random.SystemRandom()
+    reservoir: List[Any] = []
+    seen = 0
+    async for value in await db.stream_scalars(query):
+        seen += 1
+        if len(reservoir) < k:
+            reservoir.append(value)
+        else:
+            i = rng.randrange(seen)
+            if i < k:
+                reservoir[i] = value
+
+    rng.shuffle(reservoir)
+    return reservoir
+
+################################################################################
+class WeightedReservoir:
+    """
+    Weighted sampling without replacement over a stream, in O(k) memory
+    (Efraimidis-Spirakis). Each item gets the key log(u) / weight for a
+    uniform u, and the ``k`` largest keys win. This matches drawing one
+    ticket at a time and setting aside every ticket of a value once it has
+    won, but never needs the tickets themselves or the total weight.
+    """
+
+    def __init__(self, k: int, rng: random.Random) -> None:
+
+        self.k = k
+        self.rng = rng
+        self._heap: List[Tuple[float, int, Any]] = []
+        self._count = 0
+
+    def add(self, value: Any, weight: float) -> None:
+
+        if weight <= 0 or self.k <= 0:
+            return
+
+        # 1 - random() is in (0, 1], so the log is always defined.
+        key = math.log(1.0 - self.rng.random()) / weight
+        self._count += 1
+        # The count breaks ties, so values themselves are never compared.
+        item = (key, -self._count, value)
+        if len(self._heap) < self.k:
+            heapq.heappush(self._heap, item)
+        elif item > self._heap[0]:
+            heapq.heapreplace(self._heap, item)
+
+    def result(self) -> List[Any]:
+        """The sampled values, in the order they would have been drawn."""
+
+        return [value for _, _, value in sorted(self._heap, reverse=True)]
+
+################################################################################
+async def sample_weighted(db: AsyncSession, query: Select, k: int, seed: Optional[int] = None) -> List[Any]:
+    """
+    Pick up to ``k`` distinct values from a ``(value, weight)`` query, without
+    replacement and in proportion to weight. Rows are streamed, so memory is
+    bounded by ``k`` however many rows or how much weight there is. With a
+    seed, the same rows in the same order always give the same sample.
+    """
+
+    reservoir = WeightedReservoir(k, random.Random(seed))
+    async for value, weight in await db.stream(query):
+        reservoir.add(value, weight)
+
+    return reservoir.result()
+
+################################################################################
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from datetime import datetime, UTC
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from .config import settings
+################################################################################
+
+__all__ = (
+    "RequestTrace",
+    "RequestTraceBuffer",
+    "RequestTraceMiddleware",
+    "trace_buffer",
+    "current_request_id",
+)
+
+REQUEST_ID_HEADER = "X-Request-Id"
+
+_current_trace: ContextVar[Optional[RequestTrace]] = ContextVar("current_trace", default=None)
+
+################################################################################
+@dataclass
+class RequestTrace:
+    """Timing and query record for a single request."""
+
+    request_id: uuid.UUID
+    method: str
+    path: str
+    started_at: datetime
+    status_code: Optional[int] = None
+    wall_time: float = 0.0
+    db_time: float = 0.0
+    statement_count: int = 0
+    statements: List[Dict[str, Any]] = field(default_factory=list)
+
+    def record_statement(self, statement: str, duration: float) -> None:
+
+        self.statement_count += 1
+        self.db_time += duration
+        if len(self.statements) < settings.REQUEST_TRACE_MAX_STATEMENTS:
+            self.statements.append({
+                "sql": statement[:settings.REQUEST_TRACE_MAX_SQL_LENGTH],
+                "duration": duration,
+            })
+
+################################################################################
+class RequestTraceBuffer:
+    """Ring buffer of the most recent request traces, looked up by request ID."""
+
+    def __init__(self, max_size: int) -> None:
+
+        self.max_size = max_size
+        self._traces: OrderedDict[uuid.UUID, RequestTrace] = OrderedDict()
+
+    def add(self, trace: RequestTrace) -> None:
+
+        if self.max_size <= 0:
+            return
+
+        self._traces[trace.request_id] = trace
+        while len(self._traces) > self.max_size:
+            self._traces.popitem(last=False)
+
+    def get(self, request_id: uuid.UUID) -> Optional[RequestTrace]:
+
+        return self._traces.get(request_id)
+
+    def __len__(self) -> int:
+
+        return len(self._traces)
+
+################################################################################
+class RequestTraceMiddleware:
+    """
+    Assigns every request an ID (reusing a valid incoming ``X-Request-Id``),
+    returns it in the response headers, and records the request's wall time,
+    database time and statements into ``trace_buffer``.
+    """
+
+    def __init__(self, app) -> None:
+
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        trace = RequestTrace(
+            request_id=_incoming_request_id(scope) or uuid.uuid4(),
+            method=scope["method"],
+            path=scope["path"],
+            started_at=datetime.now(UTC),
+        )
+        header = (REQUEST_ID_HEADER.lower().encode("latin-1"), str(trace.request_id).encode("latin-1"))
+
+        async def _send(message) -> None:
+            if message["type"] == "http.response.start":
+                trace.status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [header]
+            await send(message)
+
+        token = _current_trace.set(trace)
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, _send)
+        finally:
+            # Measured after the body has been sent, so streamed responses count in full.
+            trace.wall_time = time.perf_counter() - start
+            _current_trace.reset(token)
+            trace_buffer.add(trace)
+
+################################################################################
+def _incoming_request_id(scope) -> Optional[uuid.UUID]:
+
+    for name, value in scope.get("headers", []):
+        if name == REQUEST_ID_HEADER.lower().encode("latin-1"):
+            try:
+                return uuid.UUID(value.decode("latin-1"))
+            except ValueError:
+                return None
+    return None
+
+################################################################################
+def current_request_id() -> Optional[uuid.UUID]:
+    """The ID of the request being handled, or None outside of a request."""
+
+    trace = _current_trace.get()
+    return trace.request_id if trace is not None else None
+
+################################################################################
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_statement_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+
+    if _current_trace.get() is not None:
+        conn.info.setdefault("trace_statement_start", []).append(time.perf_counter())
+
+################################################################################
+@event.listens_for(Engine, "after_cursor_execute")
+def _stop_statement_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+
+    trace = _current_trace.get()
+    timers = conn.info.get("trace_statement_start")
+    if trace is None or not timers:
+        return
+
+    trace.record_statement(statement, time.perf_counter() - timers.pop())
+
+################################################################################
+
+trace_buffer = RequestTraceBuffer(max_size=settings.REQUEST_TRACE_BUFFER_SIZE)
+
+################################################################################
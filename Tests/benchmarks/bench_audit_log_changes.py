@@ -0,0 +1,112 @@
+"""
+Micro-benchmark for ``build_audit_log_changes``: the cached column-only diff
+plan against the previous implementation, which walked every attribute
+(relationships included) on each call.
+
+Needs the same environment variables as the app. Run from the repo root:
+``python -m Tests.benchmarks.bench_audit_log_changes``
+"""
+from __future__ import annotations
+
+import timeit
+from typing import Any, Callable, Dict, List, Tuple
+
+from sqlalchemy import create_engine, inspect, select
+from sqlalchemy.orm import Session, selectinload
+
+from App import Models
+from App.Routers.Common import build_audit_log_changes
+################################################################################
+
+NUMBER = 20000
+GUILD_ID = 1
+
+################################################################################
+def legacy_build_audit_log_changes(obj: Any) -> Dict[str, Any]:
+    """The implementation before diff plans, kept here for comparison."""
+
+    changes = {}
+    state = inspect(obj)
+
+    for attr in state.attrs:
+        if not attr.history.has_changes():
+            continue
+        old, new = None, None
+        if attr.history.deleted:
+            old = attr.history.deleted[0]
+        if attr.history.added:
+            new = attr.history.added[0]
+        if old != new:
+            changes[attr.key] = {"old": old, "new": new}
+
+    return changes
+
+################################################################################
+def seed(db: Session) -> None:
+
+    db.add_all([
+        Models.GuildIDModel(guild_id=GUILD_ID),
+        Models.ProfileManagerModel(guild_id=GUILD_ID),
+        Models.ProfileRequirementsModel(guild_id=GUILD_ID),
+    ])
+    db.flush()
+
+    form = Models.FormModel(guild_id=GUILD_ID, name="Application")
+    form.prompts = [Models.FormPromptModel(prompt_type=0), Models.FormPromptModel(prompt_type=1)]
+    form.questions = [
+        Models.FormQuestionModel(sort_order=i, primary_text=f"Question {i}")
+        for i in range(10)
+    ]
+    db.add(form)
+    db.commit()
+
+################################################################################
+def cases(db: Session) -> List[Tuple[str, Any]]:
+
+    requirements = db.scalar(select(Models.ProfileRequirementsModel))
+    requirements.url = True
+    requirements.age = True
+
+    form = db.scalar(
+        select(Models.FormModel).options(
+            selectinload(Models.FormModel.questions),
+            selectinload(Models.FormModel.prompts),
+            selectinload(Models.FormModel.response_collections),
+            selectinload(Models.FormModel.post_options),
+        )
+    )
+    form.name = "Renamed"
+
+    untouched = db.scalar(select(Models.FormQuestionModel))
+
+    return [
+        ("ProfileRequirementsModel (2 of 18 columns changed)", requirements),
+        ("FormModel, deep-loaded (1 column changed)", form),
+        ("FormQuestionModel (unchanged)", untouched),
+    ]
+
+################################################################################
+def bench(fn: Callable[[Any], Dict[str, Any]], obj: Any) -> float:
+
+    return min(timeit.repeat(lambda: fn(obj), number=NUMBER, repeat=5)) / NUMBER * 1e6
+
+################################################################################
+def main() -> None:
+
+    engine = create_engine("sqlite://")
+    Models.BaseModel.metadata.create_all(engine)
+
+    with Session(engine, autoflush=False) as db:
+        seed(db)
+        print(f"{'model':<52}{'before (us)':>12}{'after (us)':>12}{'speedup':>10}")
+        for label, obj in cases(db):
+            assert build_audit_log_changes(obj) == legacy_build_audit_log_changes(obj), label
+            before = bench(legacy_build_audit_log_changes, obj)
+            after = bench(build_audit_log_changes, obj)
+            print(f"{label:<52}{before:>12.2f}{after:>12.2f}{before / after:>9.1f}x")
+
+################################################################################
+if __name__ == "__main__":
+    main()
+
+################################################################################
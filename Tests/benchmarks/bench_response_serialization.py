@@ -0,0 +1,156 @@
+"""
+Micro-benchmark for response serialization of the deep GET endpoints: FastAPI's
+default path (validate against the response model, convert to JSON-compatible
+data, encode with the standard library) against ``SchemaRoute`` rendering the
+already-validated schema with ``ORJSONSchemaResponse``.
+
+Needs the same environment variables as the app. Run from the repo root:
+``python -m Tests.benchmarks.bench_response_serialization``
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import timeit
+from datetime import datetime
+from typing import Any, List, Tuple
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute, serialize_response
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from App import Models
+from App.main import app
+from App.responses import ORJSONSchemaResponse
+from App.Routers.Guilds import SNAPSHOT_SECTIONS
+################################################################################
+
+NUMBER = 20
+GUILD_ID = 1
+
+# Snapshot section benchmarked for each endpoint, by endpoint path.
+ENDPOINTS = {
+    "embeds": "/guilds/{guild_id}/embeds/",
+    "forms": "/guilds/{guild_id}/forms/",
+    "giveaway_mgr": "/guilds/{guild_id}/giveaways/",
+    "profile_mgr": "/guilds/{guild_id}/profiles/",
+    "raffle_mgr": "/guilds/{guild_id}/raffles/",
+}
+
+################################################################################
+def seed(db: Session) -> None:
+
+    now = datetime.now()
+    db.add_all([
+        Models.GuildIDModel(guild_id=GUILD_ID),
+        Models.GiveawayManagerModel(guild_id=GUILD_ID),
+        Models.ProfileManagerModel(guild_id=GUILD_ID),
+        Models.ProfileRequirementsModel(guild_id=GUILD_ID),
+        Models.RaffleManagerModel(guild_id=GUILD_ID),
+    ])
+    db.flush()
+
+    for i in range(25):
+        embed = Models.EmbedModel(guild_id=GUILD_ID, title=f"Embed {i}", description="Lorem ipsum " * 20)
+        embed.images = Models.EmbedImagesModel()
+        embed.header = Models.EmbedHeaderModel(text="Header")
+        embed.footer = Models.EmbedFooterModel(text="Footer")
+        embed.fields = [Models.EmbedFieldModel(sort_order=j, name=f"Field {j}", value="Value") for j in range(10)]
+        db.add(embed)
+
+    for i in range(10):
+        form = Models.FormModel(guild_id=GUILD_ID, name=f"Form {i}")
+        form.post_options = Models.FormPostOptionsModel()
+        form.prompts = [Models.FormPromptModel(prompt_type=0), Models.FormPromptModel(prompt_type=1)]
+        form.questions = [
+            Models.FormQuestionModel(sort_order=j, primary_text=f"Question {j}", prompts=[
+                Models.FormPromptModel(prompt_type=0), Models.FormPromptModel(prompt_type=1)
+            ])
+            for j in range(15)
+        ]
+        db.add(form)
+
+    for i in range(20):
+        giveaway = Models.GiveawayModel(guild_id=GUILD_ID)
+        giveaway.details = Models.GiveawayDetailsModel(name=f"Giveaway {i}", prize="Prize", end_dt=now)
+        giveaway.entries = [Models.GiveawayEntryModel(user_id=10**17 + j, timestamp=now) for j in range(100)]
+        db.add(giveaway)
+
+    for i in range(100):
+        profile = Models.ProfileModel(guild_id=GUILD_ID, user_id=10**17 + i)
+        profile.images = Models.ProfileImagesModel(thumbnail_url="https://example.com/thumb.png")
+        profile.images.addl_images = [Models.ProfileAdditionalImageModel(url="https://example.com/1.png")]
+        profile.ataglance = Models.ProfileAtAGlanceModel()
+        profile.details = Models.ProfileDetailsModel(name=f"Character {i}")
+        profile.personality = Models.ProfilePersonalityModel(aboutme="About me " * 30)
+        db.add(profile)
+
+    for i in range(10):
+        raffle = Models.RaffleModel(guild_id=GUILD_ID)
+        raffle.entries = [Models.RaffleEntryModel(user_id=10**17 + j, quantity=1) for j in range(100)]
+        db.add(raffle)
+
+    db.commit()
+
+################################################################################
+def cases(db: Session) -> List[Tuple[str, APIRoute, Any]]:
+
+    routes = {
+        route.path: route for route in app.routes
+        if isinstance(route, APIRoute) and "GET" in route.methods
+    }
+
+    result = []
+    for section in SNAPSHOT_SECTIONS:
+        if section.name not in ENDPOINTS:
+            continue
+        rows = db.scalars(section.query([GUILD_ID])).all()
+        data = [section.mapper(row) for row in rows] if section.many else section.mapper(rows[0])
+        result.append((f"GET {ENDPOINTS[section.name]}", routes[ENDPOINTS[section.name]], data))
+
+    return result
+
+################################################################################
+async def default_render(route: APIRoute, data: Any) -> bytes:
+    """FastAPI's own response handling for a route with ``response_model``."""
+
+    content = await serialize_response(field=route.response_field, response_content=data)
+    return JSONResponse(content).body
+
+################################################################################
+async def fast_render(route: APIRoute, data: Any) -> bytes:
+
+    content = await serialize_response(field=route.secure_cloned_response_field, response_content=data)
+    return ORJSONSchemaResponse(content).body
+
+################################################################################
+def bench(loop: asyncio.AbstractEventLoop, fn: Any, route: APIRoute, data: Any) -> float:
+
+    run = lambda: loop.run_until_complete(fn(route, data))
+    return min(timeit.repeat(run, number=NUMBER, repeat=5)) / NUMBER * 1e3
+
+################################################################################
+def main() -> None:
+
+    engine = create_engine("sqlite://")
+    Models.BaseModel.metadata.create_all(engine)
+    loop = asyncio.new_event_loop()
+
+    with Session(engine, autoflush=False) as db:
+        seed(db)
+        print(f"{'endpoint':<36}{'bytes':>10}{'before (ms)':>13}{'after (ms)':>12}{'speedup':>10}")
+        for label, route, data in cases(db):
+            body = loop.run_until_complete(default_render(route, data))
+            assert json.loads(body) == json.loads(loop.run_until_complete(fast_render(route, data))), label
+            before = bench(loop, default_render, route, data)
+            after = bench(loop, fast_render, route, data)
+            print(f"{label:<36}{len(body):>10}{before:>13.2f}{after:>12.2f}{before / after:>9.1f}x")
+
+    loop.close()
+
+################################################################################
+if __name__ == "__main__":
+    main()
+
+################################################################################
@@ -3,18 +3,24 @@ from __future__ import annotations
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.pool import NullPool
 
 from App.main import app
-from App.database import get_db
+from App.cache import guild_cache
+from App.database import get_db, get_read_db, get_streaming_read_db, as_async_url
 from App import Models, Schemas
 from .payloads import *
 ################################################################################
 
 TEST_DB_URL = "sqlite:///C:/Dev/Python/FroggeAPIv3/Tests/testing-db.sqlite"
 
+# Schema management stays synchronous; the app itself talks to the database
+# through the async engine. NullPool keeps connections from leaking between
+# the event loops of separate TestClient instances.
 engine = create_engine(TEST_DB_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(bind=engine, autocommit=False, autoflush=False)
+async_engine = create_async_engine(as_async_url(TEST_DB_URL), poolclass=NullPool)
+TestingSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
 
 ################################################################################
 @pytest.fixture(scope="session")
@@ -30,17 +36,16 @@ def setup_db():
 def session_client(setup_db):
     """Session-scoped client used only for initial setup tasks."""
 
-    TestingSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-    def _override_get_db():
-        db = TestingSession()
+    async def _override_get_db():
+        db = TestingSessionLocal()
         try:
             yield db
-            db.commit()
+            await db.commit()
         finally:
-            db.close()
+            await db.close()
 
     app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_read_db] = _override_get_db
     with TestClient(app) as c:
         yield c
     app.dependency_overrides.clear()
@@ -71,29 +76,51 @@ def login_header(session_client):
 
 ################################################################################
 @pytest.fixture(scope="function")
-def db_session():
-    """Provide a fresh database session for each test."""
+def async_db_session():
+    """Provide a fresh async database session for each test."""
 
-    session = TestingSessionLocal()
-    try:
-        yield session
-    finally:
-        session.rollback()
-        session.close()
+    yield TestingSessionLocal()
 
 ################################################################################
 @pytest.fixture(scope="function")
-def client(db_session, login_header):
+def client(async_db_session, login_header):
     """FastAPI test client with overridden database dependency."""
 
-    def _override_get_db():
-        yield db_session
+    async def _override_get_db():
+        yield async_db_session
+
+    async def _override_get_streaming_db():
+        # Streams close their session when they end, so they get their own,
+        # joined to the test session's connection to see its uncommitted writes.
+        return AsyncSession(bind=await async_db_session.connection(), autoflush=False, expire_on_commit=False)
 
+    # Cached guild lookups must not outlive the transaction that created them.
+    guild_cache.clear()
+    # Reads share the test session so they see the test's uncommitted writes.
     app.dependency_overrides[get_db] = _override_get_db
+    app.dependency_overrides[get_read_db] = _override_get_db
+    app.dependency_overrides[get_streaming_read_db] = _override_get_streaming_db
     with TestClient(app) as c:
         c.headers.update(login_header)
         c.headers.update({"X-Actor-Id": str(TEST_USER_ID)})
         yield c
+        # The session's connection lives on the client's event loop, so it
+        # has to be rolled back and released there.
+        c.portal.call(async_db_session.rollback)
+        c.portal.call(async_db_session.close)
     app.dependency_overrides.clear()
 
 ################################################################################
+@pytest.fixture(scope="function")
+def db_session(client, async_db_session):
+    """
+    Run synchronous ORM code against the same session the client uses.
+    Usage: ``db_session(lambda s: s.query(Model).filter_by(...).first())``
+    """
+
+    def _run_sync(fn):
+        return client.portal.call(async_db_session.run_sync, fn)
+
+    yield _run_sync
+
+################################################################################
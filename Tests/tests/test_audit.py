@@ -0,0 +1,209 @@
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, func, select
+
+from ..conftest import TestingSessionLocal
+from ..payloads import *
+
+from App import Models
+from App.config import settings
+from App.audit import AuditLogWriter, PENDING_KEY, audit_writer, queue_audit_entry
+from App.database import get_db, get_read_db
+from App.events import change_feed
+from App.main import app
+from App.Routers.Common import _audit_diff_plan, build_audit_log_changes
+################################################################################
+
+AUDIT_TEST_GUILD_ID = 424242
+
+################################################################################
+def make_entry(target_id: int):
+
+    return {
+        "guild_id": AUDIT_TEST_GUILD_ID,
+        "target": "Embed",
+        "target_id": target_id,
+        "action": "Create",
+        "user_id": TEST_USER_ID,
+        "changes": {"title": {"old": None, "new": "Test"}},
+        "request_id": None,
+    }
+
+################################################################################
+async def count_and_clear_entries() -> int:
+
+    async with TestingSessionLocal() as db:
+        count = await db.scalar(
+            select(func.count()).select_from(Models.AuditLogModel).filter_by(guild_id=AUDIT_TEST_GUILD_ID)
+        )
+        await db.execute(delete(Models.AuditLogModel).filter_by(guild_id=AUDIT_TEST_GUILD_ID))
+        await db.commit()
+    return count
+
+################################################################################
+@pytest.mark.integration
+def test_writer_bulk_inserts_buffered_entries(setup_db):
+    """Test that buffered entries are written in a single batch."""
+
+    writer = AuditLogWriter(TestingSessionLocal, batch_size=100, flush_interval=60)
+    writer.submit([make_entry(i) for i in range(5)])
+    assert writer.pending == 5, "Submitted entries should be buffered"
+
+    written = asyncio.run(writer.flush())
+    assert written == 5, "All buffered entries should be flushed"
+    assert writer.batches == 1, "Entries should be written in one batch"
+    assert writer.pending == 0, "Buffer should be empty after a flush"
+    assert asyncio.run(count_and_clear_entries()) == 5, "Flushed entries should be in the audit log"
+
+################################################################################
+@pytest.mark.integration
+def test_writer_replays_spool_after_crash(setup_db, tmp_path):
+    """Test that spooled entries from a crashed process are written on start."""
+
+    spool = tmp_path / "audit.spool"
+    crashed = AuditLogWriter(TestingSessionLocal, batch_size=100, flush_interval=60, spool_path=str(spool))
+    crashed.submit([make_entry(i) for i in range(3)])
+    assert spool.exists(), "Submitted entries should be spooled to disk"
+
+    async def _restart():
+        writer = AuditLogWriter(TestingSessionLocal, batch_size=100, flush_interval=60, spool_path=str(spool))
+        await writer.start()
+        pending = writer.pending
+        await writer.stop()
+        return pending
+
+    assert asyncio.run(_restart()) == 3, "Spooled entries should be replayed into the buffer"
+    assert not spool.exists(), "Spool should be cleared once its entries are written"
+    assert asyncio.run(count_and_clear_entries()) == 3, "Replayed entries should be in the audit log"
+
+################################################################################
+@pytest.mark.integration
+def test_writer_spools_off_the_event_loop(setup_db, tmp_path):
+    """Test that entries submitted on the event loop are spooled by a worker thread."""
+
+    spool = tmp_path / "audit.spool"
+    writer = AuditLogWriter(TestingSessionLocal, batch_size=100, flush_interval=60, spool_path=str(spool))
+
+    async def _submit():
+        writer.submit([make_entry(i) for i in range(2)])
+        writer.submit([make_entry(2)])
+        spooled_inline = spool.exists()
+        await writer._drain_spool()
+        return spooled_inline
+
+    assert not asyncio.run(_submit()), "Submitting should not write the spool on the event loop"
+    assert len(spool.read_text().splitlines()) == 3, "Every submitted entry should be spooled"
+    assert writer.pending == 3, "Spooled entries should still be buffered"
+
+    assert asyncio.run(writer.flush()) == 3, "All buffered entries should be flushed"
+    assert not spool.exists(), "Spool should be cleared once its entries are written"
+    assert asyncio.run(count_and_clear_entries()) == 3, "Flushed entries should be in the audit log"
+
+################################################################################
+@pytest.mark.integration
+def test_entries_only_submitted_on_commit(setup_db, monkeypatch):
+    """Test that entries reach the writer on commit and are dropped on rollback."""
+
+    monkeypatch.setattr(settings, "AUDIT_LOG_BUFFERED", True)
+    monkeypatch.setattr(audit_writer, "session_factory", TestingSessionLocal)
+    submitted = audit_writer.submitted
+
+    async def _transactions():
+        async with TestingSessionLocal() as db:
+            await db.scalar(select(Models.GuildIDModel).filter_by(guild_id=TEST_GUILD_ID))
+            queue_audit_entry(db.sync_session, make_entry(1))
+            await db.rollback()
+            assert PENDING_KEY not in db.info, "Rolled back entries should be discarded"
+
+            queue_audit_entry(db.sync_session, make_entry(2))
+            await db.commit()
+
+        await audit_writer.flush()
+
+    asyncio.run(_transactions())
+    assert audit_writer.submitted == submitted + 1, "Only the committed entry should be submitted"
+    assert asyncio.run(count_and_clear_entries()) == 1, "Committed entry should be in the audit log"
+
+################################################################################
+@pytest.mark.integration
+def test_buffered_writes_go_through_the_writer(setup_db, login_header, monkeypatch):
+    """Test that with buffering enabled, committed writes reach the writer and are announced once written."""
+
+    monkeypatch.setattr(settings, "AUDIT_LOG_BUFFERED", True)
+    monkeypatch.setattr(audit_writer, "session_factory", TestingSessionLocal)
+    # Keep the flush loop out of the way; the test flushes explicitly.
+    monkeypatch.setattr(audit_writer, "flush_interval", 60)
+    submitted = audit_writer.submitted
+
+    async def _override_get_db():
+        async with TestingSessionLocal() as db:
+            yield db
+            await db.commit()
+
+    monkeypatch.setitem(app.dependency_overrides, get_db, _override_get_db)
+    monkeypatch.setitem(app.dependency_overrides, get_read_db, _override_get_db)
+
+    async def _written_and_clear(message_id):
+        async with TestingSessionLocal() as db:
+            entry = await db.scalar(select(Models.AuditLogModel).filter_by(target="GlyphMessage", target_id=message_id))
+            await db.execute(delete(Models.AuditLogModel).filter_by(target="GlyphMessage", target_id=message_id))
+            await db.execute(delete(Models.GlyphMessageModel).filter_by(id=message_id))
+            await db.commit()
+        return entry
+
+    subscription = change_feed.subscribe(TEST_GUILD_ID)
+    try:
+        with TestClient(app, headers={**login_header, "X-Actor-Id": str(TEST_USER_ID)}) as c:
+            res = c.post(f"/guilds/{TEST_GUILD_ID}/glyph-messages/")
+            assert res.status_code == 201, f"Failed to create glyph message: {res.text}"
+            message_id = res.json()["id"]
+            revision = c.get(f"/guilds/{TEST_GUILD_ID}/revision").json()["revision"]
+
+            stats = c.get("/system/audit-writer").json()
+            assert stats["submitted"] == submitted + 1 and stats["buffered"] >= 1, "The entry should be waiting in the writer"
+            assert subscription.queue.empty(), "Nothing should be announced before the entry is written"
+            c.portal.call(audit_writer.flush)
+
+        notification = subscription.queue.get_nowait()
+    finally:
+        subscription.close()
+
+    entry = asyncio.run(_written_and_clear(message_id))
+    assert entry is not None and entry.revision == revision, "The writer should insert the entry with its revision"
+    assert notification["revision"] == revision, "The writer's commit should announce the entry"
+    assert notification["changes"] == [{"target": "GlyphMessage", "target_id": message_id, "action": "Create"}], \
+        "The notification should list the written entry"
+
+################################################################################
+def test_writes_defer_audit_entries(client, async_db_session, monkeypatch):
+    """Test that write endpoints attach their audit entries to the transaction."""
+
+    monkeypatch.setattr(settings, "AUDIT_LOG_BUFFERED", True)
+    res = client.post(f"/guilds/{TEST_GUILD_ID}/embeds/")
+    assert res.status_code == 201, f"Failed to create embed: {res.json()}"
+
+    pending = async_db_session.info.get(PENDING_KEY, [])
+    assert len(pending) == 1, "Creating an embed should queue one audit entry"
+    assert pending[0]["target"] == "Embed", "Audit entry should target the embed"
+    assert pending[0]["action"] == "Create", "Audit entry should record a create"
+
+################################################################################
+@pytest.mark.unit
+def test_build_audit_log_changes_only_diffs_columns():
+    """Test that audit diffs cover changed columns and skip relationships."""
+
+    form = Models.FormModel(guild_id=TEST_GUILD_ID, name="Application")
+    form.questions = [Models.FormQuestionModel(sort_order=0)]
+
+    changes = build_audit_log_changes(form)
+    assert changes["name"] == {"old": None, "new": "Application"}, "Changed column should be diffed"
+    assert "questions" not in changes, "Relationships should not be diffed"
+
+    _audit_diff_plan.cache_clear()
+    build_audit_log_changes(form)
+    build_audit_log_changes(Models.FormModel(name="Other"))
+    assert _audit_diff_plan.cache_info().misses == 1, "Diff plan should be built once per model"
+
+################################################################################
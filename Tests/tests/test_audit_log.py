@@ -0,0 +1,84 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from ..payloads import *
+
+from App import Models
+################################################################################
+
+BASE_TIME = datetime(2026, 1, 1, 12, 0, 0)
+
+################################################################################
+def seed_audit_log(db_session, count: int = 5):
+    """Insert audit log entries one minute apart, alternating users and targets."""
+
+    def _seed(s):
+        s.add_all([
+            Models.AuditLogModel(
+                guild_id=TEST_GUILD_ID,
+                target="Embed" if i % 2 == 0 else "Form",
+                target_id=i,
+                action="Create",
+                user_id=TEST_USER_ID if i % 2 == 0 else TEST_USER_ID2,
+                changes={"name": {"old": None, "new": f"Item {i}"}},
+                created_at=BASE_TIME + timedelta(minutes=i),
+            )
+            for i in range(count)
+        ])
+        s.flush()
+
+    db_session(_seed)
+
+################################################################################
+def test_get_audit_log_pages(client, db_session):
+    """Test that the audit log is paged newest first without gaps or repeats."""
+
+    seed_audit_log(db_session, 5)
+
+    res = client.get(f"/guilds/{TEST_GUILD_ID}/audit-log/", params={"limit": 2})
+    assert res.status_code == 200, f"Failed to get audit log: {res.json()}"
+    page = res.json()
+    assert [e["target_id"] for e in page["items"]] == [4, 3], "First page should hold the newest entries"
+    assert page["next_cursor"] is not None, "First page should have a next cursor"
+
+    seen = [e["target_id"] for e in page["items"]]
+    while page["next_cursor"]:
+        res = client.get(f"/guilds/{TEST_GUILD_ID}/audit-log/", params={"limit": 2, "cursor": page["next_cursor"]})
+        assert res.status_code == 200, f"Failed to get audit log page: {res.json()}"
+        page = res.json()
+        seen.extend(e["target_id"] for e in page["items"])
+
+    assert seen == [4, 3, 2, 1, 0], "Pages should cover every entry exactly once"
+
+################################################################################
+def test_get_audit_log_filters(client, db_session):
+    """Test filtering the audit log by target and user."""
+
+    seed_audit_log(db_session, 5)
+
+    res = client.get(f"/guilds/{TEST_GUILD_ID}/audit-log/", params={"target": "Form"})
+    assert res.status_code == 200, f"Failed to filter audit log: {res.json()}"
+    assert [e["target_id"] for e in res.json()["items"]] == [3, 1], "Only Form entries should be returned"
+
+    res = client.get(f"/guilds/{TEST_GUILD_ID}/audit-log/", params={"user_id": TEST_USER_ID, "target_id": 2})
+    assert res.status_code == 200, f"Failed to filter audit log: {res.json()}"
+    items = res.json()["items"]
+    assert len(items) == 1, "Only one entry should match the user and target ID"
+    assert items[0]["user_id"] == TEST_USER_ID, "Entry should belong to the requested user"
+
+################################################################################
+def test_get_audit_log_invalid_cursor(client):
+    """Test that a malformed cursor is rejected."""
+
+    res = client.get(f"/guilds/{TEST_GUILD_ID}/audit-log/", params={"cursor": "not-a-cursor"})
+    assert res.status_code == 400, "Should return 400 for an invalid cursor"
+
+################################################################################
+def test_get_audit_log_invalid_guild(client):
+    """Test retrieving the audit log of a guild that does not exist."""
+
+    res = client.get(f"/guilds/{INVALID_GUILD_ID}/audit-log/")
+    assert res.status_code == 404, "Should return 404 for an invalid guild ID"
+
+################################################################################
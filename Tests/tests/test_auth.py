@@ -1,6 +1,15 @@
+import asyncio
+import time
+from datetime import datetime, timedelta, UTC
+
 import pytest
+from fastapi import HTTPException
 
 from ..payloads import *
+
+from App import Models, auth
+from App.cache import TokenCache, token_cache
+from App.config import settings
 ################################################################################
 def assert_registration_response(response, expected_user_id):
 
@@ -28,3 +37,126 @@ def test_register_user_invalid_payload(client):
     assert res.status_code == 422, "Should return 422 for invalid payload"
 
 ################################################################################
+def test_revoke_token(client):
+    """Test that a revoked token is rejected from then on."""
+
+    token = auth.generate_access_token(data={"user_id": TEST_USER_ID, "purpose": "revoke-test"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    res = client.get("/system/pool", headers=headers)
+    assert res.status_code == 200, "Token should be accepted before revocation"
+
+    res = client.post("/auth/revoke", headers=headers)
+    assert res.status_code == 204, "Should return 204 for successful revocation"
+
+    res = client.get("/system/pool", headers=headers)
+    assert res.status_code == 401, "Revoked token should be rejected"
+    assert res.json()["detail"] == "Token has been revoked", "Rejection should mention revocation"
+
+################################################################################
+def test_revocation_outlives_token_cache(client, db_session):
+    """Test that revocations are kept in the database, not only in this worker."""
+
+    token = auth.generate_access_token(data={"user_id": TEST_USER_ID, "purpose": "revoke-restart-test"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    res = client.post("/auth/revoke", headers=headers)
+    assert res.status_code == 204, "Should return 204 for successful revocation"
+
+    digest = TokenCache.digest(token)
+    row = db_session(lambda s: s.get(Models.RevokedTokenModel, digest))
+    assert row is not None, "Revocation should be stored by digest"
+
+    # A restarted worker, or another one, knows nothing about the revocation.
+    token_cache.clear()
+    res = client.get("/system/pool", headers=headers)
+    assert res.status_code == 401, "Revoked token should be rejected after the cache is cleared"
+    assert res.json()["detail"] == "Token has been revoked", "Rejection should mention revocation"
+
+################################################################################
+def test_revocation_reaches_cached_tokens(client, db_session, monkeypatch):
+    """Test that a token cached before another worker revoked it is checked again."""
+
+    monkeypatch.setattr(settings, "JWT_REVOCATION_CHECK_INTERVAL", 0)
+    token = auth.generate_access_token(data={"user_id": TEST_USER_ID, "purpose": "revoke-elsewhere-test"})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    res = client.get("/system/pool", headers=headers)
+    assert res.status_code == 200, "Token should be accepted before revocation"
+
+    # Revoked by some other worker: only the database knows.
+    def _revoke(s):
+        s.add(Models.RevokedTokenModel(
+            digest=TokenCache.digest(token),
+            expires_at=datetime.now(UTC).replace(tzinfo=None) + timedelta(minutes=5)
+        ))
+        s.flush()
+
+    db_session(_revoke)
+    res = client.get("/system/pool", headers=headers)
+    assert res.status_code == 401, "Revocation should be seen once the cached entry lapses"
+
+################################################################################
+@pytest.mark.unit
+def test_verified_token_is_cached():
+    """Test that a token is only decoded once while it is cached."""
+
+    token = auth.generate_access_token(data={"user_id": TEST_USER_ID, "purpose": "cache-test"})
+    misses = token_cache.misses
+
+    first = auth.verify_access_token(token)
+    second = auth.verify_access_token(token)
+    assert first.id == TEST_USER_ID, "Token data should carry the user ID"
+    assert second is first, "Second verification should come from the cache"
+    assert token_cache.misses == misses + 1, "Only the first verification should miss"
+
+################################################################################
+@pytest.mark.unit
+def test_token_cache_honors_expiry():
+    """Test that cached tokens are not served past their expiry."""
+
+    cache = TokenCache(max_size=2)
+    cache.set("expired", "data", time.time() - 1)
+    assert cache.get("expired") is None, "Already-expired token should not be cached"
+
+    cache.set("a", "a", time.time() + 60)
+    cache.set("b", "b", time.time() + 60)
+    cache.set("c", "c", time.time() + 60)
+    assert cache.get("a") is None, "Oldest token should be evicted at capacity"
+    assert cache.get("c") == "c", "Newest token should be cached"
+
+################################################################################
+@pytest.mark.unit
+def test_password_pool_rejects_when_full():
+    """Test that password hashing calls beyond the queue limit get a 503."""
+
+    pool = auth.PasswordHashPool(workers=1, max_queue=1)
+
+    async def _flood():
+        return await asyncio.gather(
+            *(pool.run(time.sleep, 0.05) for _ in range(3)),
+            return_exceptions=True
+        )
+
+    results = asyncio.run(_flood())
+    rejected = [r for r in results if isinstance(r, HTTPException)]
+    assert len(rejected) == 1, "Calls beyond workers + max_queue should be rejected"
+    assert rejected[0].status_code == 503, "Rejected calls should return 503"
+    assert "Retry-After" in rejected[0].headers, "Rejected calls should include Retry-After"
+
+    snapshot = pool.snapshot()
+    assert snapshot["completed"] == 2, "Accepted calls should complete"
+    assert snapshot["rejected"] == 1, "Rejection should be counted"
+    assert snapshot["max_wait"] >= 0.04, "Queued call should have waited for the busy worker"
+
+################################################################################
+def test_get_password_hash_status(client):
+    """Test retrieving the password hashing pool status."""
+
+    res = client.get("/system/password-hash")
+    assert res.status_code == 200, f"Failed to get password hash status: {res.json()}"
+    status = res.json()
+    for key in ("workers", "running", "queued", "completed", "rejected"):
+        assert key in status, f"Password hash status should contain '{key}'"
+
+################################################################################
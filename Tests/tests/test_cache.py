@@ -0,0 +1,102 @@
+import time
+
+import pytest
+
+from ..payloads import *
+
+from App import dependencies
+from App.cache import GuildExistenceCache, apply_guild_cache_invalidations, guild_cache
+################################################################################
+@pytest.mark.unit
+def test_guild_cache_hit_and_miss():
+    """Test that cached guilds are reported as hits and unknown ones as misses."""
+
+    cache = GuildExistenceCache(ttl=60, negative_ttl=60, max_size=10)
+    assert cache.get(1) is None, "Uncached guild should return None"
+    cache.set(1, True)
+    cache.set(2, False)
+    assert cache.get(1) is True, "Cached guild should exist"
+    assert cache.get(2) is False, "Cached unknown guild should not exist"
+
+    stats = cache.stats()
+    assert stats["hits"] == 2, "Two lookups should be hits"
+    assert stats["misses"] == 1, "One lookup should be a miss"
+
+################################################################################
+@pytest.mark.unit
+def test_guild_cache_expiry_and_eviction():
+    """Test that entries expire after their TTL and the oldest are evicted first."""
+
+    cache = GuildExistenceCache(ttl=60, negative_ttl=0.01, max_size=2)
+    cache.set(1, False)
+    time.sleep(0.02)
+    assert cache.get(1) is None, "Expired entry should be treated as a miss"
+
+    cache.set(1, True)
+    cache.set(2, True)
+    cache.get(1)
+    cache.set(3, True)
+    assert cache.get(2) is None, "Least recently used entry should be evicted"
+    assert cache.get(1) is True, "Recently used entry should be kept"
+
+    cache.invalidate(1)
+    assert cache.get(1) is None, "Invalidated entry should be a miss"
+
+################################################################################
+def test_guild_scoped_requests_use_cache(client):
+    """Test that repeated guild-scoped requests skip the guild lookup."""
+
+    client.get(f"/guilds/{TEST_GUILD_ID}/embeds/")
+    misses = guild_cache.misses
+    hits = guild_cache.hits
+
+    res = client.get(f"/guilds/{TEST_GUILD_ID}/embeds/")
+    assert res.status_code == 200, f"Failed to get embeds: {res.json()}"
+    assert guild_cache.hits == hits + 1, "Second request should be a cache hit"
+    assert guild_cache.misses == misses, "Second request should not query the guild"
+
+    res = client.get("/system/guild-cache")
+    assert res.status_code == 200, f"Failed to get guild cache status: {res.json()}"
+    assert res.json()["hits"] >= 1, "Cache status should report hits"
+
+################################################################################
+def test_create_guild_invalidates_cache(client, async_db_session):
+    """Test that creating a guild clears a cached 'not found' for it once committed."""
+
+    res = client.get(f"/guilds/{TEST_GUILD_ID2}/embeds/")
+    assert res.status_code == 404, "Should return 404 for a non-existent guild"
+
+    res = client.post("/guilds/", json={"guild_id": TEST_GUILD_ID2})
+    assert res.status_code == 201, f"Guild creation failed: {res.json()}"
+    assert guild_cache.get(TEST_GUILD_ID2) is False, "Cache should not be touched before the commit"
+
+    # The test session never commits; run what the commit would.
+    apply_guild_cache_invalidations(async_db_session.sync_session)
+    res = client.get(f"/guilds/{TEST_GUILD_ID2}/embeds/")
+    assert res.status_code == 200, "New guild should be reachable immediately"
+
+################################################################################
+def test_guild_cache_invalidation_discarded_on_rollback(client, async_db_session):
+    """Test that a rolled back guild creation leaves the cache alone."""
+
+    client.get(f"/guilds/{TEST_GUILD_ID2}/embeds/")
+    client.post("/guilds/", json={"guild_id": TEST_GUILD_ID2})
+    client.portal.call(async_db_session.rollback)
+
+    apply_guild_cache_invalidations(async_db_session.sync_session)
+    assert guild_cache.get(TEST_GUILD_ID2) is False, "Rolled back creation should not invalidate the cache"
+
+################################################################################
+def test_guild_cache_skips_replica_misses(client, monkeypatch):
+    """Test that a guild missing on the replica isn't cached as unknown."""
+
+    monkeypatch.setattr(dependencies, "is_replica_session", lambda db: True)
+    res = client.get(f"/guilds/{TEST_GUILD_ID2}/embeds/")
+    assert res.status_code == 404, "Should return 404 for a non-existent guild"
+    assert guild_cache.get(TEST_GUILD_ID2) is None, "A replica miss should not be cached"
+
+    res = client.get(f"/guilds/{TEST_GUILD_ID}/embeds/")
+    assert res.status_code == 200, f"Failed to get embeds: {res.json()}"
+    assert guild_cache.get(TEST_GUILD_ID) is True, "A guild found on the replica should still be cached"
+
+################################################################################
@@ -0,0 +1,196 @@
+import pytest
+from sqlalchemy import event, select
+
+from ..payloads import *
+
+from App import Models
+from App.audit import PENDING_KEY
+from App.config import settings
+from App.revisions import apply_guild_revision_bumps
+################################################################################
+
+@pytest.fixture
+def sync(client, db_session, monkeypatch):
+    """
+    Write audit entries straight into the test session and return a function
+    that stands in for a commit: it bumps the revision and returns the new one.
+    """
+
+    monkeypatch.setattr(settings, "AUDIT_LOG_BUFFERED", False)
+
+    def _sync():
+        db_session(apply_guild_revision_bumps)
+        return current_revision(client)
+
+    yield _sync
+
+################################################################################
+def current_revision(client):
+
+    return client.get(f"/guilds/{TEST_GUILD_ID}/revision").json()["revision"]
+
+################################################################################
+def get_changes(client, since):
+
+    res = client.get(f"/guilds/{TEST_GUILD_ID}/changes/", params={"since": since})
+    assert res.status_code == 200, f"Failed to get changes: {res.json()}"
+    return res.json()
+
+################################################################################
+def add_audit_entry(db_session, **kwargs):
+
+    def _add(s):
+        s.add(Models.AuditLogModel(guild_id=TEST_GUILD_ID, target_id=1, user_id=TEST_USER_ID, changes={}, **kwargs))
+        s.flush()
+
+    db_session(_add)
+
+################################################################################
+def test_changes_return_current_state(client, sync):
+    """Test that changed entities come back in their current, fully loaded state."""
+
+    since = current_revision(client)
+    form = client.post(f"/guilds/{TEST_GUILD_ID}/forms/").json()
+    assert client.post(f"/guilds/{TEST_GUILD_ID}/forms/{form['id']}/questions").status_code == 201, "Failed to add question"
+    revision = sync()
+
+    changes = get_changes(client, since)
+    assert changes["since"] == since, "Response should echo the requested revision"
+    assert changes["revision"] == revision, "Cursor should advance to the latest revision"
+    expected = client.get(f"/guilds/{TEST_GUILD_ID}/forms/{form['id']}").json()
+    assert changes["changed"] == {"forms": [expected]}, "The form should be returned once, with its new question"
+    assert changes["deleted"] == {}, "Nothing should be reported deleted"
+
+################################################################################
+def test_changes_coalesce_edits(client, sync):
+    """Test that several edits to one entity and its children collapse into one."""
+
+    since = current_revision(client)
+    embed = client.post(f"/guilds/{TEST_GUILD_ID}/embeds/").json()
+    client.patch(f"/guilds/{TEST_GUILD_ID}/embeds/{embed['id']}", json={"title": "First"})
+    client.patch(f"/guilds/{TEST_GUILD_ID}/embeds/{embed['id']}", json={"title": "Second"})
+    client.patch(f"/guilds/{TEST_GUILD_ID}/embeds/{embed['id']}/header", json={"text": "Header"})
+    sync()
+
+    embeds = get_changes(client, since)["changed"]["embeds"]
+    assert [e["id"] for e in embeds] == [embed["id"]], "The embed should be listed exactly once"
+    assert embeds[0]["title"] == "Second", "The embed should be in its latest state"
+    assert embeds[0]["header"]["text"] == "Header", "Child edits should be folded into the embed"
+
+################################################################################
+def test_changes_only_after_since(client, sync):
+    """Test that changes at or before the given revision are left out."""
+
+    client.post(f"/guilds/{TEST_GUILD_ID}/glyph-messages/")
+    since = sync()
+    message = client.post(f"/guilds/{TEST_GUILD_ID}/glyph-messages/").json()
+    sync()
+
+    changes = get_changes(client, since)
+    assert [m["id"] for m in changes["changed"]["glyph_messages"]] == [message["id"]], "Only the later message should be returned"
+
+    latest = get_changes(client, changes["revision"])
+    assert latest["changed"] == {} and latest["deleted"] == {}, "Nothing should have changed since the latest revision"
+    assert latest["revision"] == changes["revision"], "Cursor should stay put when nothing changed"
+
+################################################################################
+def test_changes_report_deletes(client, sync):
+    """Test that deleted entities are reported by ID."""
+
+    message = client.post(f"/guilds/{TEST_GUILD_ID}/glyph-messages/").json()
+    since = sync()
+    assert client.delete(f"/guilds/{TEST_GUILD_ID}/glyph-messages/{message['id']}").status_code == 204, "Failed to delete"
+    sync()
+
+    changes = get_changes(client, since)
+    assert changes["deleted"] == {"glyph_messages": [message["id"]]}, "The message should be reported deleted"
+    assert changes["changed"] == {}, "A deleted entity should not be reported as changed"
+
+################################################################################
+def test_changes_resolve_deleted_children(client, sync):
+    """Test that deleting a child reports its parent as changed, via the delete's tombstone."""
+
+    giveaway = client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/").json()
+    entry = client.post(
+        f"/guilds/{TEST_GUILD_ID}/giveaways/{giveaway['id']}/entries", json={"user_id": TEST_USER_ID2}
+    ).json()
+    since = sync()
+    res = client.delete(f"/guilds/{TEST_GUILD_ID}/giveaways/{giveaway['id']}/entries/{entry['id']}")
+    assert res.status_code == 204, "Failed to delete entry"
+    sync()
+
+    giveaways = get_changes(client, since)["changed"]["giveaways"]
+    assert [g["id"] for g in giveaways] == [giveaway["id"]], "The entry's giveaway should be reported changed"
+    assert giveaways[0]["entries"] == [], "The giveaway should no longer have the entry"
+
+################################################################################
+def test_delete_entries_record_tombstone(client, db_session, sync):
+    """Test that delete entries keep the deleted row's values and the commit's revision."""
+
+    embed = client.post(f"/guilds/{TEST_GUILD_ID}/embeds/").json()
+    field = client.post(f"/guilds/{TEST_GUILD_ID}/embeds/{embed['id']}/fields").json()
+    client.delete(f"/guilds/{TEST_GUILD_ID}/embeds/{embed['id']}/fields/{field['id']}")
+    revision = sync()
+
+    entry = db_session(lambda s: s.scalars(
+        select(Models.AuditLogModel).filter_by(target="EmbedField", action="Delete")
+    ).one())
+    assert entry.target_id == field["id"], "Delete should be recorded against the deleted field"
+    assert entry.changes["embed_id"] == {"old": embed["id"], "new": None}, "Tombstone should name the parent embed"
+    assert entry.revision == revision, "Entry should be stamped with the revision it committed as"
+
+################################################################################
+def test_changes_resync_legacy_child_delete(client, db_session):
+    """Test that a child delete without a tombstone asks for its section to be reloaded."""
+
+    since = current_revision(client)
+    add_audit_entry(db_session, target="RaffleEntry", action="Delete", revision=since + 1)
+
+    changes = get_changes(client, since)
+    assert changes["resync"] == ["raffles"], "Raffles should be flagged for a full reload"
+
+################################################################################
+def test_changes_since_too_old(client, db_session):
+    """Test that a revision older than the retained audit log is refused."""
+
+    since = current_revision(client)
+    add_audit_entry(db_session, target="Embed", action="Update", revision=since + 10)
+
+    res = client.get(f"/guilds/{TEST_GUILD_ID}/changes/", params={"since": since})
+    assert res.status_code == 410, "Should return 410 when earlier changes are no longer in the audit log"
+
+################################################################################
+def test_entries_inserted_with_their_revision(client, db_session, sync):
+    """Test that a commit inserts each audit row once, already carrying its revision."""
+
+    client.post(f"/guilds/{TEST_GUILD_ID}/glyph-messages/")
+    statements = []
+
+    def _record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db_session(lambda s: s.get_bind())
+    event.listen(engine, "before_cursor_execute", _record)
+    try:
+        revision = sync()
+    finally:
+        event.remove(engine, "before_cursor_execute", _record)
+
+    assert not [s for s in statements if s.startswith("UPDATE audit_log")], "Audit rows should not be updated after insert"
+    entry = db_session(lambda s: s.scalars(select(Models.AuditLogModel).filter_by(target="GlyphMessage")).one())
+    assert entry.revision == revision, "The row should be inserted with the committed revision"
+
+################################################################################
+def test_buffered_entries_carry_their_revision(client, db_session, sync, monkeypatch):
+    """Test that entries left to the buffered writer are stamped with their revision at commit."""
+
+    monkeypatch.setattr(settings, "AUDIT_LOG_BUFFERED", True)
+    since = current_revision(client)
+    client.post(f"/guilds/{TEST_GUILD_ID}/glyph-messages/")
+    revision = sync()
+
+    pending = db_session(lambda s: s.info.get(PENDING_KEY))
+    assert [e["revision"] for e in pending] == [revision], "The entry should be left for the writer, stamped"
+    assert get_changes(client, since)["changed"] == {}, "The entry should not be written by the commit itself"
+
+################################################################################
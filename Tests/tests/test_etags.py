@@ -0,0 +1,78 @@
+import pytest
+
+from ..payloads import *
+
+from App.revisions import apply_guild_revision_bumps
+################################################################################
+
+DEEP_GET_PATHS = (
+    f"/guilds/{TEST_GUILD_ID}",
+    f"/guilds/{TEST_GUILD_ID}/embeds/",
+    f"/guilds/{TEST_GUILD_ID}/forms/",
+    f"/guilds/{TEST_GUILD_ID}/profiles/",
+    f"/guilds/{TEST_GUILD_ID}/giveaways/",
+)
+
+################################################################################
+@pytest.mark.parametrize("path", DEEP_GET_PATHS)
+def test_deep_get_returns_etag(client, path):
+    """Test that deep GET endpoints return a weak ETag."""
+
+    res = client.get(path)
+    assert res.status_code == 200, f"Failed to get {path}: {res.json()}"
+    etag = res.headers.get("ETag")
+    assert etag is not None, "Response should carry an ETag"
+    assert etag.startswith('W/"'), "ETag should be weak"
+
+################################################################################
+@pytest.mark.parametrize("path", DEEP_GET_PATHS)
+def test_deep_get_not_modified(client, path):
+    """Test that a matching If-None-Match returns 304 without a body."""
+
+    etag = client.get(path).headers["ETag"]
+
+    res = client.get(path, headers={"If-None-Match": etag})
+    assert res.status_code == 304, "Should return 304 when the ETag still matches"
+    assert res.content == b"", "304 responses should have no body"
+    assert res.headers.get("ETag") == etag, "304 responses should repeat the ETag"
+
+################################################################################
+def test_write_changes_etag(client, db_session):
+    """Test that a committed write invalidates the guild's ETag."""
+
+    path = f"/guilds/{TEST_GUILD_ID}/embeds/"
+    etag = client.get(path).headers["ETag"]
+
+    res = client.post(path)
+    assert res.status_code == 201, f"Failed to create embed: {res.json()}"
+    # The test session is never committed, so apply the commit-time bump directly.
+    db_session(apply_guild_revision_bumps)
+
+    res = client.get(path, headers={"If-None-Match": etag})
+    assert res.status_code == 200, "Should return 200 once the guild has changed"
+    assert res.headers["ETag"] != etag, "ETag should change after a write"
+    assert len(res.json()) >= 1, "Response should include the new embed"
+
+################################################################################
+def test_noop_write_keeps_etag(client, db_session):
+    """Test that a write that changes nothing leaves the revision and ETag alone."""
+
+    giveaway = client.post(f"/guilds/{TEST_GUILD_ID}/giveaways").json()
+    entries = f"/guilds/{TEST_GUILD_ID}/giveaways/{giveaway['id']}/entries"
+    assert client.post(entries, json={"user_id": TEST_USER_ID}).status_code == 201, "Failed to add entry"
+    db_session(apply_guild_revision_bumps)
+
+    path = f"/guilds/{TEST_GUILD_ID}/giveaways/"
+    etag = client.get(path).headers["ETag"]
+    revision = client.get(f"/guilds/{TEST_GUILD_ID}/revision").json()["revision"]
+
+    assert client.post(entries, json={"user_id": TEST_USER_ID}).status_code == 200, "Re-entering should be a no-op"
+    res = client.post(f"{entries}/bulk", json={"user_ids": [TEST_USER_ID]})
+    assert res.json() == {"inserted": 0, "duplicates": 1}, "An all-duplicate bulk insert should be a no-op"
+    db_session(apply_guild_revision_bumps)
+
+    assert client.get(f"/guilds/{TEST_GUILD_ID}/revision").json()["revision"] == revision, "Revision should not change"
+    res = client.get(path, headers={"If-None-Match": etag})
+    assert res.status_code == 304, "The old ETag should still match"
+
+################################################################################
@@ -0,0 +1,191 @@
+import asyncio
+import json
+
+import pytest
+from sqlalchemy import delete, select
+
+from ..conftest import TestingSessionLocal
+from ..payloads import *
+
+from App import Models
+from App.audit import queue_audit_entry
+from App.config import settings
+from App.events import ChangeFeed, change_feed, collect_change_events
+from App.revisions import apply_guild_revision_bumps
+from App.Routers.Events import stream_guild_events
+################################################################################
+def collect_change_events_on_commit(s):
+    """Run the before_commit hooks in order and return the notifications they build."""
+
+    apply_guild_revision_bumps(s)
+    return collect_change_events(s)
+
+################################################################################
+def commit_events(db_session):
+    """Stand in for a commit and return the notifications it would publish."""
+
+    return db_session(collect_change_events_on_commit)
+
+################################################################################
+def test_commit_collects_one_notification_per_guild(client, db_session):
+    """Test that a transaction's audit entries become a single notification for the guild."""
+
+    form = client.post(f"/guilds/{TEST_GUILD_ID}/forms/").json()
+    client.post(f"/guilds/{TEST_GUILD_ID}/forms/{form['id']}/questions")
+
+    notifications = commit_events(db_session)
+    revision = client.get(f"/guilds/{TEST_GUILD_ID}/revision").json()["revision"]
+
+    assert len(notifications) == 1, "All writes to one guild should share a notification"
+    notification = notifications[0]
+    assert notification["guild_id"] == TEST_GUILD_ID, "Notification should name the guild"
+    assert notification["revision"] == revision, "Notification should carry the committed revision"
+    assert {"target": "Form", "target_id": form["id"], "action": "Create"} in notification["changes"], \
+        "Notification should list the created form"
+    assert not notification["truncated"], "A short notification should not be truncated"
+
+################################################################################
+def test_commit_collects_unbuffered_entries(client, db_session, monkeypatch):
+    """Test that entries written inside the transaction are announced as well."""
+
+    monkeypatch.setattr(settings, "AUDIT_LOG_BUFFERED", False)
+    message = client.post(f"/guilds/{TEST_GUILD_ID}/glyph-messages/").json()
+
+    notifications = commit_events(db_session)
+    assert notifications[0]["changes"] == [{"target": "GlyphMessage", "target_id": message["id"], "action": "Create"}], \
+        "Unbuffered entries should be listed"
+
+################################################################################
+def test_buffered_entries_not_announced_on_commit(client, db_session, monkeypatch):
+    """Test that entries left to the buffered writer aren't announced before they're written."""
+
+    monkeypatch.setattr(settings, "AUDIT_LOG_BUFFERED", True)
+    client.post(f"/guilds/{TEST_GUILD_ID}/embeds/")
+
+    assert commit_events(db_session) == [], "Nothing the commit doesn't write should be announced"
+
+################################################################################
+def test_long_notifications_are_truncated(client, db_session, monkeypatch):
+    """Test that a notification lists at most CHANGE_FEED_MAX_CHANGES entries."""
+
+    monkeypatch.setattr(settings, "CHANGE_FEED_MAX_CHANGES", 1)
+    client.post(f"/guilds/{TEST_GUILD_ID}/embeds/")
+    client.post(f"/guilds/{TEST_GUILD_ID}/embeds/")
+
+    notification = commit_events(db_session)[0]
+    assert len(notification["changes"]) == 1, "Changes should be capped"
+    assert notification["truncated"], "A capped notification should say so"
+
+################################################################################
+def test_commit_without_audit_entries_is_silent(client, db_session):
+    """Test that a transaction that recorded nothing publishes nothing."""
+
+    assert commit_events(db_session) == [], "No notification should be built without audit entries"
+
+################################################################################
+@pytest.mark.integration
+def test_notifications_published_only_on_commit(setup_db):
+    """Test that subscribers hear about committed transactions and not rolled back ones."""
+
+    guild_id = 434343
+
+    def _entry(target_id):
+        return {
+            "guild_id": guild_id,
+            "target": "Embed",
+            "target_id": target_id,
+            "action": "Create",
+            "user_id": TEST_USER_ID,
+            "changes": {},
+        }
+
+    async def _transactions():
+        subscription = change_feed.subscribe(guild_id)
+        try:
+            async with TestingSessionLocal() as db:
+                await db.scalar(select(Models.GuildIDModel).filter_by(guild_id=guild_id))
+                queue_audit_entry(db.sync_session, _entry(1))
+                await db.rollback()
+                queue_audit_entry(db.sync_session, _entry(2))
+                await db.commit()
+
+                await db.execute(delete(Models.AuditLogModel).filter_by(guild_id=guild_id))
+                await db.commit()
+            return await subscription.get(0.1), await subscription.get(0.01)
+        finally:
+            subscription.close()
+
+    committed, rolled_back = asyncio.run(_transactions())
+    assert committed["changes"] == [{"target": "Embed", "target_id": 2, "action": "Create"}], \
+        "The committed entry should be announced"
+    assert rolled_back is None, "The rolled back entry should not be announced"
+
+################################################################################
+def test_feed_fans_out_per_guild():
+    """Test that notifications reach every subscriber of their guild and no one else."""
+
+    async def _run():
+        feed = ChangeFeed(queue_size=10)
+        first, second, other = feed.subscribe(1), feed.subscribe(1), feed.subscribe(2)
+        feed.publish({"type": "change", "guild_id": 1, "revision": 5})
+        return await first.get(0.1), await second.get(0.1), await other.get(0.01), feed.stats()
+
+    first, second, other, stats = asyncio.run(_run())
+    assert first == second == {"type": "change", "guild_id": 1, "revision": 5}, "Both subscribers should get the notification"
+    assert other is None, "Subscribers of another guild should get nothing"
+    assert stats["delivered"] == 2 and stats["subscribers"] == 3, "Stats should count deliveries and subscribers"
+
+################################################################################
+def test_feed_overflow_becomes_resync():
+    """Test that a subscriber that falls behind gets a single resync instead of its backlog."""
+
+    async def _run():
+        feed = ChangeFeed(queue_size=2)
+        subscription = feed.subscribe(1)
+        for revision in range(3):
+            feed.publish({"type": "change", "guild_id": 1, "revision": revision})
+        return [await subscription.get(0.01) for _ in range(2)], feed.overflows
+
+    received, overflows = asyncio.run(_run())
+    assert received == [{"type": "resync", "guild_id": 1}, None], "The backlog should be replaced by one resync"
+    assert overflows == 1, "The overflow should be counted"
+
+################################################################################
+def test_stream_sends_events_and_unsubscribes():
+    """Test the SSE stream: the opening event, keepalives, notifications and cleanup."""
+
+    async def _run():
+        feed = ChangeFeed(queue_size=10)
+        subscription = feed.subscribe(1)
+        stream = stream_guild_events(subscription, {"type": "ready", "guild_id": 1, "revision": 4}, keepalive=0.01)
+
+        chunks = [await anext(stream), await anext(stream)]
+        feed.publish({"type": "change", "guild_id": 1, "revision": 5})
+        chunks.append(await anext(stream))
+        await stream.aclose()
+        return chunks, feed.subscriber_count
+
+    (ready, keepalive, change), subscribers = asyncio.run(_run())
+    assert ready.startswith("event: ready\nid: 4\n"), "Stream should open with the current revision"
+    assert keepalive == ": keepalive\n\n", "Idle streams should send keepalive comments"
+    event, event_id, data = change.strip().split("\n")
+    assert (event, event_id) == ("event: change", "id: 5"), "Notifications should be named and carry their revision"
+    assert json.loads(data.removeprefix("data: "))["revision"] == 5, "Data should be the notification as JSON"
+    assert subscribers == 0, "Closing the stream should unsubscribe"
+
+################################################################################
+def test_events_unknown_guild(client):
+    """Test subscribing to a guild that does not exist."""
+
+    res = client.get(f"/guilds/{TEST_GUILD_ID2}/events/")
+    assert res.status_code == 404, "Should return 404 for non-existent guild ID"
+
+################################################################################
+def test_change_feed_status(client):
+    """Test that the change feed status reports its counters."""
+
+    res = client.get("/system/change-feed")
+    assert res.status_code == 200, f"Failed to get change feed status: {res.text}"
+    assert res.json()["bridge_enabled"] is False, "The bridge should be off without Postgres"
+
+################################################################################
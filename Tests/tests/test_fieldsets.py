@@ -0,0 +1,132 @@
+from contextlib import contextmanager
+
+import pytest
+from sqlalchemy import event
+
+from ..conftest import async_engine
+from ..payloads import *
+################################################################################
+### Fixtures ###
+################################################################################
+@pytest.fixture(scope="function")
+def form(client):
+    """A form with one question that has an option and a response."""
+
+    form = client.post(f"/guilds/{TEST_GUILD_ID}/forms/").json()
+    question = client.post(f"/guilds/{TEST_GUILD_ID}/forms/{form['id']}/questions").json()
+    client.post(f"/guilds/{TEST_GUILD_ID}/forms/{form['id']}/questions/{question['id']}/options")
+    client.post(
+        f"/guilds/{TEST_GUILD_ID}/forms/{form['id']}/questions/{question['id']}/responses",
+        json={"user_id": TEST_USER_ID, "values": ["Yes"]}
+    )
+    yield client.get(f"/guilds/{TEST_GUILD_ID}/forms/{form['id']}").json()
+
+################################################################################
+@pytest.fixture(scope="function")
+def giveaway(client):
+
+    giveaway = client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/").json()
+    for user_id in (TEST_USER_ID, TEST_USER_ID2):
+        client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/{giveaway['id']}/entries", json={"user_id": user_id})
+    yield client.get(f"/guilds/{TEST_GUILD_ID}/giveaways/{giveaway['id']}").json()
+
+################################################################################
+@contextmanager
+def statements():
+    """Collect the SQL sent to the test database inside the block."""
+
+    sql = []
+    listener = lambda conn, cursor, statement, *args: sql.append(statement)
+    event.listen(async_engine.sync_engine, "before_cursor_execute", listener)
+    try:
+        yield sql
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", listener)
+
+################################################################################
+### Tests ###
+################################################################################
+def test_fields_trim_response_and_queries(client, form):
+    """Test that only the named fields are returned, and children aren't queried."""
+
+    with statements() as sql:
+        res = client.get(f"/guilds/{TEST_GUILD_ID}/forms/", params={"fields": "name"})
+    assert res.status_code == 200, f"Sparse request failed: {res.text}"
+    assert res.json() == [{"id": form["id"], "name": form["name"]}], "Only id and name should be returned"
+    assert not any("form_questions" in s for s in sql), "Questions should not be queried"
+
+################################################################################
+def test_nested_fields(client, form):
+    """Test that dotted fields trim nested objects."""
+
+    res = client.get(
+        f"/guilds/{TEST_GUILD_ID}/forms/{form['id']}",
+        params={"fields": "questions.primary_text,pre_prompt.title"}
+    )
+    assert res.status_code == 200, f"Sparse request failed: {res.text}"
+    assert res.json() == {
+        "id": form["id"],
+        "questions": [{"id": q["id"], "primary_text": q["primary_text"]} for q in form["questions"]],
+        "pre_prompt": {"id": form["pre_prompt"]["id"], "title": form["pre_prompt"]["title"]},
+    }, "Nested objects should only have the named fields"
+
+################################################################################
+def test_expand_exclusion(client, form):
+    """Test that -relation leaves out one child and keeps the rest of the deep schema."""
+
+    with statements() as sql:
+        res = client.get(f"/guilds/{TEST_GUILD_ID}/forms/{form['id']}", params={"expand": "-questions.responses"})
+    assert res.status_code == 200, f"Sparse request failed: {res.text}"
+    assert not any("form_question_responses" in s for s in sql), "Responses should not be queried"
+
+    expected = dict(form, questions=[{k: v for k, v in q.items() if k != "responses"} for q in form["questions"]])
+    assert res.json() == expected, "Everything except responses should be returned unchanged"
+
+################################################################################
+def test_expand_inclusion(client, giveaway):
+    """Test that naming children in expand embeds only those."""
+
+    with statements() as sql:
+        res = client.get(f"/guilds/{TEST_GUILD_ID}/giveaways/{giveaway['id']}", params={"expand": "details"})
+    assert res.status_code == 200, f"Sparse request failed: {res.text}"
+    assert res.json() == {k: v for k, v in giveaway.items() if k != "entries"}, "Entries should be left out"
+    assert not any("giveaway_entries" in s for s in sql), "Entries should not be queried"
+
+################################################################################
+def test_fieldsets_with_pagination(client, giveaway):
+    """Test that sparse fields combine with paging on the manager."""
+
+    client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/")
+    res = client.get(f"/guilds/{TEST_GUILD_ID}/giveaways/", params={"fields": "giveaways.id", "limit": 1})
+    assert res.status_code == 200, f"Sparse request failed: {res.text}"
+    assert res.json() == {"giveaways": [{"id": giveaway["id"]}]}, "Only giveaway IDs should be returned"
+    assert res.headers["X-Next-After"] == str(giveaway["id"]), "Paging should still report the next cursor"
+
+    res = client.get(
+        f"/guilds/{TEST_GUILD_ID}/giveaways/{giveaway['id']}",
+        params={"fields": "entries.user_id", "limit": 1}
+    )
+    assert res.json()["entries"] == [{"id": giveaway["entries"][0]["id"], "user_id": TEST_USER_ID}], \
+        "Entries should be paged and trimmed"
+
+################################################################################
+def test_no_fieldset_is_unchanged(client, form):
+    """Test that requests without fields or expand return the full deep schema."""
+
+    assert client.get(f"/guilds/{TEST_GUILD_ID}/forms/").json() == [form], "Full response should be unchanged"
+
+################################################################################
+@pytest.mark.parametrize("params", [
+    {"fields": "nickname"},
+    {"fields": "name.first"},
+    {"fields": "questions.nickname"},
+    {"expand": "nickname"},
+    {"expand": "-name"},
+])
+def test_unknown_fields(client, form, params):
+    """Test that unknown fields are rejected."""
+
+    res = client.get(f"/guilds/{TEST_GUILD_ID}/forms/{form['id']}", params=params)
+    assert res.status_code == 400, f"Should return 400 for {params}"
+
+################################################################################
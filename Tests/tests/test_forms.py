@@ -363,9 +363,9 @@ def test_delete_form(client, db_session, new_form_id):
     assert res.status_code == 404, "Should return 404 for deleted form"
 
     # Verify that subtables are also deleted
-    po = db_session.query(Models.FormPostOptionsModel).filter_by(form_id=new_form_id).first()
+    po = db_session(lambda s: s.query(Models.FormPostOptionsModel).filter_by(form_id=new_form_id).first())
     assert po is None, "Post options should be deleted when the form is deleted"
-    prompts = db_session.query(Models.FormPromptModel).filter_by(form_id=new_form_id).all()
+    prompts = db_session(lambda s: s.query(Models.FormPromptModel).filter_by(form_id=new_form_id).all())
     assert len(prompts) == 0, "Prompts should be deleted when the form is deleted"
 
 ################################################################################
@@ -387,11 +387,11 @@ def test_delete_form_question(client, db_session, new_form_id, new_form_question
     assert res.status_code == 204, "Should delete the form question successfully"
 
     # Verify deletion
-    q = db_session.query(Models.FormQuestionModel).filter_by(form_id=new_form_id).first()
+    q = db_session(lambda s: s.query(Models.FormQuestionModel).filter_by(form_id=new_form_id).first())
     assert q is None, "Question should be deleted"
 
     # Verify that subtables are also deleted
-    prompts = db_session.query(Models.FormPromptModel).filter_by(question_id=new_form_question_id).all()
+    prompts = db_session(lambda s: s.query(Models.FormPromptModel).filter_by(question_id=new_form_question_id).all())
     assert len(prompts) == 0, "Prompts should be deleted when the question is deleted"
 
 ################################################################################
@@ -419,7 +419,7 @@ def test_delete_form_question_option(client, db_session, new_form_id, new_form_q
     assert res.status_code == 204, "Should delete the form question option successfully"
 
     # Verify deletion
-    option = db_session.query(Models.FormQuestionOptionModel).filter_by(id=new_form_question_option_id).first()
+    option = db_session(lambda s: s.query(Models.FormQuestionOptionModel).filter_by(id=new_form_question_option_id).first())
     assert option is None, "Question option should be deleted"
 
 ################################################################################
@@ -2,7 +2,9 @@ import pytest
 
 from ..payloads import *
 
-from App import limits, Models
+from App import limits, Models, sampling
+from App.audit import PENDING_KEY
+from App.config import settings
 ################################################################################
 ### Fixtures ###
 ################################################################################
@@ -103,6 +105,138 @@ def assert_giveaway_entry_default_data(e):
 ################################################################################
 # POST Tests
 ################################################################################
+def test_post_giveaway_entry_idempotent(client, db_session, new_giveaway_id, new_giveaway_entry_id):
+
+    res = client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/{new_giveaway_id}/entries", json=BASE_USER_ID_PAYLOAD)
+    assert res.status_code == 200, f"Re-entering should return the existing entry: {res.text}"
+    assert res.json()["id"] == new_giveaway_entry_id, "The existing entry should be returned"
+
+    entries = db_session(lambda s: s.query(Models.GiveawayEntryModel).filter_by(giveaway_id=new_giveaway_id).all())
+    assert len(entries) == 1, "No duplicate entry should be created"
+
+################################################################################
+def test_post_giveaway_entries_bulk(client, async_db_session, db_session, new_giveaway_id, new_giveaway_entry_id, monkeypatch):
+
+    monkeypatch.setattr(settings, "AUDIT_LOG_BUFFERED", True)
+    async_db_session.info.pop(PENDING_KEY, None)
+    user_ids = [TEST_USER_ID, TEST_USER_ID2, TEST_USER_ID2 + 1, TEST_USER_ID2]
+    res = client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/{new_giveaway_id}/entries/bulk", json={"user_ids": user_ids})
+    assert res.status_code == 200, f"Failed to add bulk entries: {res.text}"
+    assert res.json() == {"inserted": 2, "duplicates": 2}, "Existing and repeated users should count as duplicates"
+
+    entries = db_session(lambda s: s.query(Models.GiveawayEntryModel).filter_by(giveaway_id=new_giveaway_id).all())
+    assert sorted(e.user_id for e in entries) == [TEST_USER_ID, TEST_USER_ID2, TEST_USER_ID2 + 1], "Each user should be entered once"
+
+    giveaway = client.get(f"/guilds/{TEST_GUILD_ID}/giveaways/{new_giveaway_id}").json()
+    assert len(giveaway["entries"]) == 3, "New entries should show up on the giveaway"
+
+    pending = async_db_session.info.get(PENDING_KEY, [])
+    assert len(pending) == 1, "A bulk insert should queue a single audit entry"
+    assert pending[0]["changes"] == {"entries": {"old": None, "new": [TEST_USER_ID2, TEST_USER_ID2 + 1]}}, \
+        "Audit entry should list the users entered"
+
+################################################################################
+def test_post_giveaway_entries_bulk_all_duplicates(client, new_giveaway_id, new_giveaway_entry_id):
+
+    res = client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/{new_giveaway_id}/entries/bulk", json={"user_ids": [TEST_USER_ID]})
+    assert res.status_code == 200, f"Failed to add bulk entries: {res.text}"
+    assert res.json() == {"inserted": 0, "duplicates": 1}, "Nothing should be inserted for existing users"
+
+################################################################################
+@pytest.mark.parametrize("user_ids", [[], list(range(1, settings.GIVEAWAY_BULK_ENTRY_MAX + 2))])
+def test_post_giveaway_entries_bulk_invalid_size(client, new_giveaway_id, user_ids):
+
+    res = client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/{new_giveaway_id}/entries/bulk", json={"user_ids": user_ids})
+    assert res.status_code == 422, "Expected 422 for an empty or oversized batch"
+
+################################################################################
+def test_post_giveaway_entries_bulk_invalid_guild(client, new_giveaway_id):
+
+    res = client.post(f"/guilds/{INVALID_GUILD_ID}/giveaways/{new_giveaway_id}/entries/bulk", json={"user_ids": [TEST_USER_ID]})
+    assert res.status_code == 404, "Expected 404 for invalid guild ID"
+
+################################################################################
+def test_post_giveaway_entries_bulk_invalid_giveaway(client):
+
+    res = client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/{INVALID_ID}/entries/bulk", json={"user_ids": [TEST_USER_ID]})
+    assert res.status_code == 404, "Expected 404 for invalid giveaway ID"
+
+################################################################################
+################################################################################
+def add_entrants(client, giveaway_id, count, num_winners):
+
+    user_ids = [TEST_USER_ID2 + i for i in range(count)]
+    if user_ids:
+        res = client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/{giveaway_id}/entries/bulk", json={"user_ids": user_ids})
+        assert res.status_code == 200, f"Failed to add entrants: {res.text}"
+    res = client.patch(f"/guilds/{TEST_GUILD_ID}/giveaways/{giveaway_id}/details", json={"num_winners": num_winners})
+    assert res.status_code == 200, f"Failed to set num_winners: {res.text}"
+    return user_ids
+
+################################################################################
+def test_post_giveaway_roll(client, new_giveaway_id):
+
+    user_ids = add_entrants(client, new_giveaway_id, 10, 3)
+    res = client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/{new_giveaway_id}/roll")
+    assert res.status_code == 200, f"Failed to roll giveaway: {res.text}"
+    result = res.json()
+    assert len(set(result["winners"])) == 3, "Three distinct winners should be drawn"
+    assert set(result["winners"]) <= set(user_ids), "Winners should be entrants"
+    assert result["rolled_by"] == TEST_USER_ID, "The actor should be recorded as the roller"
+
+    giveaway = client.get(f"/guilds/{TEST_GUILD_ID}/giveaways/{new_giveaway_id}").json()
+    assert giveaway["winners"] == result["winners"], "Winners should be saved on the giveaway"
+    assert giveaway["rolled_at"] is not None, "Roll time should be saved on the giveaway"
+
+################################################################################
+def test_post_giveaway_roll_twice(client, new_giveaway_id):
+
+    add_entrants(client, new_giveaway_id, 3, 1)
+    assert client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/{new_giveaway_id}/roll").status_code == 200
+
+    res = client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/{new_giveaway_id}/roll")
+    assert res.status_code == 409, "Rolling again should be refused without reroll"
+
+    res = client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/{new_giveaway_id}/roll", params={"reroll": True})
+    assert res.status_code == 200, "Rerolling should be allowed when asked for"
+
+################################################################################
+def test_post_giveaway_roll_fewer_entries_than_winners(client, new_giveaway_id):
+
+    user_ids = add_entrants(client, new_giveaway_id, 2, 5)
+    res = client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/{new_giveaway_id}/roll")
+    assert sorted(res.json()["winners"]) == user_ids, "Every entrant should win"
+
+################################################################################
+def test_post_giveaway_roll_python_fallback(client, new_giveaway_id, monkeypatch):
+
+    monkeypatch.setattr(sampling, "RANDOM_FUNCTIONS", {})
+    user_ids = add_entrants(client, new_giveaway_id, 20, 4)
+    res = client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/{new_giveaway_id}/roll")
+    assert res.status_code == 200, f"Failed to roll giveaway: {res.text}"
+    winners = res.json()["winners"]
+    assert len(set(winners)) == 4 and set(winners) <= set(user_ids), "Fallback should draw distinct entrants"
+
+################################################################################
+def test_post_giveaway_roll_no_entries(client, new_giveaway_id):
+
+    res = client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/{new_giveaway_id}/roll")
+    assert res.status_code == 409, "Expected 409 for a giveaway without entries"
+    assert res.json()["detail"] == "Giveaway has no entries to draw from", "Error should say there are no entries"
+
+################################################################################
+def test_post_giveaway_roll_without_num_winners(client, new_giveaway_id):
+
+    add_entrants(client, new_giveaway_id, 3, 0)
+    res = client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/{new_giveaway_id}/roll")
+    assert res.status_code == 409, "Expected 409 for a giveaway without a number of winners"
+    assert "num_winners" in res.json()["detail"], "Error should name the missing setting, not the entries"
+
+################################################################################
+def test_post_giveaway_roll_invalid_guild(client, new_giveaway_id):
+
+    res = client.post(f"/guilds/{INVALID_GUILD_ID}/giveaways/{new_giveaway_id}/roll")
+    assert res.status_code == 404, "Expected 404 for invalid guild ID"
 
 ################################################################################
 # GET Tests
@@ -148,11 +282,11 @@ def test_delete_giveaway(client, db_session, new_giveaway_id, new_giveaway_entry
     res = client.delete(f"/guilds/{TEST_GUILD_ID}/giveaways/{new_giveaway_id}")
     assert res.status_code == 204, f"Failed to delete giveaway: {res.json()}"
 
-    giveaway = db_session.query(Models.GiveawayModel).filter_by(id=new_giveaway_id).first()
+    giveaway = db_session(lambda s: s.query(Models.GiveawayModel).filter_by(id=new_giveaway_id).first())
     assert giveaway is None, "Giveaway should be deleted from the database"
-    details = db_session.query(Models.GiveawayDetailsModel).filter_by(giveaway_id=new_giveaway_id).first()
+    details = db_session(lambda s: s.query(Models.GiveawayDetailsModel).filter_by(giveaway_id=new_giveaway_id).first())
     assert details is None, "Giveaway details should also be deleted from the database"
-    entries = db_session.query(Models.GiveawayEntryModel).filter_by(giveaway_id=new_giveaway_id).all()
+    entries = db_session(lambda s: s.query(Models.GiveawayEntryModel).filter_by(giveaway_id=new_giveaway_id).all())
     assert len(entries) == 0, "All giveaway entries should be deleted from the database"
 
 ################################################################################
@@ -173,9 +307,30 @@ def test_delete_giveaway_entry(client, db_session, new_giveaway_id, new_giveaway
     res = client.delete(f"/guilds/{TEST_GUILD_ID}/giveaways/{new_giveaway_id}/entries/{new_giveaway_entry_id}")
     assert res.status_code == 204, f"Failed to delete giveaway entry: {res.json()}"
 
-    entry = db_session.query(Models.GiveawayEntryModel).filter_by(id=new_giveaway_entry_id).first()
+    entry = db_session(lambda s: s.query(Models.GiveawayEntryModel).filter_by(id=new_giveaway_entry_id).first())
     assert entry is None, "Giveaway entry should be deleted from the database"
 
+################################################################################
+def test_delete_giveaway_entry_by_user(client, db_session, new_giveaway_id, new_giveaway_entry_id):
+
+    res = client.delete(f"/guilds/{TEST_GUILD_ID}/giveaways/{new_giveaway_id}/entries/by-user/{TEST_USER_ID}")
+    assert res.status_code == 204, f"Failed to delete giveaway entry by user: {res.text}"
+
+    entry = db_session(lambda s: s.query(Models.GiveawayEntryModel).filter_by(id=new_giveaway_entry_id).first())
+    assert entry is None, "Giveaway entry should be deleted from the database"
+
+    giveaway = client.get(f"/guilds/{TEST_GUILD_ID}/giveaways/{new_giveaway_id}").json()
+    assert giveaway["entries"] == [], "Deleted entry should no longer be listed"
+
+    res = client.delete(f"/guilds/{TEST_GUILD_ID}/giveaways/{new_giveaway_id}/entries/by-user/{TEST_USER_ID}")
+    assert res.status_code == 404, "Expected 404 once the user has no entry"
+
+################################################################################
+def test_delete_giveaway_entry_by_user_invalid_guild(client, new_giveaway_id, new_giveaway_entry_id):
+
+    res = client.delete(f"/guilds/{INVALID_GUILD_ID}/giveaways/{new_giveaway_id}/entries/by-user/{TEST_USER_ID}")
+    assert res.status_code == 404, "Expected 404 for invalid guild ID"
+
 ################################################################################
 def test_delete_giveaway_entry_invalid_guild(client, new_giveaway_id, new_giveaway_entry_id):
 
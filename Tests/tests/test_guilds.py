@@ -1,6 +1,8 @@
 import pytest
 
 from ..payloads import *
+
+from App.revisions import apply_guild_revision_bumps
 ################################################################################
 def assert_guild_default_values(guild, expected_id):
 
@@ -112,3 +114,40 @@ def test_patch_guild_configuration_invalid_payload(client):
     assert res.status_code == 422, "Should return 422 for invalid payload"
 
 ################################################################################
+def test_get_guild_revision(client):
+    """Test retrieving a guild's revision."""
+
+    res = client.get(f"/guilds/{TEST_GUILD_ID}/revision")
+    assert res.status_code == 200, f"Failed to get guild revision: {res.json()}"
+    data = res.json()
+    assert data["guild_id"] == TEST_GUILD_ID, "Revision should be for the requested guild"
+    assert isinstance(data["revision"], int), "Revision should be an integer"
+    assert res.headers["ETag"] == f'W/"{TEST_GUILD_ID}-{data["revision"]}"', "ETag should match the revision"
+
+################################################################################
+def test_get_guild_revision_not_found(client):
+    """Test retrieving the revision of a guild that does not exist."""
+
+    res = client.get(f"/guilds/{TEST_GUILD_ID2}/revision")
+    assert res.status_code == 404, "Should return 404 for non-existent guild ID"
+
+################################################################################
+@pytest.mark.parametrize("method, path, payload", [
+    ("post", f"/guilds/{TEST_GUILD_ID}/embeds/", None),
+    ("post", f"/guilds/{TEST_GUILD_ID}/forms/", None),
+    ("patch", f"/guilds/{TEST_GUILD_ID}/configuration", {"editor_id": TEST_USER_ID, "timezone": 3}),
+])
+def test_write_bumps_guild_revision_once(client, db_session, method, path, payload):
+    """Test that a write bumps the revision exactly once in its transaction."""
+
+    before = client.get(f"/guilds/{TEST_GUILD_ID}/revision").json()["revision"]
+
+    res = getattr(client, method)(path, json=payload)
+    assert res.status_code in (200, 201), f"Write to {path} failed: {res.json()}"
+    # The test session is never committed, so apply the commit-time bump directly.
+    db_session(apply_guild_revision_bumps)
+
+    after = client.get(f"/guilds/{TEST_GUILD_ID}/revision").json()["revision"]
+    assert after == before + 1, "Revision should increase by exactly one per write"
+
+################################################################################
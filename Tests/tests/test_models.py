@@ -0,0 +1,36 @@
+import pytest
+from sqlalchemy import inspect
+
+from ..conftest import engine
+################################################################################
+@pytest.mark.integration
+@pytest.mark.parametrize("table, column", [
+    ("embeds", "guild_id"),
+    ("forms", "guild_id"),
+    ("profiles", "guild_id"),
+    ("giveaways", "guild_id"),
+    ("raffles", "guild_id"),
+    ("audit_log", "guild_id"),
+    ("embed_fields", "embed_id"),
+    ("form_questions", "form_id"),
+    ("form_question_responses", "question_id"),
+    ("giveaway_entries", "giveaway_id"),
+    ("raffle_entries", "raffle_id"),
+])
+def test_lookup_columns_are_indexed(setup_db, table, column):
+    """Test that guild and parent foreign key lookups are backed by an index."""
+
+    indexes = inspect(engine).get_indexes(table)
+    assert any(ix["column_names"][:1] == [column] for ix in indexes), \
+        f"'{table}.{column}' should lead an index"
+
+################################################################################
+@pytest.mark.integration
+def test_giveaway_entries_unique_per_user(setup_db):
+    """Test that a user can only be entered into a giveaway once."""
+
+    indexes = inspect(engine).get_indexes("giveaway_entries")
+    assert any(ix["unique"] and ix["column_names"] == ["giveaway_id", "user_id"] for ix in indexes), \
+        "(giveaway_id, user_id) should be unique"
+
+################################################################################
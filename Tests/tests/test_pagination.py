@@ -0,0 +1,133 @@
+import pytest
+
+from ..payloads import *
+from .test_fieldsets import statements
+
+from App.config import settings
+################################################################################
+def read_pages(client, path, limit, key=None):
+    """Follow X-Next-After from the first page to the last and return every page's IDs."""
+
+    pages, params = [], {"limit": limit}
+    while True:
+        res = client.get(path, params=params)
+        assert res.status_code == 200, f"Failed to get page of {path}: {res.text}"
+        items = res.json() if key is None else res.json()[key]
+        pages.append([item["id"] for item in items])
+        if "X-Next-After" not in res.headers:
+            return pages
+        params = {"limit": limit, "after": res.headers["X-Next-After"]}
+
+################################################################################
+@pytest.mark.parametrize("path, key", [
+    ("forms/", None),
+    ("embeds/", None),
+    ("glyph-messages/", None),
+    ("positions/", None),
+    ("giveaways/", "giveaways"),
+    ("raffles/", "raffles"),
+    ("reaction-roles/", "messages"),
+])
+def test_collections_page_by_id(client, path, key):
+    """Test that top-level collections can be walked in pages, in ID order."""
+
+    for _ in range(3):
+        assert client.post(f"/guilds/{TEST_GUILD_ID}/{path}").status_code == 201, f"Failed to create under {path}"
+
+    url = f"/guilds/{TEST_GUILD_ID}/{path}"
+    everything = client.get(url).json()
+    ids = sorted(item["id"] for item in (everything if key is None else everything[key]))
+
+    pages = read_pages(client, url, limit=2, key=key)
+    assert all(len(page) <= 2 for page in pages), "No page should exceed the limit"
+    assert [i for page in pages for i in page] == ids, "Pages should cover every item once, in ID order"
+
+################################################################################
+def test_profile_manager_pages_profiles(client):
+    """Test that the profile manager pages its profiles and keeps its other data."""
+
+    for user_id in (TEST_USER_ID, TEST_USER_ID2, TEST_USER_ID2 + 1):
+        assert client.post(f"/guilds/{TEST_GUILD_ID}/profiles", json={"user_id": user_id}).status_code == 201
+
+    res = client.get(f"/guilds/{TEST_GUILD_ID}/profiles/", params={"limit": 1})
+    manager = res.json()
+    assert len(manager["profiles"]) == 1, "Only one profile should be returned"
+    assert res.headers["X-Next-After"] == str(manager["profiles"][0]["id"]), "Cursor should be the last profile's ID"
+    assert manager["requirements"] == client.get(f"/guilds/{TEST_GUILD_ID}/profiles/").json()["requirements"], \
+        "Requirements should not be affected by paging"
+
+################################################################################
+def test_giveaway_pages_entries(client):
+    """Test that a single giveaway's entries can be paged."""
+
+    giveaway = client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/").json()
+    for user_id in (TEST_USER_ID, TEST_USER_ID2, TEST_USER_ID2 + 1):
+        client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/{giveaway['id']}/entries", json={"user_id": user_id})
+
+    url = f"/guilds/{TEST_GUILD_ID}/giveaways/{giveaway['id']}"
+    pages = read_pages(client, url, limit=2, key="entries")
+    assert [len(page) for page in pages] == [2, 1], "Entries should come in pages of two"
+
+    giveaway = client.get(url, params={"limit": 2}).json()
+    assert giveaway["details"] is not None, "Details should still be loaded"
+
+################################################################################
+def test_raffle_pages_entries(client):
+    """Test that a single raffle's entries can be paged."""
+
+    raffle = client.post(f"/guilds/{TEST_GUILD_ID}/raffles/").json()
+    for user_id in (TEST_USER_ID, TEST_USER_ID2, TEST_USER_ID2 + 1):
+        client.post(f"/guilds/{TEST_GUILD_ID}/raffles/{raffle['id']}/entries", json={"user_id": user_id, "quantity": 1})
+
+    pages = read_pages(client, f"/guilds/{TEST_GUILD_ID}/raffles/{raffle['id']}", limit=2, key="entries")
+    assert [len(page) for page in pages] == [2, 1], "Entries should come in pages of two"
+
+################################################################################
+@pytest.mark.parametrize("path, key, entry", [
+    ("giveaways/", "giveaways", {"user_id": TEST_USER_ID}),
+    ("raffles/", "raffles", {"user_id": TEST_USER_ID, "quantity": 1}),
+])
+def test_manager_pages_leave_out_entries(client, path, key, entry):
+    """Test that paged managers don't embed each item's unbounded entries."""
+
+    for _ in range(2):
+        item = client.post(f"/guilds/{TEST_GUILD_ID}/{path}").json()
+        assert client.post(f"/guilds/{TEST_GUILD_ID}/{path}{item['id']}/entries", json=entry).status_code == 201
+
+    table = f"{key[:-1]}_entries"
+    with statements() as sql:
+        res = client.get(f"/guilds/{TEST_GUILD_ID}/{path}", params={"limit": 1})
+    assert res.status_code == 200, f"Failed to get page of {path}: {res.text}"
+    items = res.json()[key]
+    assert len(items) == 1 and "entries" not in items[0], "Paged items should come without entries"
+    assert not any(table in s for s in sql), "Entries should not be queried for a page"
+
+    unpaged = client.get(f"/guilds/{TEST_GUILD_ID}/{path}").json()[key]
+    assert all(len(i["entries"]) == 1 for i in unpaged), "Unpaged managers should still embed entries"
+    expected = {k: v for k, v in unpaged[0].items() if k != "entries"}
+    assert items[0] == expected, "Paged items should otherwise be unchanged"
+
+################################################################################
+def test_unpaged_requests_unchanged(client):
+    """Test that requests without limit or after return everything and no cursor."""
+
+    for _ in range(3):
+        client.post(f"/guilds/{TEST_GUILD_ID}/forms/")
+
+    res = client.get(f"/guilds/{TEST_GUILD_ID}/forms/")
+    assert len(res.json()) == 3, "All forms should be returned"
+    assert "X-Next-After" not in res.headers, "No cursor should be sent without paging"
+
+################################################################################
+@pytest.mark.parametrize("params", [
+    {"limit": 0},
+    {"limit": settings.PAGE_MAX_LIMIT + 1},
+    {"limit": 10, "after": -1},
+])
+def test_invalid_page_params(client, params):
+    """Test that out-of-range limits and cursors are rejected."""
+
+    res = client.get(f"/guilds/{TEST_GUILD_ID}/forms/", params=params)
+    assert res.status_code == 422, f"Should return 422 for {params}"
+
+################################################################################
@@ -252,13 +252,13 @@ def test_delete_profile_by_id(client, db_session, new_profile_id):
     assert res.status_code == 404, f"Expected 404 for deleted profile, got {res.status_code}: {res.json()}"
 
     # Ensure all subtables are also deleted
-    details = db_session.query(Models.ProfileDetailsModel).filter_by(profile_id=new_profile_id).first()
+    details = db_session(lambda s: s.query(Models.ProfileDetailsModel).filter_by(profile_id=new_profile_id).first())
     assert details is None, "Profile details should be deleted when profile is deleted"
-    ataglance = db_session.query(Models.ProfileAtAGlanceModel).filter_by(profile_id=new_profile_id).first()
+    ataglance = db_session(lambda s: s.query(Models.ProfileAtAGlanceModel).filter_by(profile_id=new_profile_id).first())
     assert ataglance is None, "Profile ataglance should be deleted when profile is deleted"
-    personality = db_session.query(Models.ProfilePersonalityModel).filter_by(profile_id=new_profile_id).first()
+    personality = db_session(lambda s: s.query(Models.ProfilePersonalityModel).filter_by(profile_id=new_profile_id).first())
     assert personality is None, "Profile personality should be deleted when profile is deleted"
-    images = db_session.query(Models.ProfileImagesModel).filter_by(profile_id=new_profile_id).first()
+    images = db_session(lambda s: s.query(Models.ProfileImagesModel).filter_by(profile_id=new_profile_id).first())
     assert images is None, "Profile images should be deleted when profile is deleted"
 
 ################################################################################
@@ -285,7 +285,7 @@ def test_delete_profile_additional_image_by_id(
     assert res.status_code == 204, f"Failed to delete additional image: {res.json()}"
 
     # Ensure the image is deleted from the database
-    image = db_session.query(Models.ProfileAdditionalImageModel).filter_by(id=new_profile_additional_image_id).first()
+    image = db_session(lambda s: s.query(Models.ProfileAdditionalImageModel).filter_by(id=new_profile_additional_image_id).first())
     assert image is None, "Additional image should be deleted when profile additional image is deleted"
 
 ################################################################################
@@ -80,6 +80,103 @@ def assert_raffle_entry_default_data(e):
     assert isinstance(e["quantity"], int), "Raffle entry quantity should be an integer"
     assert e["quantity"] == 1, "Raffle entry quantity should be 1 by default"
 
+################################################################################
+# POST Tests
+################################################################################
+def add_tickets(client, raffle_id, tickets, num_winners):
+    """Enter each user with the given quantities, which may be split across entries."""
+
+    for user_id, quantities in tickets.items():
+        for quantity in quantities:
+            res = client.post(
+                f"/guilds/{TEST_GUILD_ID}/raffles/{raffle_id}/entries",
+                json={"user_id": user_id, "quantity": quantity}
+            )
+            assert res.status_code == 201, f"Failed to add tickets: {res.text}"
+    res = client.patch(f"/guilds/{TEST_GUILD_ID}/raffles/{raffle_id}", json={"num_winners": num_winners})
+    assert res.status_code == 200, f"Failed to set num_winners: {res.text}"
+
+################################################################################
+def test_draw_raffle(client, new_raffle_id):
+    """Test drawing distinct winners from a raffle and saving them."""
+
+    tickets = {TEST_USER_ID2 + i: [i + 1] for i in range(6)}
+    tickets[TEST_USER_ID2] = [1, 2, 3]
+    add_tickets(client, new_raffle_id, tickets, 4)
+
+    res = client.post(f"/guilds/{TEST_GUILD_ID}/raffles/{new_raffle_id}/draw")
+    assert res.status_code == 200, f"Failed to draw raffle: {res.text}"
+    result = res.json()
+    assert len(set(result["winners"])) == 4, "Four distinct winners should be drawn"
+    assert set(result["winners"]) <= set(tickets), "Winners should hold tickets"
+    assert result["rolled_by"] == TEST_USER_ID, "The actor should be recorded as the roller"
+    assert isinstance(result["seed"], int), "The seed used should be returned"
+    assert 0 <= result["seed"] < 2 ** 53, "The seed should be exact in JavaScript clients"
+
+    raffle = client.get(f"/guilds/{TEST_GUILD_ID}/raffles/{new_raffle_id}").json()
+    assert raffle["winners"] == result["winners"], "Winners should be saved on the raffle"
+    assert raffle["rolled_at"] is not None, "Roll time should be saved on the raffle"
+
+################################################################################
+def test_draw_raffle_seed_is_reproducible(client, new_raffle_id):
+    """Test that the same seed draws the same winners, and a draw can be replayed from its seed."""
+
+    add_tickets(client, new_raffle_id, {TEST_USER_ID2 + i: [10 * (i + 1)] for i in range(20)}, 5)
+    url = f"/guilds/{TEST_GUILD_ID}/raffles/{new_raffle_id}/draw"
+
+    first = client.post(url).json()
+    replay = client.post(url, params={"seed": first["seed"], "reroll": True}).json()
+    assert replay["winners"] == first["winners"], "Replaying the seed should draw the same winners"
+
+    seeded = client.post(url, params={"seed": 7, "reroll": True}).json()
+    again = client.post(url, params={"seed": 7, "reroll": True}).json()
+    assert seeded["seed"] == 7 and again["winners"] == seeded["winners"], "A given seed should be reproducible"
+
+################################################################################
+def test_draw_raffle_twice(client, new_raffle_id):
+    """Test that a raffle can only be drawn again when asked to reroll."""
+
+    add_tickets(client, new_raffle_id, {TEST_USER_ID2: [1]}, 1)
+    assert client.post(f"/guilds/{TEST_GUILD_ID}/raffles/{new_raffle_id}/draw").status_code == 200
+
+    res = client.post(f"/guilds/{TEST_GUILD_ID}/raffles/{new_raffle_id}/draw")
+    assert res.status_code == 409, "Drawing again should be refused without reroll"
+
+################################################################################
+@pytest.mark.parametrize("seed", [-1, 2 ** 53])
+def test_draw_raffle_invalid_seed(client, new_raffle_id, seed):
+    """Test that seeds outside what JavaScript clients can hold exactly are rejected."""
+
+    add_tickets(client, new_raffle_id, {TEST_USER_ID2: [1]}, 1)
+    res = client.post(f"/guilds/{TEST_GUILD_ID}/raffles/{new_raffle_id}/draw", params={"seed": seed})
+    assert res.status_code == 422, f"Should return 422 for seed {seed}"
+
+################################################################################
+def test_draw_raffle_ignores_empty_tickets(client, new_raffle_id):
+    """Test that users without tickets can't win, and that an empty raffle can't be drawn."""
+
+    add_tickets(client, new_raffle_id, {TEST_USER_ID2: [0]}, 1)
+    res = client.post(f"/guilds/{TEST_GUILD_ID}/raffles/{new_raffle_id}/draw")
+    assert res.status_code == 409, "Expected 409 for a raffle without tickets"
+
+    add_tickets(client, new_raffle_id, {TEST_USER_ID2 + 1: [1]}, 2)
+    res = client.post(f"/guilds/{TEST_GUILD_ID}/raffles/{new_raffle_id}/draw")
+    assert res.json()["winners"] == [TEST_USER_ID2 + 1], "Only users holding tickets should win"
+
+################################################################################
+def test_draw_raffle_without_num_winners(client, new_raffle_id):
+
+    add_tickets(client, new_raffle_id, {TEST_USER_ID2 + i: [1] for i in range(3)}, 0)
+    res = client.post(f"/guilds/{TEST_GUILD_ID}/raffles/{new_raffle_id}/draw")
+    assert res.status_code == 409, "Expected 409 for a raffle without a number of winners"
+    assert "num_winners" in res.json()["detail"], "Error should name the missing setting, not the tickets"
+
+################################################################################
+def test_draw_raffle_invalid_guild(client, new_raffle_id):
+
+    res = client.post(f"/guilds/{INVALID_GUILD_ID}/raffles/{new_raffle_id}/draw")
+    assert res.status_code == 404, "Expected 404 for invalid guild ID"
+
 ################################################################################
 # GET Tests
 ################################################################################
@@ -160,7 +257,7 @@ def test_delete_raffle_entry_by_id(client, db_session, new_raffle_id, new_raffle
     res = client.delete(f"/guilds/{TEST_GUILD_ID}/raffles/{new_raffle_id}/entries/{new_raffle_entry_id}")
     assert res.status_code == 204, f"Failed to delete raffle entry: {res.json()}"
 
-    present = db_session.query(Models.RaffleEntryModel).filter_by(id=new_raffle_entry_id).first()
+    present = db_session(lambda s: s.query(Models.RaffleEntryModel).filter_by(id=new_raffle_entry_id).first())
     assert present is None, "Raffle entry should be deleted from the database"
 
 ################################################################################
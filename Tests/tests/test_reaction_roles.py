@@ -161,7 +161,7 @@ def test_delete_reaction_role(client, db_session, new_reaction_role_message_id,
     assert res.status_code == 204, f"Failed to delete reaction role: {res.json()}"
 
     # Verify the role is deleted
-    role = db_session.query(Models.ReactionRoleModel).filter_by(id=new_reaction_role_id).first()
+    role = db_session(lambda s: s.query(Models.ReactionRoleModel).filter_by(id=new_reaction_role_id).first())
     assert role is None, "Reaction role should be deleted from the database"
 
 ################################################################################
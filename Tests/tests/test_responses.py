@@ -0,0 +1,85 @@
+import json
+from typing import List
+
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+
+from ..payloads import *
+
+from App.config import settings
+from App.responses import ORJSONSchemaResponse, SchemaResponseField, SchemaRoute
+from App.Schemas import BaseSchema
+################################################################################
+
+class ItemSchema(BaseSchema):
+
+    id: int
+
+class DetailedItemSchema(ItemSchema):
+
+    secret: str
+
+################################################################################
+def make_client() -> TestClient:
+    """A small app using the project's route and response classes."""
+
+    router = APIRouter(route_class=SchemaRoute)
+
+    @router.get("/item", response_model=ItemSchema)
+    async def get_item():
+        return ItemSchema(id=1)
+
+    @router.get("/detailed", response_model=ItemSchema)
+    async def get_detailed():
+        return DetailedItemSchema(id=1, secret="hidden")
+
+    @router.get("/items", response_model=List[ItemSchema])
+    async def get_items():
+        return [ItemSchema(id=1), {"id": "2"}]
+
+    app = FastAPI(default_response_class=ORJSONSchemaResponse)
+    app.include_router(router)
+    return TestClient(app)
+
+################################################################################
+def test_schema_routes_are_wrapped(client):
+    """Test that the app's schema routes render validated responses directly."""
+
+    route = next(r for r in client.app.routes if getattr(r, "path", None) == "/guilds/{guild_id}/giveaways/")
+    assert isinstance(route.secure_cloned_response_field, SchemaResponseField), "Deep GETs should use the fast path"
+    assert route.response_field is not route.secure_cloned_response_field, "OpenAPI should keep the original field"
+
+################################################################################
+def test_validated_schema_passes_through():
+    """Test that an instance of the declared schema is rendered as it is."""
+
+    res = make_client().get("/item")
+    assert res.status_code == 200 and res.json() == {"id": 1}, "Schema should be rendered"
+    assert res.headers["content-type"] == "application/json", "Response should still be JSON"
+
+################################################################################
+def test_other_values_are_still_validated():
+    """Test that subclasses and dicts are validated against the declared schema."""
+
+    client = make_client()
+    assert client.get("/detailed").json() == {"id": 1}, "Fields outside the declared schema should be dropped"
+    assert client.get("/items").json() == [{"id": 1}, {"id": 2}], "Mixed lists should go through validation"
+
+################################################################################
+def test_fast_path_matches_revalidation(client, monkeypatch):
+    """Test that deep GETs return the same body with and without revalidation."""
+
+    giveaway = client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/").json()
+    client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/{giveaway['id']}/entries", json={"user_id": TEST_USER_ID2})
+    client.post(f"/guilds/{TEST_GUILD_ID}/profiles", json=BASE_USER_ID_PAYLOAD)
+
+    paths = [f"/guilds/{TEST_GUILD_ID}/{path}" for path in ("giveaways/", "profiles/", "forms/", "embeds/")]
+    fast = [client.get(path).content for path in paths]
+
+    monkeypatch.setattr(settings, "RESPONSE_REVALIDATION", True)
+    revalidated = [client.get(path).content for path in paths]
+
+    for path, a, b in zip(paths, fast, revalidated):
+        assert json.loads(a) == json.loads(b), f"GET {path} should not change with revalidation"
+
+################################################################################
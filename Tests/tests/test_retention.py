@@ -0,0 +1,162 @@
+import asyncio
+import gzip
+import json
+from datetime import date, datetime
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import delete, insert, select, text
+
+from ..conftest import TestingSessionLocal, async_engine
+from ..payloads import *
+
+from App import Models
+from App.retention import (
+    _archive_expired_rows,
+    _partition_table,
+    add_months,
+    archive_expired_audit_log,
+    ensure_audit_partitions,
+    partition_name,
+    retention_cutoff,
+)
+################################################################################
+
+RETENTION_TEST_GUILD_ID = 434343
+NOW = datetime(2026, 10, 18, 12, 0, 0)
+
+################################################################################
+@pytest.mark.unit
+def test_month_arithmetic():
+    """Test the month helpers used to name and expire partitions."""
+
+    assert add_months(date(2026, 11, 1), 2) == date(2027, 1, 1), "Adding months should roll over the year"
+    assert add_months(date(2026, 1, 1), -1) == date(2025, 12, 1), "Subtracting months should roll back the year"
+    assert partition_name(date(2026, 3, 1)) == "audit_log_p2026_03", "Partition names should be zero-padded"
+    assert retention_cutoff(12, NOW) == date(2025, 10, 1), "Cutoff should be the start of the oldest kept month"
+
+################################################################################
+@pytest.mark.integration
+def test_archive_expired_audit_log(setup_db, tmp_path):
+    """Test that expired entries are archived per month and removed, and recent ones kept."""
+
+    timestamps = [datetime(2025, 8, 3), datetime(2025, 8, 20), datetime(2025, 9, 9), datetime(2026, 10, 1)]
+
+    async def _run():
+        async with TestingSessionLocal() as db:
+            db.add_all([
+                Models.AuditLogModel(
+                    guild_id=RETENTION_TEST_GUILD_ID,
+                    target="Embed",
+                    target_id=i,
+                    action="Create",
+                    user_id=TEST_USER_ID,
+                    changes={},
+                    created_at=ts,
+                )
+                for i, ts in enumerate(timestamps)
+            ])
+            await db.commit()
+
+        written = await archive_expired_audit_log(async_engine, 12, str(tmp_path), now=NOW)
+
+        async with TestingSessionLocal() as db:
+            remaining = (await db.scalars(
+                select(Models.AuditLogModel.target_id).filter_by(guild_id=RETENTION_TEST_GUILD_ID)
+            )).all()
+            await db.execute(delete(Models.AuditLogModel).filter_by(guild_id=RETENTION_TEST_GUILD_ID))
+            await db.commit()
+
+        return written, remaining
+
+    written, remaining = asyncio.run(_run())
+    names = sorted(p.rsplit("/", 1)[-1] for p in written)
+    assert names == ["audit_log_2025_08.ndjson.gz", "audit_log_2025_09.ndjson.gz"], "Each expired month should get an archive"
+    assert remaining == [3], "Only the entry inside the retention window should remain"
+
+    with gzip.open(tmp_path / "audit_log_2025_08.ndjson.gz", "rt", encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f]
+    assert [r["target_id"] for r in rows] == [0, 1], "Archive should hold that month's entries in order"
+
+################################################################################
+@pytest.mark.unit
+def test_new_partition_takes_rows_from_default():
+    """Test that a missing partition is filled from the default partition before it is attached."""
+
+    class PostgresConnection:
+        """Records statements and answers the catalog lookups of a partitioned audit_log."""
+
+        dialect = SimpleNamespace(name="postgresql")
+
+        def __init__(self, existing):
+            self.existing = existing
+            self.statements = []
+
+        async def scalar(self, statement, params=None):
+            sql = str(statement)
+            if "relkind" in sql:
+                return "p"
+            if "'DEFAULT'" in sql:
+                return "audit_log_default"
+            return params["name"] if params["name"] in self.existing else None
+
+        async def execute(self, statement, params=None):
+            self.statements.append((str(statement), params))
+
+    conn = PostgresConnection(existing={"audit_log_p2026_10"})
+    names = asyncio.run(ensure_audit_partitions(conn, 1, now=NOW))
+    assert names == ["audit_log_p2026_10", "audit_log_p2026_11"], "Both months should be checked"
+
+    sql = [statement for statement, _ in conn.statements]
+    assert len(sql) == 3, "Only the missing partition should be created"
+    assert sql[0].startswith("CREATE TABLE audit_log_p2026_11 (LIKE audit_log"), "Partition should be created detached"
+    assert "DELETE FROM audit_log_default" in sql[1] and "INSERT INTO audit_log_p2026_11" in sql[1], \
+        "That month's rows should be moved out of the default partition"
+    assert conn.statements[1][1] == {"start": datetime(2026, 11, 1), "end": datetime(2026, 12, 1)}, \
+        "Only rows of that month should be moved"
+    assert sql[2].startswith("ALTER TABLE audit_log ATTACH PARTITION audit_log_p2026_11"), \
+        "Partition should be attached once the rows are moved"
+
+################################################################################
+@pytest.mark.integration
+def test_archive_default_partition_rows(setup_db, tmp_path):
+    """Test that expired rows in the default partition are archived and removed."""
+
+    default = _partition_table("audit_log_default")
+    rows = [
+        {
+            "id": i + 1,
+            "guild_id": RETENTION_TEST_GUILD_ID,
+            "target": "Embed",
+            "target_id": i,
+            "action": "Create",
+            "user_id": TEST_USER_ID,
+            "changes": {},
+            "request_id": None,
+            "revision": None,
+            "created_at": ts,
+        }
+        for i, ts in enumerate([datetime(2025, 7, 5), datetime(2025, 9, 9), datetime(2026, 10, 1)])
+    ]
+
+    async def _run():
+        async with async_engine.begin() as conn:
+            await conn.execute(text("CREATE TABLE audit_log_default AS SELECT * FROM audit_log WHERE 0"))
+            await conn.execute(insert(default), rows)
+        try:
+            async with async_engine.begin() as conn:
+                written = await _archive_expired_rows(conn, default, str(tmp_path), retention_cutoff(12, NOW))
+            async with async_engine.connect() as conn:
+                remaining = (await conn.scalars(select(default.c.target_id))).all()
+        finally:
+            async with async_engine.begin() as conn:
+                await conn.execute(text("DROP TABLE audit_log_default"))
+        return written, remaining
+
+    written, remaining = asyncio.run(_run())
+    names = sorted(p.rsplit("/", 1)[-1] for p in written)
+    assert names == ["audit_log_2025_07.ndjson.gz", "audit_log_2025_09.ndjson.gz"], "Each expired month should get an archive"
+    assert remaining == [2], "Only the entry inside the retention window should remain"
+    assert not list(tmp_path.glob("*.partial")), "No partial archives should be left behind"
+
+################################################################################
@@ -0,0 +1,49 @@
+import random
+from collections import Counter
+
+from App.sampling import WeightedReservoir
+################################################################################
+def draw(weights, k, seed):
+
+    reservoir = WeightedReservoir(k, random.Random(seed))
+    for value, weight in weights.items():
+        reservoir.add(value, weight)
+    return reservoir.result()
+
+################################################################################
+def test_weighted_reservoir_matches_ticket_odds():
+    """Test that values win in proportion to their weight."""
+
+    weights = {"a": 1, "b": 3, "c": 6}
+    firsts = Counter(draw(weights, 1, seed)[0] for seed in range(20000))
+    for value, weight in weights.items():
+        assert abs(firsts[value] / 20000 - weight / 10) < 0.02, f"'{value}' should win about {weight}0% of draws"
+
+################################################################################
+def test_weighted_reservoir_draws_without_replacement():
+    """Test that the second winner follows the odds of the tickets left."""
+
+    weights = {"a": 1, "b": 3, "c": 6}
+    # P(b second) = P(a first) * 3/9 + P(c first) * 3/4
+    seconds = Counter(draw(weights, 2, seed)[1] for seed in range(20000))
+    assert abs(seconds["b"] / 20000 - (0.1 * 3 / 9 + 0.6 * 3 / 4)) < 0.02, "Second draw should exclude the first winner"
+
+################################################################################
+def test_weighted_reservoir_bounded_memory():
+    """Test that the reservoir never holds more than k values, however many tickets there are."""
+
+    reservoir = WeightedReservoir(3, random.Random(1))
+    for value in range(100000):
+        reservoir.add(value, 10**6)
+        assert len(reservoir._heap) <= 3, "Reservoir should hold at most k values"
+    assert len(set(reservoir.result())) == 3, "Three distinct values should be drawn"
+
+################################################################################
+def test_weighted_reservoir_edge_cases():
+    """Test zero weights, and asking for more winners than there are values."""
+
+    assert draw({"a": 0, "b": 2}, 2, seed=1) == ["b"], "Values without weight should never win"
+    assert sorted(draw({"a": 1, "b": 2}, 5, seed=1)) == ["a", "b"], "Every value should win when k exceeds them"
+    assert draw({"a": 1}, 0, seed=1) == [], "k of zero should draw nothing"
+
+################################################################################
@@ -0,0 +1,176 @@
+import asyncio
+import json
+
+import pytest
+
+from ..conftest import TestingSessionLocal
+from ..payloads import *
+
+from App.config import settings
+from App.Routers.Guilds import SNAPSHOT_SECTIONS, stream_guild_snapshot, stream_shard_bootstrap
+################################################################################
+def read_snapshot(res):
+
+    return [json.loads(line) for line in res.text.splitlines() if line]
+
+################################################################################
+def test_snapshot_streams_every_section(client):
+    """Test that the snapshot writes a header, every section and a closing line."""
+
+    res = client.get(f"/guilds/{TEST_GUILD_ID}/snapshot")
+    assert res.status_code == 200, f"Failed to get guild snapshot: {res.text}"
+    assert res.headers["content-type"].startswith("application/x-ndjson"), "Snapshot should be NDJSON"
+
+    lines = read_snapshot(res)
+    sections = [line["section"] for line in lines]
+    expected = ["guild"] + [s.name for s in SNAPSHOT_SECTIONS] + ["end"]
+    assert sections == expected, f"Snapshot sections should be {expected}, got {sections}"
+
+    header = lines[0]["data"]
+    assert header["guild_id"] == TEST_GUILD_ID, "Snapshot header should name the guild"
+    assert res.headers["ETag"] == f'W/"{TEST_GUILD_ID}-{header["revision"]}"', "ETag should match the header revision"
+    assert lines[-1]["data"]["sections"] == len(SNAPSHOT_SECTIONS), "Closing line should count the sections"
+
+################################################################################
+def test_snapshot_includes_managers(client):
+    """Test that the snapshot carries the data the individual deep GETs return."""
+
+    assert client.post(f"/guilds/{TEST_GUILD_ID}/embeds/").status_code == 201, "Failed to create embed"
+    assert client.post(f"/guilds/{TEST_GUILD_ID}/forms/").status_code == 201, "Failed to create form"
+    assert client.post(f"/guilds/{TEST_GUILD_ID}/giveaways/").status_code == 201, "Failed to create giveaway"
+
+    data = {line["section"]: line["data"] for line in read_snapshot(client.get(f"/guilds/{TEST_GUILD_ID}/snapshot"))}
+
+    for section, path in [
+        ("configuration", None),
+        ("embeds", "embeds/"),
+        ("forms", "forms/"),
+        ("giveaway_mgr", "giveaways/"),
+        ("glyph_messages", "glyph-messages/"),
+        ("positions", "positions/"),
+        ("profile_mgr", "profiles/"),
+        ("raffle_mgr", "raffles/"),
+        ("reaction_roles_mgr", "reaction-roles/"),
+    ]:
+        if path is None:
+            expected = client.get(f"/guilds/{TEST_GUILD_ID}").json()["data"]["configuration"]
+        else:
+            expected = client.get(f"/guilds/{TEST_GUILD_ID}/{path}").json()
+        assert data[section] == expected, f"Snapshot section '{section}' should match GET {path}"
+
+################################################################################
+def test_snapshot_not_modified(client):
+    """Test that a current If-None-Match short-circuits the snapshot."""
+
+    etag = client.get(f"/guilds/{TEST_GUILD_ID}/revision").headers["ETag"]
+
+    res = client.get(f"/guilds/{TEST_GUILD_ID}/snapshot", headers={"If-None-Match": etag})
+    assert res.status_code == 304, "Should return 304 when the client's snapshot is current"
+    assert res.content == b"", "A 304 should have no body"
+
+################################################################################
+def test_snapshot_not_found(client):
+    """Test requesting the snapshot of a guild that does not exist."""
+
+    res = client.get(f"/guilds/{TEST_GUILD_ID2}/snapshot")
+    assert res.status_code == 404, "Should return 404 for non-existent guild ID"
+
+################################################################################
+def test_snapshot_requires_auth(client):
+    """Test that the snapshot is not served without a token."""
+
+    res = client.get(f"/guilds/{TEST_GUILD_ID}/snapshot", headers={"Authorization": ""})
+    assert res.status_code == 401, "Should return 401 without a valid token"
+
+################################################################################
+def shard_of(guild_id, shard_count):
+
+    return (guild_id >> 22) % shard_count
+
+################################################################################
+def test_bootstrap_selects_guilds_by_shard(client):
+    """Test that each guild is bootstrapped by exactly the shard that owns it."""
+
+    shard_count = 4
+    owner = shard_of(TEST_GUILD_ID, shard_count)
+
+    for shard_id in range(shard_count):
+        res = client.get("/guilds/bootstrap", params={"shard_id": shard_id, "shard_count": shard_count})
+        assert res.status_code == 200, f"Failed to bootstrap shard {shard_id}: {res.text}"
+        lines = read_snapshot(res)
+        guild_ids = [line["data"]["guild_id"] for line in lines if line["section"] == "guild"]
+        assert all(shard_of(gid, shard_count) == shard_id for gid in guild_ids), "Shard should only get its own guilds"
+        assert (TEST_GUILD_ID in guild_ids) == (shard_id == owner), "Guild should belong to exactly one shard"
+        assert lines[-1] == {"section": "end", "data": {"guilds": len(guild_ids)}}, "Closing line should count the guilds"
+
+################################################################################
+def test_bootstrap_matches_snapshot(client):
+    """Test that a bootstrapped guild carries the same data as its snapshot."""
+
+    assert client.post(f"/guilds/{TEST_GUILD_ID}/embeds/").status_code == 201, "Failed to create embed"
+
+    lines = read_snapshot(client.get("/guilds/bootstrap", params={"shard_id": 0, "shard_count": 1}))
+    guild = next(line["data"] for line in lines if line["section"] == "guild" and line["data"]["guild_id"] == TEST_GUILD_ID)
+
+    snapshot = read_snapshot(client.get(f"/guilds/{TEST_GUILD_ID}/snapshot"))
+    assert guild["revision"] == snapshot[0]["data"]["revision"], "Bootstrap should report the guild's revision"
+    assert guild["data"] == {line["section"]: line["data"] for line in snapshot[1:-1]}, "Bootstrap data should match the snapshot"
+
+################################################################################
+def test_bootstrap_batches_guilds(client, monkeypatch):
+    """Test that guilds are deep-loaded in batches instead of one by one."""
+
+    assert client.post("/guilds/", json={"guild_id": TEST_GUILD_ID2}).status_code == 201, "Failed to create guild"
+
+    def _statements():
+        res = client.get("/guilds/bootstrap", params={"shard_id": 0, "shard_count": 1})
+        trace = client.get(f"/system/requests/{res.headers['X-Request-Id']}").json()
+        guilds = [line for line in read_snapshot(res) if line["section"] == "guild"]
+        return len(guilds), trace["statement_count"]
+
+    count, batched = _statements()
+    assert count >= 2, "Both guilds should be bootstrapped"
+
+    monkeypatch.setattr(settings, "GUILD_BOOTSTRAP_BATCH_SIZE", 1)
+    assert _statements()[0] == count, "Batch size should not change which guilds are returned"
+    assert _statements()[1] > batched, "Smaller batches should take more round trips"
+
+################################################################################
+@pytest.mark.parametrize("params, status", [
+    ({"shard_id": 4, "shard_count": 4}, 400),
+    ({"shard_id": 0, "shard_count": 0}, 422),
+    ({"shard_id": -1, "shard_count": 4}, 422),
+    ({"shard_count": 4}, 422),
+])
+def test_bootstrap_invalid_shard(client, params, status):
+    """Test bootstrapping with an invalid shard ID or count."""
+
+    res = client.get("/guilds/bootstrap", params=params)
+    assert res.status_code == status, f"Should return {status} for {params}"
+
+################################################################################
+@pytest.mark.integration
+def test_streams_close_their_session(setup_db):
+    """Test that streamed responses close their session when finished or abandoned."""
+
+    async def _run():
+        db = TestingSessionLocal()
+        lines = [line async for line in stream_shard_bootstrap(db, 0, 1, settings.GUILD_BOOTSTRAP_BATCH_SIZE)]
+        finished = (json.loads(lines[-1])["section"], db.in_transaction())
+
+        # A client that disconnects mid-stream leaves the generator to be closed.
+        db = TestingSessionLocal()
+        stream = stream_guild_snapshot(db, TEST_GUILD_ID, 0)
+        await anext(stream)
+        await anext(stream)
+        open_mid_stream = db.in_transaction()
+        await stream.aclose()
+        return finished, open_mid_stream, db.in_transaction()
+
+    (last, open_after_end), open_mid_stream, open_after_close = asyncio.run(_run())
+    assert last == "end", "Bootstrap should stream to the end"
+    assert not open_after_end, "Session should be closed once the stream ends"
+    assert open_mid_stream, "Session should be in use while the stream is read"
+    assert not open_after_close, "Session should be closed when the stream is abandoned"
+
+################################################################################
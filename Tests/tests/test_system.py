@@ -0,0 +1,139 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from ..payloads import *
+
+from App.audit import PENDING_KEY
+from App.database import get_db, get_read_db, PoolMetrics, engine, replica_engine
+################################################################################
+def test_get_pool_status(client):
+    """Test retrieving the connection pool status of the worker."""
+
+    res = client.get("/system/pool")
+    assert res.status_code == 200, f"Failed to get pool status: {res.json()}"
+    status = res.json()
+    for key in ("pid", "size", "checked_in", "checked_out", "overflow", "timeout", "wait_histogram"):
+        assert key in status, f"Pool status should contain '{key}'"
+    assert "+Inf" in status["wait_histogram"], "Wait histogram should have an overflow bucket"
+
+################################################################################
+def test_get_pool_status_unauthorized(client):
+    """Test that the pool status requires authentication."""
+
+    res = client.get("/system/pool", headers={"Authorization": ""})
+    assert res.status_code == 401, "Should return 401 without a bearer token"
+
+################################################################################
+@pytest.mark.unit
+def test_pool_metrics_buckets():
+    """Test that wait times land in the correct histogram buckets."""
+
+    metrics = PoolMetrics()
+    metrics.record(0.0005)
+    metrics.record(0.2)
+    metrics.record(60.0, timed_out=True)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["checkouts"] == 2, "Two checkouts should be recorded"
+    assert snapshot["timeouts"] == 1, "One timeout should be recorded"
+    assert snapshot["wait_histogram"]["0.001"] == 1, "Sub-millisecond wait should land in the first bucket"
+    assert snapshot["wait_histogram"]["0.5"] == 1, "200ms wait should land in the 0.5s bucket"
+    assert snapshot["wait_histogram"]["+Inf"] == 1, "Timed-out wait should land in the overflow bucket"
+    assert snapshot["max_wait"] == 60.0, "Max wait should track the longest wait"
+
+################################################################################
+@pytest.mark.unit
+def test_pool_timeout_returns_503():
+    """Test that an exhausted pool is reported as a retryable 503."""
+
+    async def _exhaust():
+        gen = get_db()
+        await gen.__anext__()
+        await gen.athrow(PoolTimeoutError("QueuePool limit reached"))
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(_exhaust())
+
+    assert exc_info.value.status_code == 503, "Pool timeouts should return 503"
+    assert "Retry-After" in exc_info.value.headers, "503 responses should include Retry-After"
+
+################################################################################
+@pytest.mark.unit
+def test_read_db_falls_back_to_primary():
+    """Test that read sessions use the primary engine when no replica is configured."""
+
+    async def _bind(consistency):
+        gen = get_read_db(consistency)
+        db = await gen.__anext__()
+        bind = db.bind
+        await gen.aclose()
+        return bind
+
+    assert replica_engine is None, "Tests should run without a read replica"
+    assert asyncio.run(_bind(None)) is engine, "Reads should fall back to the primary engine"
+    assert asyncio.run(_bind("strong")) is engine, "Strong reads should always use the primary engine"
+
+################################################################################
+@pytest.mark.unit
+def test_read_db_translates_errors():
+    """Test that read sessions report database errors like write sessions do."""
+
+    async def _exhaust():
+        gen = get_read_db(None)
+        await gen.__anext__()
+        await gen.athrow(PoolTimeoutError("QueuePool limit reached"))
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(_exhaust())
+
+    assert exc_info.value.status_code == 503, "Pool timeouts on reads should return 503"
+
+################################################################################
+def test_get_replica_pool_status_not_configured(client):
+    """Test that asking for the replica pool without a replica returns 404."""
+
+    res = client.get("/system/pool", params={"target": "replica"})
+    assert res.status_code == 404, "Should return 404 when no replica is configured"
+
+################################################################################
+def test_request_id_header_and_trace(client):
+    """Test that requests get an ID and their timings can be looked up by it."""
+
+    res = client.get(f"/guilds/{TEST_GUILD_ID}/embeds/")
+    assert res.status_code == 200, f"Failed to get embeds: {res.json()}"
+    request_id = res.headers.get("X-Request-Id")
+    assert request_id is not None, "Response should carry an X-Request-Id header"
+
+    res = client.get(f"/system/requests/{request_id}")
+    assert res.status_code == 200, f"Failed to get request trace: {res.json()}"
+    trace = res.json()
+    assert trace["path"] == f"/guilds/{TEST_GUILD_ID}/embeds/", "Trace should record the request path"
+    assert trace["status_code"] == 200, "Trace should record the response status"
+    assert trace["statement_count"] >= 1, "Trace should count the request's SQL statements"
+    assert len(trace["statements"]) == trace["statement_count"], "Trace should list the statements"
+    assert trace["wall_time"] >= trace["db_time"], "Wall time should include database time"
+
+################################################################################
+def test_request_id_reaches_audit_entries(client, async_db_session):
+    """Test that a supplied request ID is echoed and attached to audit entries."""
+
+    request_id = str(uuid.uuid4())
+    res = client.post(f"/guilds/{TEST_GUILD_ID}/embeds/", headers={"X-Request-Id": request_id})
+    assert res.status_code == 201, f"Failed to create embed: {res.json()}"
+    assert res.headers["X-Request-Id"] == request_id, "Supplied request ID should be echoed back"
+
+    pending = async_db_session.info[PENDING_KEY]
+    assert str(pending[-1]["request_id"]) == request_id, "Audit entry should carry the request ID"
+
+################################################################################
+def test_get_request_trace_not_found(client):
+    """Test looking up a request ID that was never seen."""
+
+    res = client.get(f"/system/requests/{uuid.uuid4()}")
+    assert res.status_code == 404, "Should return 404 for an unknown request ID"
+
+################################################################################
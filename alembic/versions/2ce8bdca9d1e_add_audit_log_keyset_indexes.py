@@ -0,0 +1,47 @@
+"""Add audit log keyset pagination indexes
+
+Revision ID: 2ce8bdca9d1e
+Revises: f84c73dd2fe2
+Create Date: 2026-10-18 11:24:52.907113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '2ce8bdca9d1e'
+down_revision: Union[str, Sequence[str], None] = 'f84c73dd2fe2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, columns) on audit_log - mirrors AuditLogModel.__table_args__.
+INDEXES = (
+    ('ix_audit_log_guild_created', ['guild_id', 'created_at', 'id']),
+    ('ix_audit_log_guild_target_created', ['guild_id', 'target', 'target_id', 'created_at', 'id']),
+    ('ix_audit_log_guild_user_created', ['guild_id', 'user_id', 'created_at', 'id']),
+)
+# Superseded by ix_audit_log_guild_created, which leads with the same column.
+SUPERSEDED = ('ix_audit_log_guild_id', ['guild_id'])
+
+
+def _is_postgres() -> bool:
+    return op.get_context().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    kw = {"postgresql_concurrently": True} if _is_postgres() else {}
+    with op.get_context().autocommit_block():
+        for name, columns in INDEXES:
+            op.create_index(name, 'audit_log', columns, if_not_exists=True, **kw)
+        op.drop_index(SUPERSEDED[0], table_name='audit_log', if_exists=True, **kw)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    kw = {"postgresql_concurrently": True} if _is_postgres() else {}
+    with op.get_context().autocommit_block():
+        op.create_index(SUPERSEDED[0], 'audit_log', SUPERSEDED[1], if_not_exists=True, **kw)
+        for name, _ in reversed(INDEXES):
+            op.drop_index(name, table_name='audit_log', if_exists=True, **kw)
@@ -0,0 +1,28 @@
+"""Add guild revision counter
+
+Revision ID: 63bc4476d2e6
+Revises: d38950c7c5e7
+Create Date: 2026-10-18 14:06:33.120958
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '63bc4476d2e6'
+down_revision: Union[str, Sequence[str], None] = 'd38950c7c5e7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('guild_ids', sa.Column('revision', sa.BigInteger(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('guild_ids') as batch_op:
+        batch_op.drop_column('revision')
@@ -0,0 +1,77 @@
+"""Stamp audit log entries with the guild revision they were committed at
+
+Revision ID: a51e0c3f7b92
+Revises: 63bc4476d2e6
+Create Date: 2026-10-18 15:02:48.331207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a51e0c3f7b92'
+down_revision: Union[str, Sequence[str], None] = '63bc4476d2e6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Mirrors the Index(...) declaration on AuditLogModel.
+INDEX = ('ix_audit_log_guild_revision', ['guild_id', 'revision'])
+
+
+def _is_postgres() -> bool:
+    return op.get_context().dialect.name == "postgresql"
+
+
+def _partitions() -> Sequence[str]:
+    return op.get_bind().execute(sa.text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "WHERE i.inhparent = 'audit_log'::regclass "
+        "ORDER BY c.relname"
+    )).scalars().all()
+
+
+def _drop_if_invalid(name: str) -> None:
+    # A failed concurrent build leaves an INVALID index behind, which
+    # IF NOT EXISTS would then skip over.
+    invalid = op.get_bind().execute(
+        sa.text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {"name": name}
+    ).scalar()
+    if invalid:
+        op.execute(f"DROP INDEX CONCURRENTLY {name}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nullable: entries written before this migration have no revision.
+    op.add_column('audit_log', sa.Column('revision', sa.BigInteger(), nullable=True))
+
+    if not _is_postgres():
+        op.create_index(INDEX[0], 'audit_log', INDEX[1])
+        return
+
+    # CREATE INDEX on the partitioned table would lock every partition
+    # against writes until all of them are indexed, and CONCURRENTLY isn't
+    # supported there. Instead, an (invalid) parent index is created on the
+    # table alone, each partition is indexed concurrently and attached to it,
+    # and the parent becomes valid once the last one is attached.
+    columns = ", ".join(INDEX[1])
+    op.execute(f"CREATE INDEX IF NOT EXISTS {INDEX[0]} ON ONLY audit_log ({columns})")
+    with op.get_context().autocommit_block():
+        for partition in _partitions():
+            name = f"{partition}_guild_revision_idx"
+            _drop_if_invalid(name)
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {partition} ({columns})")
+            op.execute(f"ALTER INDEX {INDEX[0]} ATTACH PARTITION {name}")
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Dropping the parent index drops the partitions' indexes with it.
+    op.drop_index(INDEX[0], table_name='audit_log')
+    with op.batch_alter_table('audit_log') as batch_op:
+        batch_op.drop_column('revision')
@@ -0,0 +1,61 @@
+"""Allow one giveaway entry per user
+
+Revision ID: b7e4d91c20a6
+Revises: a51e0c3f7b92
+Create Date: 2026-10-18 19:41:07.552913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4d91c20a6'
+down_revision: Union[str, Sequence[str], None] = 'a51e0c3f7b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Mirrors GiveawayEntryModel.__table_args__.
+UNIQUE_INDEX = ('ix_giveaway_entries_giveaway_user', ['giveaway_id', 'user_id'])
+# Superseded by the unique index, which leads with the same column.
+SUPERSEDED = ('ix_giveaway_entries_giveaway_id', ['giveaway_id'])
+
+
+def _is_postgres() -> bool:
+    return op.get_context().dialect.name == "postgresql"
+
+
+def _drop_if_invalid(name: str) -> None:
+    # A failed concurrent build leaves an INVALID index behind, which
+    # IF NOT EXISTS would then skip over, leaving ON CONFLICT without the
+    # unique index it relies on.
+    invalid = op.get_bind().execute(
+        sa.text("SELECT NOT indisvalid FROM pg_index WHERE indexrelid = to_regclass(:name)"),
+        {"name": name}
+    ).scalar()
+    if invalid:
+        op.execute(f"DROP INDEX CONCURRENTLY {name}")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Keep the earliest of any duplicate entries so the index can be built.
+    op.execute(
+        "DELETE FROM giveaway_entries WHERE id NOT IN "
+        "(SELECT MIN(id) FROM giveaway_entries GROUP BY giveaway_id, user_id)"
+    )
+    kw = {"postgresql_concurrently": True} if _is_postgres() else {}
+    with op.get_context().autocommit_block():
+        if _is_postgres():
+            _drop_if_invalid(UNIQUE_INDEX[0])
+        op.create_index(UNIQUE_INDEX[0], 'giveaway_entries', UNIQUE_INDEX[1], unique=True, if_not_exists=True, **kw)
+        op.drop_index(SUPERSEDED[0], table_name='giveaway_entries', if_exists=True, **kw)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    kw = {"postgresql_concurrently": True} if _is_postgres() else {}
+    with op.get_context().autocommit_block():
+        op.create_index(SUPERSEDED[0], 'giveaway_entries', SUPERSEDED[1], if_not_exists=True, **kw)
+        op.drop_index(UNIQUE_INDEX[0], table_name='giveaway_entries', if_exists=True, **kw)
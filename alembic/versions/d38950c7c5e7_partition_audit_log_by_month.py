@@ -0,0 +1,108 @@
+"""Partition audit_log by month on Postgres
+
+Revision ID: d38950c7c5e7
+Revises: 2ce8bdca9d1e
+Create Date: 2026-10-18 12:41:07.553290
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'd38950c7c5e7'
+down_revision: Union[str, Sequence[str], None] = '2ce8bdca9d1e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+COLUMNS = "id, guild_id, target, target_id, action, user_id, changes, request_id, created_at"
+COLUMN_DEFS = """
+    id INTEGER NOT NULL DEFAULT nextval('audit_log_id_seq'),
+    guild_id BIGINT NOT NULL,
+    target VARCHAR NOT NULL,
+    target_id INTEGER NOT NULL,
+    action VARCHAR NOT NULL,
+    user_id BIGINT NOT NULL,
+    changes JSON NOT NULL,
+    request_id UUID,
+    created_at TIMESTAMP WITHOUT TIME ZONE NOT NULL DEFAULT CURRENT_TIMESTAMP
+"""
+INDEXES = (
+    ('ix_audit_log_guild_created', ['guild_id', 'created_at', 'id']),
+    ('ix_audit_log_guild_target_created', ['guild_id', 'target', 'target_id', 'created_at', 'id']),
+    ('ix_audit_log_guild_user_created', ['guild_id', 'user_id', 'created_at', 'id']),
+)
+# Partitions are created from the oldest existing entry up to this many
+# months ahead; `python -m App.retention` keeps extending them afterwards.
+MONTHS_AHEAD = 3
+
+
+def _is_postgres() -> bool:
+    return op.get_context().dialect.name == "postgresql"
+
+
+def _replace_table(new_table_sql: str) -> None:
+    """Move audit_log aside and recreate it from the given CREATE TABLE statement."""
+    op.execute("ALTER TABLE audit_log RENAME TO audit_log_old")
+    op.execute("ALTER TABLE audit_log_old RENAME CONSTRAINT audit_log_pkey TO audit_log_old_pkey")
+    for name, _ in INDEXES:
+        op.drop_index(name, table_name='audit_log_old')
+
+    op.execute(new_table_sql)
+    # The id sequence has to survive dropping the old table.
+    op.execute("ALTER SEQUENCE audit_log_id_seq OWNED BY audit_log.id")
+
+
+def _copy_and_finish() -> None:
+    op.execute(f"INSERT INTO audit_log ({COLUMNS}) SELECT {COLUMNS} FROM audit_log_old")
+    op.execute("DROP TABLE audit_log_old CASCADE")
+    for name, columns in INDEXES:
+        op.create_index(name, 'audit_log', columns)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # SQLite has no declarative partitioning; audit_log stays a plain table
+    # and the retention job deletes expired rows from it instead.
+    if not _is_postgres():
+        return
+
+    # The partition key has to be part of the primary key.
+    _replace_table(f"""
+        CREATE TABLE audit_log ({COLUMN_DEFS},
+            CONSTRAINT audit_log_pkey PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+    op.execute(f"""
+        DO $$
+        DECLARE
+            m date;
+            last_month date := (date_trunc('month', now()) + interval '{MONTHS_AHEAD} months')::date;
+        BEGIN
+            SELECT date_trunc('month', coalesce(min(created_at), now()))::date INTO m FROM audit_log_old;
+            WHILE m <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF audit_log FOR VALUES FROM (%L) TO (%L)',
+                    'audit_log_p' || to_char(m, 'YYYY_MM'), m, (m + interval '1 month')::date
+                );
+                m := (m + interval '1 month')::date;
+            END LOOP;
+        END $$;
+    """)
+    # Catches anything outside the monthly partitions, e.g. if the retention
+    # job hasn't run for a while.
+    op.execute("CREATE TABLE audit_log_default PARTITION OF audit_log DEFAULT")
+    _copy_and_finish()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if not _is_postgres():
+        return
+
+    _replace_table(f"""
+        CREATE TABLE audit_log ({COLUMN_DEFS},
+            CONSTRAINT audit_log_pkey PRIMARY KEY (id)
+        )
+    """)
+    _copy_and_finish()
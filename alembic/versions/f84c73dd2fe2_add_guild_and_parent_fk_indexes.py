@@ -0,0 +1,59 @@
+"""Add guild_id and parent foreign key indexes
+
+Revision ID: f84c73dd2fe2
+Revises: c2b7bc94ebb3
+Create Date: 2026-10-18 10:02:14.318420
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'f84c73dd2fe2'
+down_revision: Union[str, Sequence[str], None] = 'c2b7bc94ebb3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (index name, table, column) - mirrors the Index(...) declarations in App/Models.
+INDEXES = (
+    ('ix_embeds_guild_id', 'embeds', 'guild_id'),
+    ('ix_forms_guild_id', 'forms', 'guild_id'),
+    ('ix_profiles_guild_id', 'profiles', 'guild_id'),
+    ('ix_giveaways_guild_id', 'giveaways', 'guild_id'),
+    ('ix_raffles_guild_id', 'raffles', 'guild_id'),
+    ('ix_audit_log_guild_id', 'audit_log', 'guild_id'),
+    ('ix_embed_fields_embed_id', 'embed_fields', 'embed_id'),
+    ('ix_form_questions_form_id', 'form_questions', 'form_id'),
+    ('ix_form_question_responses_question_id', 'form_question_responses', 'question_id'),
+    ('ix_giveaway_entries_giveaway_id', 'giveaway_entries', 'giveaway_id'),
+    ('ix_raffle_entries_raffle_id', 'raffle_entries', 'raffle_id'),
+)
+
+
+def _is_postgres() -> bool:
+    return op.get_context().dialect.name == "postgresql"
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if _is_postgres():
+        # CONCURRENTLY can't run inside a transaction block, and avoids
+        # locking writers out of the tables while the indexes build.
+        with op.get_context().autocommit_block():
+            for name, table, column in INDEXES:
+                op.create_index(name, table, [column], postgresql_concurrently=True, if_not_exists=True)
+    else:
+        for name, table, column in INDEXES:
+            op.create_index(name, table, [column], if_not_exists=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if _is_postgres():
+        with op.get_context().autocommit_block():
+            for name, table, _ in reversed(INDEXES):
+                op.drop_index(name, table_name=table, postgresql_concurrently=True, if_exists=True)
+    else:
+        for name, table, _ in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True)